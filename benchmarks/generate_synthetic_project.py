@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Synthetic Flutter Project Generator
+Writes a lib/ tree, test/ files and spec markdown shaped like this repo, at N times its size
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+# Shape of the real project at 1x (files per directory, measured from lib/ and docs/specs/)
+SCREEN_DIRS = {
+    "inbox": 5, "ai_hub": 7, "jobs": 4, "calendar": 12, "money": 8, "quotes": 2,
+    "contacts": 9, "reviews": 4, "notifications": 1, "settings": 12, "home": 1,
+    "onboarding": 1, "reports": 3, "support": 2, "legal": 1, "auth": 5,
+}
+WIDGET_DIRS = {"components": 120, "forms": 25, "global": 36}
+MODEL_COUNT = 8
+MOCK_COUNT = 10
+SERVICE_COUNT = 2
+TEST_COUNT = 1
+SPEC_MODULES = 16
+
+# Per-file density of the constructs the audit scripts look for
+SCREEN_LINES = 630
+WIDGET_LINES = 160
+BUILD_METHODS = 9
+HANDLE_METHODS = 2
+BUTTONS = 9
+
+MODULE_NAMES = [
+    "Omni-Inbox", "AI Receptionist", "Jobs", "Calendar & Bookings", "Money", "Contacts / CRM",
+    "Reviews", "Notifications System", "Marketing", "Dashboard", "AI Hub", "Settings",
+    "Adaptive Profession", "Onboarding", "Integrations", "Reports & Analytics",
+]
+WORDS = [
+    "quote", "invoice", "job", "message", "thread", "calendar", "booking", "review", "contact",
+    "payment", "report", "setting", "team", "note", "filter", "search", "summary", "timeline",
+    "template", "reminder", "segment", "deposit", "service", "goal",
+]
+
+
+def camel(stem: str) -> str:
+    return ''.join(part.title() for part in stem.split('_'))
+
+
+class SyntheticProject:
+    """Deterministic generator for one scale factor"""
+
+    def __init__(self, root_dir: Path, scale: int = 1, seed: int = 0):
+        self.root_dir = Path(root_dir)
+        self.lib_dir = self.root_dir / "lib"
+        self.scale = scale
+        self.random = random.Random(seed)
+        self.screens: List[Dict] = []
+        self.widgets: List[Dict] = []
+        self.models: List[Dict] = []
+
+    def _write(self, rel_path: str, content: str):
+        path = self.root_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def _words(self, count: int) -> List[str]:
+        return self.random.sample(WORDS, count)
+
+    def _layout(self, indent: int, line_count: int) -> List[str]:
+        """Nested Container/Column/Text boilerplate filling out build methods to realistic length"""
+        lines = []
+        pad = " " * indent
+        while len(lines) + 9 <= line_count:
+            word = self.random.choice(WORDS)
+            lines.extend([
+                f"{pad}Container(",
+                f"{pad}  padding: const EdgeInsets.symmetric(horizontal: 12, vertical: 8),",
+                f"{pad}  child: Column(",
+                f"{pad}    crossAxisAlignment: CrossAxisAlignment.start,",
+                f"{pad}    children: [",
+                f"{pad}      Text('{word.title()}', style: Theme.of(context).textTheme.titleSmall),",
+                f"{pad}    ],",
+                f"{pad}  ),",
+                f"{pad}),",
+            ])
+        return lines
+
+    def _handler_body(self, screen_classes: List[str]) -> str:
+        """A button callback with the mix of real, empty, TODO and placeholder bodies seen in lib/"""
+        roll = self.random.random()
+        if roll < 0.08:
+            return "() {}"
+        if roll < 0.14:
+            return "() {\n              // TODO: Wire up backend\n            }"
+        if roll < 0.24:
+            return ("() {\n              ScaffoldMessenger.of(context).showSnackBar(\n"
+                    "                const SnackBar(content: Text('Feature coming soon')),\n"
+                    "              );\n            }")
+        if roll < 0.40 and screen_classes:
+            target = self.random.choice(screen_classes)
+            return ("() {\n              Navigator.push(\n                context,\n"
+                    "                MaterialPageRoute(\n"
+                    f"                  builder: (context) => {target}(),\n"
+                    "                ),\n"
+                    "              );\n            }")
+        return "() {\n              setState(() => _selectedIndex = index);\n            }"
+
+    def _screen(self, class_name: str, screen_classes: List[str], widget_classes: List[str]) -> str:
+        state = f"_{class_name}State"
+        lines = [
+            "import 'package:flutter/material.dart';",
+            "import '../../theme/app_theme.dart';",
+            "import '../../widgets/global/empty_state_card.dart';",
+            "",
+            "// TODO: Replace mock data with backend calls",
+            f"class {class_name} extends StatefulWidget {{",
+            f"  const {class_name}({{super.key}});",
+            "",
+            "  @override",
+            f"  State<{class_name}> createState() => {state}();",
+            "}",
+            "",
+            f"class {state} extends State<{class_name}> {{",
+            "  bool isLoading = false;",
+            "  int _selectedIndex = 0;",
+            "  final List<String> _items = [];",
+            "",
+            "  @override",
+            "  Widget build(BuildContext context) {",
+            "    return Scaffold(",
+            f"      appBar: AppBar(title: const Text('{camel('_'.join(self._words(2)))}')),",
+            "      body: isLoading ? const Center(child: CircularProgressIndicator()) : Column(",
+            "        children: [",
+        ]
+        builders = [f"_build{camel(word)}Section" for word in self._words(BUILD_METHODS)]
+        lines.extend(f"          {name}(context)," for name in builders)
+        lines.extend(["        ],", "      ),", "    );", "  }", ""])
+
+        for position, name in enumerate(builders):
+            lines.extend([
+                f"  Widget {name}(BuildContext context) {{",
+                "    if (_items.isEmpty) {",
+                "      return const EmptyStateCard(title: 'Nothing here yet');",
+                "    }",
+                "    return Padding(",
+                "      padding: const EdgeInsets.all(16),",
+                "      child: Row(",
+                "        children: [",
+            ])
+            for index in range(BUTTONS // BUILD_METHODS + (position < BUTTONS % BUILD_METHODS)):
+                handler = self.random.choice(["onPressed", "onTap"])
+                widget = "TextButton" if handler == "onPressed" else "InkWell"
+                child = "const Text('Open')" if handler == "onPressed" else "Text(_items.first)"
+                lines.extend([
+                    f"          {widget}(",
+                    f"            {handler}: {self._handler_body(screen_classes)},",
+                    f"            child: {child},",
+                    "          ),",
+                ])
+            if widget_classes:
+                lines.append(f"          {self.random.choice(widget_classes)}(),")
+            lines.extend(self._layout(10, (SCREEN_LINES - 60) // BUILD_METHODS - 15))
+            lines.extend(["        ],", "      ),", "    );", "  }", ""])
+
+        for word in self._words(HANDLE_METHODS):
+            lines.extend([
+                f"  void _handle{camel(word)}() {{",
+                "    setState(() {",
+                "      isLoading = true;",
+                "    });",
+                "  }",
+                "",
+            ])
+        lines.extend([
+            "  Future<void> _refresh() async {",
+            "    try {",
+            "      setState(() => isLoading = true);",
+            "    } catch (error) {",
+            "      debugPrint('error: $error');",
+            "    }",
+            "  }",
+            "}",
+            "",
+        ])
+        return "\n".join(lines)
+
+    def _widget(self, class_name: str) -> str:
+        fields = self._words(3)
+        lines = [
+            "import 'package:flutter/material.dart';",
+            "",
+            f"class {class_name} extends StatelessWidget {{",
+        ]
+        lines.extend(f"  final String? {field};" for field in fields)
+        lines.extend([
+            "",
+            f"  const {class_name}({{super.key, " + ", ".join(f"this.{field}" for field in fields) + "});",
+            "",
+            "  @override",
+            "  Widget build(BuildContext context) {",
+            "    return Card(",
+            "      child: ListTile(",
+            f"        title: Text({fields[0]} ?? ''),",
+            f"        subtitle: Text({fields[1]} ?? ''),",
+            "        onTap: () {},",
+            "        trailing: Column(",
+            "          children: [",
+        ])
+        lines.extend(self._layout(12, WIDGET_LINES - 30))
+        lines.extend([
+            "          ],",
+            "        ),",
+            "      ),",
+            "    );",
+            "  }",
+            "}",
+            "",
+        ])
+        return "\n".join(lines)
+
+    def _model(self, class_name: str) -> str:
+        fields = self._words(6)
+        lines = [f"class {class_name} {{"]
+        lines.extend(f"  final String {field};" for field in fields)
+        lines.extend([
+            "",
+            f"  const {class_name}({{" + ", ".join(f"required this.{field}" for field in fields) + "});",
+            "",
+            f"  factory {class_name}.fromJson(Map<String, dynamic> json) => {class_name}(",
+        ])
+        lines.extend(f"        {field}: json['{field}'] as String," for field in fields)
+        lines.extend(["      );", "}", ""])
+        return "\n".join(lines)
+
+    def generate_code(self):
+        """lib/ and test/ trees"""
+        widget_classes = []
+        for directory, count in WIDGET_DIRS.items():
+            for index in range(count * self.scale):
+                stem = f"{'_'.join(self._words(2))}_{directory}_{index}"
+                class_name = camel(stem)
+                rel_path = f"widgets/{directory}/{stem}.dart"
+                self._write(f"lib/{rel_path}", self._widget(class_name))
+                self.widgets.append({"file": rel_path, "class": class_name})
+                widget_classes.append(class_name)
+
+        planned = []
+        for directory, count in SCREEN_DIRS.items():
+            for index in range(count * self.scale):
+                stem = f"{directory}_{'_'.join(self._words(1))}_{index}_screen"
+                planned.append((f"screens/{directory}/{stem}.dart", camel(stem)))
+        screen_classes = [class_name for _, class_name in planned]
+        # A few push targets that do not exist, like the broken links the checker reports
+        targets = screen_classes + [f"Missing{index}Screen" for index in range(max(1, len(planned) // 20))]
+
+        for rel_path, class_name in planned:
+            self._write(f"lib/{rel_path}", self._screen(class_name, targets, widget_classes))
+            self.screens.append({"file": rel_path, "class": class_name})
+
+        tabs = "\n".join(f"    {class_name}()," for _, class_name in planned[:5])
+        self._write("lib/screens/main_navigation.dart",
+                    "import 'package:flutter/material.dart';\n\n"
+                    "class MainNavigation extends StatelessWidget {\n"
+                    "  const MainNavigation({super.key});\n\n"
+                    "  static const tabs = [\n" + tabs + "\n  ];\n\n"
+                    "  @override\n  Widget build(BuildContext context) => tabs.first;\n}\n")
+
+        for index in range(MODEL_COUNT * self.scale):
+            stem = f"{self._words(1)[0]}_{index}"
+            self._write(f"lib/models/{stem}.dart", self._model(camel(stem)))
+            self.models.append({"file": f"models/{stem}.dart", "class": camel(stem)})
+        for index in range(MOCK_COUNT * self.scale):
+            stem = f"mock_{self._words(1)[0]}s_{index}"
+            model = self.random.choice(self.models)["class"]
+            rows = "\n".join(f"  // {model} fixture {row}" for row in range(40))
+            self._write(f"lib/mock/{stem}.dart", f"final mock{camel(stem)} = <Object>[];\n{rows}\n")
+        for index in range(SERVICE_COUNT * self.scale):
+            self._write(f"lib/services/service_{index}.dart",
+                        f"class Service{index} {{\n  Future<void> fetch() async {{}}\n}}\n")
+        self._write("lib/main.dart", "import 'package:flutter/material.dart';\n\nvoid main() => runApp(const SizedBox());\n")
+        for index in range(TEST_COUNT * self.scale):
+            self._write(f"test/widget_{index}_test.dart", "void main() {}\n")
+
+    def generate_specs(self) -> int:
+        """docs/specs/Product_Definition markdown with 16 x scale modules"""
+        module_count = SPEC_MODULES * self.scale
+        lines = ["# Product Definition", "", "## 3️⃣ Core Modules (Everything Included)", ""]
+        for number in range(1, module_count + 1):
+            name = MODULE_NAMES[(number - 1) % len(MODULE_NAMES)]
+            lines.extend([f"### 3.{number} {name}", "", f"**Purpose:** Manage {' and '.join(self._words(2))} work.", ""])
+            lines.append("**Core Capabilities:**")
+            for word in self._words(5):
+                lines.append(f"- **{camel(word)} Management:** Create, edit and track {word}s")
+                lines.append(f"  - Bulk {word} actions")
+            lines.extend(["", "**Features:**"])
+            for word in self._words(6):
+                lines.append(f"- **{camel(word)} View:** Browse {word}s with filters")
+            lines.extend(["", "**Interactions:**", f"- Tap a {self._words(1)[0]} to open details", ""])
+            lines.extend(["**UI Components:**", f"{camel(self._words(1)[0])}Card, {camel(self._words(1)[0])}List", ""])
+            lines.extend(["**🆕 v2.5.1 Enhancements:**", f"- **Smart {camel(self._words(1)[0])}:** AI suggestions", ""])
+            lines.extend(["**🔮 Future Features:**", f"- **{camel(self._words(1)[0])} Sync:** Later", ""])
+            lines.extend(["**Automations:**", f"- Remind about overdue {self._words(1)[0]}s", "", "---", ""])
+        lines.extend(["## 4️⃣ Appendix", ""])
+        self._write("docs/specs/Product_Definition_v2.5.1_10of10.md", "\n".join(lines))
+        return module_count
+
+    def generate_inventories(self):
+        """docs/_from_specs.json and docs/_from_code.json, the inputs of alignment_analyzer"""
+        code_items = []
+        for category, items in (("screen", self.screens), ("widget", self.widgets), ("model", self.models)):
+            for item in items:
+                code_items.append({
+                    "file": item["file"],
+                    "category": category,
+                    "description": ' '.join(word.title() for word in Path(item["file"]).stem.split('_')),
+                    "classNames": [item["class"]],
+                })
+
+        spec_items = []
+        modules = sorted({item["file"].split('/')[1] for item in self.screens})
+        for _ in range(int(len(code_items) * 0.8)):
+            code_item = self.random.choice(code_items)
+            roll = self.random.random()
+            if roll < 0.4:
+                name = code_item["description"]
+            elif roll < 0.7:
+                name = ' '.join(word.title() for word in self._words(3))
+            else:
+                name = f"{code_item['classNames'][0]} View"
+            expected_files = [f"lib/{code_item['file']}"] if self.random.random() < 0.5 else []
+            spec_items.append({
+                "name": name,
+                "module": self.random.choice(modules + [""]),
+                "category": code_item["category"],
+                "expectedFiles": expected_files,
+                "priority": self.random.choice(["core", "high", "low"]),
+            })
+
+        self._write("docs/_from_specs.json", json.dumps(spec_items, indent=2))
+        self._write("docs/_from_code.json", json.dumps(code_items, indent=2))
+
+    def generate(self) -> Dict:
+        self.generate_code()
+        modules = self.generate_specs()
+        self.generate_inventories()
+        return {
+            "scale": self.scale,
+            "dart_files": sum(1 for _ in self.lib_dir.rglob("*.dart")),
+            "screens": len(self.screens),
+            "widgets": len(self.widgets),
+            "models": len(self.models),
+            "spec_modules": modules,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Flutter project for benchmarking")
+    parser.add_argument("output", help="Directory to create (lib/, test/ and docs/ are written inside it)")
+    parser.add_argument("--scale", type=int, default=1, help="Multiple of the current project size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = SyntheticProject(Path(args.output), args.scale, args.seed).generate()
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Audit Pipeline Benchmarks
+Runs every audit stage against synthetic projects and compares against a JSON baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from generate_synthetic_project import SyntheticProject
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCHMARKS_DIR.parent / "scripts"
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+
+# Pipeline order: each stage reads the docs/*.json written by the ones before it
+STAGES = [
+    "enhanced_audit_extractor",
+    "generate_comparison_matrices",
+    "parallel_module_auditor",
+    "functional_test_checker",
+    "alignment_analyzer",
+    "generate_audit_report",
+    "generate_comprehensive_audit",
+]
+
+# Whole-pipeline runs after the stages (name -> audit.py arguments). A stage
+# run alone never starts its pool from the scheduler's threads; these do
+PIPELINE_RUNS = {
+    "audit_process_pool": ["--force", "--executor", "process"],
+}
+# A run still going after this long is killed and reported as hung
+PIPELINE_TIMEOUT = 30 * 60  # seconds
+
+# Differences below these are treated as noise, whatever the relative change
+MIN_WALL_DELTA = 0.1  # seconds
+MIN_RSS_DELTA = 8 * 1024  # KiB
+
+
+def run_stage(stage: str, project_dir: Path, script: str = None, args: Sequence[str] = (),
+              timeout: float = None) -> Dict:
+    """Run one stage script (default: <stage>.py) in project_dir; wall time and peak RSS of that process alone
+
+    With a timeout, a run still going is killed along with the pool workers it started.
+    """
+    env = dict(os.environ, PYTHONHASHSEED="0")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, str(SCRIPTS_DIR / (script or f"{stage}.py")), *args],
+        cwd=project_dir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        # Its own process group, so a kill reaches the workers holding stderr open
+        start_new_session=True,
+    )
+    timer = None
+    if timeout is not None:
+        timer = threading.Timer(timeout, os.killpg, (process.pid, signal.SIGKILL))
+        timer.start()
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    wall_time = time.perf_counter() - start
+    if timer is not None:
+        timer.cancel()
+        if wall_time >= timeout:
+            raise RuntimeError(f"{stage} hung: killed after {timeout}s")
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"{stage} failed ({process.returncode}):\n{stderr.decode('utf-8', 'replace')}")
+    return {
+        "wall_time": round(wall_time, 4),
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        "peak_rss_kb": usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss,
+    }
+
+
+def benchmark_scale(scale: int, work_dir: Path, repeat: int = 1, seed: int = 0) -> Dict:
+    """Generate a project at scale and time each stage (best of repeat runs)"""
+    project_dir = work_dir / f"scale_{scale}"
+    if project_dir.exists():
+        shutil.rmtree(project_dir)
+
+    start = time.perf_counter()
+    summary = SyntheticProject(project_dir, scale, seed).generate()
+    print(f"\n{scale}x: {summary['dart_files']} Dart files, {summary['spec_modules']} spec modules "
+          f"(generated in {time.perf_counter() - start:.1f}s)")
+
+    runs_by_stage = [(stage, {}) for stage in STAGES]
+    runs_by_stage += [(name, {"script": "audit.py", "args": args, "timeout": PIPELINE_TIMEOUT})
+                      for name, args in PIPELINE_RUNS.items()]
+    stages = {}
+    for stage, options in runs_by_stage:
+        runs = []
+        for _ in range(repeat):
+            # Measure cold runs: drop the per-file analysis cache between repeats
+            shutil.rmtree(project_dir / ".audit_cache", ignore_errors=True)
+            runs.append(run_stage(stage, project_dir, **options))
+        result = {
+            "wall_time": min(run["wall_time"] for run in runs),
+            "peak_rss_kb": min(run["peak_rss_kb"] for run in runs),
+        }
+        result["files_per_sec"] = round(summary["dart_files"] / result["wall_time"], 1) if result["wall_time"] else 0.0
+        stages[stage] = result
+        print(f"  {stage:32} {result['wall_time']:8.3f}s  {result['peak_rss_kb'] / 1024:7.1f} MiB  "
+              f"{result['files_per_sec']:9.1f} files/s")
+
+    return {"project": summary, "stages": stages}
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Regressions of wall time or peak RSS beyond threshold (a fraction, e.g. 0.25 = +25%)"""
+    regressions = []
+    for scale, current in results["scales"].items():
+        previous = baseline.get("scales", {}).get(scale)
+        if previous is None:
+            continue
+        for stage, metrics in current["stages"].items():
+            old = previous["stages"].get(stage)
+            if old is None:
+                continue
+            checks = (("wall_time", MIN_WALL_DELTA, "s"), ("peak_rss_kb", MIN_RSS_DELTA, " KiB"))
+            for metric, min_delta, unit in checks:
+                before, after = old[metric], metrics[metric]
+                if after - before > min_delta and after > before * (1 + threshold):
+                    regressions.append(
+                        f"{scale}x {stage} {metric}: {before}{unit} -> {after}{unit} "
+                        f"(+{(after / before - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def load_baseline(path: Path) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the audit pipeline on synthetic projects")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="Project sizes as multiples of the current tree (default: 1 10 100)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage; the best is recorded")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown / memory growth before failing (default: 0.25 = +25%%)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Merge these results into the baseline instead of failing on regressions")
+    parser.add_argument("--output", type=Path, help="Also write this run's results to a JSON file")
+    parser.add_argument("--work-dir", type=Path, help="Where to generate projects (default: a temp dir, removed afterwards)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="audit-bench-"))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scales": {},
+    }
+    try:
+        for scale in args.scales:
+            results["scales"][str(scale)] = benchmark_scale(scale, work_dir, args.repeat, args.seed)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline or baseline is None:
+        merged = baseline or {}
+        merged.update({key: value for key, value in results.items() if key != "scales"})
+        merged.setdefault("scales", {}).update(results["scales"])
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
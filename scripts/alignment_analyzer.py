@@ -3,19 +3,49 @@
 Alignment Analyzer - Compare specification and implementation inventories
 """
 
+import argparse
 import json
 import re
-from typing import Dict, List, Set
+import sys
+from typing import Dict, List, Set, Tuple
+from collections import Counter
 from difflib import SequenceMatcher
+from functools import lru_cache
 
+import audit_trace
+from similarity_backends import BACKENDS, SequenceMatcherBackend, get_backend
+
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]')
+
+@lru_cache(maxsize=None)
 def normalize_name(name: str) -> str:
     """Normalize name for comparison"""
-    return re.sub(r'[^a-z0-9]', '', name.lower())
+    return NON_ALNUM_PATTERN.sub('', name.lower())
 
 def similarity_ratio(a: str, b: str) -> float:
     """Calculate similarity between two strings"""
     return SequenceMatcher(None, normalize_name(a), normalize_name(b)).ratio()
 
+@lru_cache(maxsize=None)
+def _char_counts(normalized: str) -> Counter:
+    return Counter(normalized)
+
+def similarity_above(a: str, b: str, threshold: float) -> float:
+    """similarity_ratio(a, b) if it can exceed threshold, else 0.0
+
+    Length and character-multiset bounds (the same ones SequenceMatcher's
+    real_quick_ratio/quick_ratio use) rule out most pairs before the
+    full ratio is computed.
+    """
+    norm_a, norm_b = normalize_name(a), normalize_name(b)
+    total = len(norm_a) + len(norm_b)
+    if total and 2.0 * min(len(norm_a), len(norm_b)) / total <= threshold:
+        return 0.0
+    if total and 2.0 * sum((_char_counts(norm_a) & _char_counts(norm_b)).values()) / total <= threshold:
+        return 0.0
+    return SequenceMatcher(None, norm_a, norm_b).ratio()
+
+@lru_cache(maxsize=None)
 def extract_module_from_path(path: str) -> str:
     """Extract module name from file path"""
     parts = path.split('/')
@@ -25,48 +55,130 @@ def extract_module_from_path(path: str) -> str:
             return parts[idx + 1]
     return ''
 
-def find_matching_code_items(spec_item: Dict, code_items: List[Dict]) -> List[Dict]:
-    """Find code items that match a spec item"""
-    matches = []
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class CandidateIndex:
+    """Blocking index over code items: module buckets, file buckets and path trigram postings
+
+    A code item only scores above the match threshold through a file match
+    (+50) or a module match (+20, plus name similarity), so the union of
+    those buckets is an exact shortlist for find_matching_code_items.
+    """
+
+    def __init__(self, code_items: List[Dict]):
+        self.code_items = code_items
+        self.by_module: Dict[str, List[int]] = {}
+        self.by_file: Dict[str, List[int]] = {}
+        self.file_lengths: Set[int] = set()
+        self.path_trigrams: Dict[str, Set[int]] = {}
+
+        for idx, code_item in enumerate(code_items):
+            code_file = code_item['file']
+            code_module = extract_module_from_path(code_file)
+            if code_module:
+                self.by_module.setdefault(code_module, []).append(idx)
+            self.by_file.setdefault(code_file, []).append(idx)
+            self.file_lengths.add(len(code_file))
+            for gram in trigrams(f"lib/{code_file}"):
+                self.path_trigrams.setdefault(gram, set()).add(idx)
+
+    def _file_matches(self, expected_file: str) -> Set[int]:
+        """Items whose file is inside expected_file, or whose lib/ path contains it"""
+        matches = set()
+
+        # code_item['file'] in expected_file: look up every substring of a known length
+        for length in self.file_lengths:
+            for start in range(len(expected_file) - length + 1):
+                matches.update(self.by_file.get(expected_file[start:start + length], ()))
+
+        # expected_file in f"lib/{code_item['file']}": intersect trigram postings, then verify
+        grams = trigrams(expected_file)
+        if grams:
+            postings = sorted((self.path_trigrams.get(gram, set()) for gram in grams), key=len)
+            shortlist = set(postings[0]).intersection(*postings[1:])
+        else:
+            shortlist = range(len(self.code_items))
+        for idx in shortlist:
+            if expected_file in f"lib/{self.code_items[idx]['file']}":
+                matches.add(idx)
+
+        return matches
+
+    def candidates(self, spec_item: Dict, name_shortlist: Set[int] = None) -> List[int]:
+        """Indices of code items that can reach the match threshold, in inventory order
+
+        name_shortlist (from an approximate similarity backend) narrows the
+        module bucket, whose items only pass on name similarity; file
+        matches always pass and are always scored exactly.
+        """
+        shortlist = set()
+        spec_module = spec_item.get('module', '')
+        if spec_module:
+            module_items = self.by_module.get(spec_module, ())
+            if name_shortlist is not None:
+                module_items = name_shortlist.intersection(module_items)
+            shortlist.update(module_items)
+        for expected_file in spec_item.get('expectedFiles', []):
+            shortlist.update(self._file_matches(expected_file))
+        return sorted(shortlist)
+
+def score_code_item(spec_item: Dict, code_item: Dict) -> Tuple[int, List[str]]:
+    """Score how well a code item matches a spec item"""
+    score = 0
+    reasons = []
     spec_name = spec_item['name']
     spec_module = spec_item.get('module', '')
     expected_files = spec_item.get('expectedFiles', [])
 
-    for code_item in code_items:
-        score = 0
-        reasons = []
-
-        # Check file path matching
-        if expected_files:
-            for expected_file in expected_files:
-                if code_item['file'] in expected_file or expected_file in f"lib/{code_item['file']}":
-                    score += 50
-                    reasons.append(f"file_match:{expected_file}")
-                    break
-
-        # Check module matching
-        code_module = extract_module_from_path(code_item['file'])
-        if code_module and spec_module and code_module == spec_module:
-            score += 20
-            reasons.append(f"module_match:{spec_module}")
-
-        # Check name similarity
-        code_desc = code_item.get('description', '')
-        code_classes = ' '.join(code_item.get('classNames', []))
-
-        name_sim = max(
-            similarity_ratio(spec_name, code_desc),
-            similarity_ratio(spec_name, code_classes),
-            max([similarity_ratio(spec_name, cls) for cls in code_item.get('classNames', [])] or [0])
-        )
+    # Check file path matching
+    if expected_files:
+        for expected_file in expected_files:
+            if code_item['file'] in expected_file or expected_file in f"lib/{code_item['file']}":
+                score += 50
+                reasons.append(f"file_match:{expected_file}")
+                break
+
+    # Check module matching
+    code_module = extract_module_from_path(code_item['file'])
+    if code_module and spec_module and code_module == spec_module:
+        score += 20
+        reasons.append(f"module_match:{spec_module}")
+
+    # Check name similarity (only similarities above 0.6 count, so bound-check first)
+    code_desc = code_item.get('description', '')
+    code_classes = ' '.join(code_item.get('classNames', []))
+
+    name_sim = max(
+        similarity_above(spec_name, code_desc, 0.6),
+        similarity_above(spec_name, code_classes, 0.6),
+        max([similarity_above(spec_name, cls, 0.6) for cls in code_item.get('classNames', [])] or [0])
+    )
+
+    if name_sim > 0.6:
+        score += int(name_sim * 30)
+        reasons.append(f"name_sim:{name_sim:.2f}")
+
+    return score, reasons
+
+def find_matching_code_items(spec_item: Dict, code_items: List[Dict],
+                             index: CandidateIndex = None, name_shortlist: Set[int] = None) -> List[Dict]:
+    """Find code items that match a spec item"""
+    matches = []
+    if index is not None:
+        candidates = index.candidates(spec_item, name_shortlist)
+    else:
+        candidates = range(len(code_items))
 
-        if name_sim > 0.6:
-            score += int(name_sim * 30)
-            reasons.append(f"name_sim:{name_sim:.2f}")
+    for code_idx in candidates:
+        code_item = code_items[code_idx]
+        score, reasons = score_code_item(spec_item, code_item)
 
         if score > 30:  # Threshold for considering it a match
             matches.append({
                 'code_item': code_item,
+                'code_index': code_idx,
                 'score': score,
                 'reasons': reasons
             })
@@ -75,7 +187,12 @@ def find_matching_code_items(spec_item: Dict, code_items: List[Dict]) -> List[Di
     matches.sort(key=lambda x: x['score'], reverse=True)
     return matches
 
-def analyze_alignment(spec_path: str, code_path: str):
+def code_item_texts(code_item: Dict) -> List[str]:
+    """The names a spec item is compared against for one code item"""
+    class_names = code_item.get('classNames', [])
+    return [code_item.get('description', ''), ' '.join(class_names)] + list(class_names)
+
+def analyze_alignment(spec_path: str, code_path: str, backend=None):
     """Perform bidirectional alignment analysis"""
 
     # Load data
@@ -87,10 +204,17 @@ def analyze_alignment(spec_path: str, code_path: str):
 
     alignment_matrix = []
     matched_code_indices = set()
+    index = CandidateIndex(code_items)
+
+    # Optional approximate pre-ranking; SequenceMatcher still re-ranks the shortlist
+    backend = backend or SequenceMatcherBackend()
+    backend.fit([code_item_texts(code_item) for code_item in code_items])
+    name_shortlists = backend.top_k([spec_item['name'] for spec_item in spec_items])
 
     # Process each spec item
-    for spec_item in spec_items:
-        matches = find_matching_code_items(spec_item, code_items)
+    for spec_pos, spec_item in enumerate(spec_items):
+        name_shortlist = name_shortlists[spec_pos] if name_shortlists is not None else None
+        matches = find_matching_code_items(spec_item, code_items, index, name_shortlist)
 
         if not matches:
             # Not implemented
@@ -108,7 +232,7 @@ def analyze_alignment(spec_path: str, code_path: str):
         else:
             best_match = matches[0]
             code_item = best_match['code_item']
-            code_idx = code_items.index(code_item)
+            code_idx = best_match['code_index']
             matched_code_indices.add(code_idx)
 
             expected_files = spec_item.get('expectedFiles', [])
@@ -407,12 +531,30 @@ def generate_markdown_report(alignment_matrix: List[Dict], stats: Dict) -> str:
     return '\n'.join(md)
 
 def main():
+    parser = argparse.ArgumentParser(description="Compare specification and implementation inventories")
+    parser.add_argument("--similarity", choices=sorted(BACKENDS), default="exact",
+                        help="exact: SequenceMatcher on every blocked candidate; "
+                             "ngram: NumPy TF-IDF top-k shortlist, re-ranked exactly")
+    parser.add_argument("--top-k", type=int, default=25, help="Shortlist size per spec item (ngram only)")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.trace:
+        module = sys.modules[__name__]
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(module)
+        audit_trace.instrument(module, "analyze_alignment", "generate_statistics", "generate_markdown_report")
+        audit_trace.instrument(CandidateIndex, "__init__")
+        audit_trace.instrument(module, "find_matching_code_items", cat="item",
+                               label=lambda spec_item, *args: spec_item['name'])
+
     spec_path = 'docs/_from_specs.json'
     code_path = 'docs/_from_code.json'
 
     print("🔍 Analyzing specification and code inventories...")
 
-    alignment_matrix = analyze_alignment(spec_path, code_path)
+    options = {"k": args.top_k} if args.similarity != "exact" else {}
+    alignment_matrix = analyze_alignment(spec_path, code_path, get_backend(args.similarity, **options))
     stats = generate_statistics(alignment_matrix)
 
     print(f"✅ Analysis complete:")
@@ -425,7 +567,7 @@ def main():
     print(f"   - Coverage: {stats.get('implementation_percentage', 0)}%")
 
     # Write alignment matrix
-    with open('docs/_alignment_matrix.json', 'w') as f:
+    with audit_trace.span("write _alignment_matrix.json"), open('docs/_alignment_matrix.json', 'w') as f:
         json.dump(alignment_matrix, f, indent=2)
     print("\n📄 Generated: docs/_alignment_matrix.json")
 
@@ -436,6 +578,7 @@ def main():
     print("📄 Generated: docs/_alignment_report.md")
 
     print("\n✨ Alignment analysis complete!")
+    audit_trace.finish()
 
 if __name__ == '__main__':
     main()
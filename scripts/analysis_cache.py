@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Analysis Cache
+Persists per-file analysis results in SQLite, keyed by path and content hash
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional
+
+CACHE_DIR_NAME = ".audit_cache"
+CACHE_DB_NAME = "analysis.sqlite3"
+
+
+class AnalysisCache:
+    """Per-file result cache for one analyzer, invalidated by the analyzer's version"""
+
+    def __init__(self, root_dir: Path, analyzer: str, version: str):
+        self.cache_dir = Path(root_dir) / CACHE_DIR_NAME
+        self.analyzer = analyzer
+        self.version = str(version)
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.cache_dir / CACHE_DB_NAME))
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS analysis (
+                analyzer TEXT NOT NULL,
+                path TEXT NOT NULL,
+                version TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (analyzer, path)
+            )"""
+        )
+        # Results written by another analyzer version can never be hits again
+        self.conn.execute(
+            "DELETE FROM analysis WHERE analyzer = ? AND version != ?",
+            (self.analyzer, self.version),
+        )
+        self.conn.commit()
+
+    def get(self, path: str, content_hash: str) -> Optional[Dict]:
+        """Return the cached result for path if its content is unchanged"""
+        row = self.conn.execute(
+            "SELECT result FROM analysis WHERE analyzer = ? AND path = ? AND version = ? AND content_hash = ?",
+            (self.analyzer, path, self.version, content_hash),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, path: str, content_hash: str, result: Dict):
+        """Store (or replace) the result for path"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO analysis (analyzer, path, version, content_hash, result) VALUES (?, ?, ?, ?, ?)",
+            (self.analyzer, path, self.version, content_hash, json.dumps(result)),
+        )
+
+    def flush(self):
+        """Commit pending writes"""
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
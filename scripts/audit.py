@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Audit Pipeline
+Runs every audit stage in one process, handing results from stage to stage in memory
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import alignment_analyzer
+import audit_extractor
+import audit_trace
+import comprehensive_audit
+import const_checker
+import enhanced_audit_extractor
+import functional_test_checker
+import generate_comparison_matrices
+import handler_extractor
+import identifier_index
+import navigation_graph
+import parallel_module_auditor
+import rebuild_checker
+import render_checker
+import spec_outline
+from alignment_analyzer import analyze_alignment, generate_markdown_report, generate_statistics
+from audit_diff import diff_main
+from audit_store import STORE_FILE, build_rows, query_main, write_store
+from audit_watch import AuditWatcher, changed_since
+from audit_extractor import AuditExtractor
+from comprehensive_audit import ComprehensiveAuditor
+from const_checker import ConstChecker
+from enhanced_audit_extractor import EnhancedAuditExtractor
+from functional_test_checker import FunctionalTestChecker
+from generate_audit_report import AuditReportGenerator
+from generate_comparison_matrices import ComparisonMatrixGenerator
+from generate_comprehensive_audit import generate_comprehensive_report
+from navigation_graph import NavigationGraph, to_dot
+from parallel_module_auditor import ParallelModuleAuditor
+from rebuild_checker import RebuildChecker
+from render_checker import RenderChecker
+from source_corpus import SourceCorpus
+from stage_scheduler import Stage, StageScheduler
+
+ALIGNMENT_SPEC_INVENTORY = "docs/_from_specs.json"
+ALIGNMENT_CODE_INVENTORY = "docs/_from_code.json"
+PRODUCT_DEFINITION = "docs/specs/Product_Definition_v2.5.1_10of10.md"
+
+
+class AuditPipeline:
+    """The audit stages wired together over one shared SourceCorpus
+
+    Each stage declares what it reads (spec files, lib/ globs, the scripts
+    that implement it, upstream stages); StageScheduler re-runs only the
+    stages whose inputs changed and runs independent ones concurrently.
+    Stage objects are created inside their runners, on the worker thread
+    that uses them (the extractor's sqlite cache is thread-bound).
+    """
+
+    def __init__(self, root_dir: str = ".", write_json: bool = False, use_cache: bool = True,
+                 executor: str = "thread", workers: int = 8, jobs: int = 4, force: bool = False,
+                 store: bool = False):
+        self.root_dir = Path(root_dir)
+        self.corpus = SourceCorpus.shared(self.root_dir / "lib")
+        # Stages share one lexed view per file instead of each lexing its own
+        self.corpus.retain_lexed = True
+        self.write_json = write_json
+        self.store = store
+        self.use_cache = use_cache
+        self.executor = executor
+        self.workers = workers
+        self.stages = self._build_stages()
+        # Without the per-file cache, stage results are not trusted either
+        self.scheduler = StageScheduler(self.root_dir, self.stages, jobs=jobs, force=force or not use_cache)
+
+    @property
+    def results(self) -> Dict[str, object]:
+        return self.scheduler.results
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        return self.scheduler.timings
+
+    def _json(self, rel_path: str):
+        """A JSON artifact, written only with --write-json"""
+        if not self.write_json:
+            return []
+        return [(rel_path, lambda result: self._write_json(rel_path, result))]
+
+    def _build_stages(self) -> List[Stage]:
+        """Stages in dependency order"""
+        root = str(self.root_dir)
+        stages = [
+            Stage("extraction", [],
+                  lambda r: EnhancedAuditExtractor(root, corpus=self.corpus, use_cache=self.use_cache).run_extraction(),
+                  inputs=[PRODUCT_DEFINITION, "lib/screens/**/*.dart", "lib/widgets/**/*.dart", "lib/models/**/*.dart"],
+                  code=["enhanced_audit_extractor.py"],
+                  outputs=self._json("docs/enhanced_audit_extraction.json")),
+            Stage("matrices", ["extraction"],
+                  lambda r: ComparisonMatrixGenerator(root).generate_all_matrices(r["extraction"]),
+                  code=["generate_comparison_matrices.py"],
+                  outputs=self._json("docs/comparison_matrices.json")),
+            Stage("module_audit", ["extraction"],
+                  lambda r: ParallelModuleAuditor(root, corpus=self.corpus).audit_all_modules_parallel(
+                      executor=self.executor, workers=self.workers, data=r["extraction"]),
+                  inputs=["lib/**/*.dart", "test/**/*.dart"],
+                  code=["parallel_module_auditor.py"],
+                  outputs=self._json("docs/parallel_audit_results.json")),
+            Stage("functional", [],
+                  lambda r: FunctionalTestChecker(root, corpus=self.corpus).run_checks(
+                      executor=self.executor, workers=self.workers),
+                  inputs=["lib/**/*.dart"],
+                  code=["functional_test_checker.py"],
+                  outputs=self._json("docs/functional_test_issues.json")),
+            Stage("render", [],
+                  lambda r: RenderChecker(root, corpus=self.corpus).run_checks(),
+                  inputs=["lib/screens/**/*.dart"],
+                  code=["render_checker.py"],
+                  outputs=self._json("docs/render_performance_issues.json")),
+            Stage("rebuild", [],
+                  lambda r: RebuildChecker(root, corpus=self.corpus).run_checks(),
+                  inputs=["lib/screens/**/*.dart"],
+                  code=["rebuild_checker.py"],
+                  outputs=self._json("docs/rebuild_cost.json")),
+            Stage("const", [],
+                  lambda r: ConstChecker(root, corpus=self.corpus).run_checks(),
+                  inputs=["lib/**/*.dart"],
+                  code=["const_checker.py"],
+                  outputs=self._json("docs/const_opportunities.json")),
+            Stage("navigation", [],
+                  lambda r: NavigationGraph(self.corpus).analyze(),
+                  inputs=["lib/**/*.dart"],
+                  code=["navigation_graph.py"],
+                  outputs=self._json("docs/navigation_graph.json") + [
+                      ("docs/navigation_graph.dot",
+                       lambda graph: self._write_text("docs/navigation_graph.dot", to_dot(graph)))]),
+            Stage("audit_report", ["matrices", "extraction"],
+                  lambda r: AuditReportGenerator(root).generate_full_report(r["matrices"], r["extraction"]),
+                  code=["generate_audit_report.py"],
+                  outputs=[("docs/COMPREHENSIVE_AUDIT_REPORT.md",
+                            lambda report: self._write_text("docs/COMPREHENSIVE_AUDIT_REPORT.md", report))]),
+            Stage("final_report", ["module_audit", "functional", "extraction"],
+                  lambda r: generate_comprehensive_report(r["module_audit"], r["functional"], r["extraction"]),
+                  code=["generate_comprehensive_audit.py"],
+                  outputs=[("docs/COMPREHENSIVE_AUDIT_FINAL.md",
+                            lambda report: self._write_text("docs/COMPREHENSIVE_AUDIT_FINAL.md", report))]),
+            Stage("audit_extraction", [],
+                  lambda r: AuditExtractor(root, corpus=self.corpus).run_extraction(),
+                  inputs=[PRODUCT_DEFINITION, "lib/**/*.dart"],
+                  code=["audit_extractor.py"],
+                  outputs=self._json("docs/audit_extraction.json")),
+            Stage("comprehensive_audit", ["audit_extraction"],
+                  lambda r: ComprehensiveAuditor(root, corpus=self.corpus).run_comprehensive_audit(r["audit_extraction"]),
+                  inputs=["lib/**/*.dart"],
+                  code=["comprehensive_audit.py"],
+                  outputs=self._json("docs/comprehensive_audit_results.json")),
+        ]
+
+        if self.store:
+            stages.append(Stage("store", ["extraction", "functional", "module_audit"],
+                                lambda r: build_rows(r["extraction"], r["functional"], r["module_audit"]),
+                                code=["audit_store.py"],
+                                outputs=[(STORE_FILE, self._write_store)]))
+
+        # Alignment runs only where the spec/code inventories have been exported
+        if (self.root_dir / ALIGNMENT_SPEC_INVENTORY).exists() and (self.root_dir / ALIGNMENT_CODE_INVENTORY).exists():
+            outputs = [("docs/_alignment_report.md",
+                        lambda result: self._write_text("docs/_alignment_report.md", result["report"]))]
+            if self.write_json:
+                outputs.insert(0, ("docs/_alignment_matrix.json",
+                                   lambda result: self._write_json("docs/_alignment_matrix.json", result["matrix"])))
+            stages.append(Stage("alignment", [], self._run_alignment,
+                                inputs=[ALIGNMENT_SPEC_INVENTORY, ALIGNMENT_CODE_INVENTORY],
+                                code=["alignment_analyzer.py"],
+                                outputs=outputs))
+        return stages
+
+    def _run_alignment(self, results: Dict) -> Dict:
+        matrix = analyze_alignment(str(self.root_dir / ALIGNMENT_SPEC_INVENTORY),
+                                   str(self.root_dir / ALIGNMENT_CODE_INVENTORY))
+        stats = generate_statistics(matrix)
+        return {"matrix": matrix, "stats": stats, "report": generate_markdown_report(matrix, stats)}
+
+    def _write_json(self, rel_path: str, data):
+        with open(self.root_dir / rel_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        print(f"Results saved to {rel_path}")
+
+    def _write_store(self, rows: Dict):
+        write_store(self.root_dir / STORE_FILE, rows)
+        print(f"Store saved to {STORE_FILE}")
+
+    def _write_text(self, rel_path: str, text: str):
+        with open(self.root_dir / rel_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"Report saved to {rel_path}")
+
+    def run(self) -> Dict[str, object]:
+        return self.scheduler.run()
+
+    def baseline(self) -> Optional[Dict[str, object]]:
+        """The cached stage results --since builds on, from the last full run (None if incomplete)"""
+        try:
+            return {name: self.scheduler.result(name)
+                    for name in ("extraction", "functional", "module_audit", "navigation")}
+        except (OSError, ValueError):
+            return None
+
+    def print_timings(self):
+        print("\nStage timings:")
+        for stage in self.stages:
+            status = self.scheduler.status.get(stage.name, "")
+            print(f"  {stage.name:20} {self.timings.get(stage.name, 0.0):8.3f}s  {status}")
+        print(f"  {'total':20} {self.timings['total']:8.3f}s")
+
+
+def instrument_stages():
+    """Trace every stage module's compiled patterns and per-file analyzers"""
+    for module in (enhanced_audit_extractor, functional_test_checker, parallel_module_auditor,
+                   generate_comparison_matrices, alignment_analyzer, spec_outline,
+                   audit_extractor, comprehensive_audit, identifier_index, handler_extractor, navigation_graph,
+                   render_checker, const_checker, rebuild_checker):
+        audit_trace.instrument_patterns(module)
+    audit_trace.instrument(
+        EnhancedAuditExtractor, "_analyze_screen_file", "_analyze_widget_file", "_analyze_model_file",
+        cat="file", label=lambda self, source: source.rel_path,
+    )
+    audit_trace.instrument(FunctionalTestChecker, "_check_screen", cat="file",
+                           label=lambda self, source: source.rel_path)
+    audit_trace.instrument(RenderChecker, "check_screen", cat="file", label=lambda self, source: source.rel_path)
+    audit_trace.instrument(RebuildChecker, "check_screen", cat="file", label=lambda self, source: source.rel_path)
+    audit_trace.instrument(ConstChecker, "check_file", cat="file", label=lambda self, source: source.rel_path)
+    audit_trace.instrument(parallel_module_auditor, "_scan_work_unit", cat="file", label=lambda item: item[0])
+
+
+def run_since(args, baseline: Dict[str, object]) -> int:
+    """Re-check only the screens and modules touched since args.since, on top of the cached baseline"""
+    start = time.perf_counter()
+    try:
+        changed = changed_since(Path(args.root), args.since)
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 2
+    watcher = AuditWatcher(args.root, use_cache=not args.no_cache)
+    watcher.seed(baseline["extraction"], baseline["functional"], baseline["module_audit"], changed,
+                 baseline["navigation"]["classes"])
+    relevant = sorted(path for path in changed if path.startswith(("lib/", "docs/specs/")))
+    affected = watcher.refresh(set(relevant))
+    print(f"\n✅ {len(relevant)} changed file(s) since {args.since}: re-audited {len(affected)} module(s) "
+          f"in {time.perf_counter() - start:.2f}s")
+    if affected:
+        print(f"   Modules: {', '.join(affected)}")
+    audit_trace.finish()
+    return 0
+
+
+COMMANDS = {
+    "query": query_main,
+    "diff": diff_main,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Run the whole frontend audit in one process",
+        epilog="Subcommands: query (ask the --store database one question), diff <old> <new> "
+               "(what changed between two runs); see `audit.py <subcommand> -h`",
+    )
+    parser.add_argument("--root", default=".", help="Project root containing lib/ and docs/ (default: .)")
+    parser.add_argument("--write-json", action="store_true",
+                        help="Also write the intermediate docs/*.json artifacts (markdown reports are always written)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-analyze every file, ignoring .audit_cache/")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="Pool used for the module auditor's per-file scans (process also shards the "
+                             "functional checks; with thread they run serially)")
+    parser.add_argument("--workers", type=int, default=8, help="Number of pool workers")
+    parser.add_argument("--jobs", type=int, default=4, help="Independent stages run concurrently (default: 4)")
+    parser.add_argument("--force", action="store_true", help="Re-run every stage, even if its inputs are unchanged")
+    parser.add_argument("--store", action="store_true",
+                        help=f"Also mirror the results into the SQLite store {STORE_FILE} (see `audit.py query`)")
+    parser.add_argument("--since", metavar="REV",
+                        help="Only re-audit what changed since git revision REV, merging everything else from "
+                             "the cached results of the last full run (which should have been made at REV)")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the audit, keep watching lib/ and docs/specs/ and re-audit only what changes")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between --watch polls (default: 1.0)")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        instrument_stages()
+
+    pipeline = AuditPipeline(args.root, write_json=args.write_json, use_cache=not args.no_cache,
+                             executor=args.executor, workers=args.workers, jobs=args.jobs, force=args.force,
+                             store=args.store)
+    if args.since:
+        baseline = pipeline.baseline()
+        if baseline is not None:
+            return run_since(args, baseline)
+        print("⚠️  No cached results to merge into; running the full audit")
+    if args.watch:
+        # Snapshot the tree before the run, so an edit made while it runs shows up in the first poll
+        watcher = AuditWatcher(args.root, use_cache=not args.no_cache, interval=args.interval)
+    pipeline.run()
+    pipeline.print_timings()
+    print(f"\n✅ Audit complete in {pipeline.timings['total']:.2f}s")
+    if args.watch:
+        # Start from this run's results, as --since does, rather than re-auditing everything
+        baseline = pipeline.baseline()
+        if baseline is not None:
+            watcher.seed(baseline["extraction"], baseline["functional"], baseline["module_audit"], set(),
+                         baseline["navigation"]["classes"])
+        watcher.watch()
+    audit_trace.finish()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
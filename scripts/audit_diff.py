@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Audit Diff
+Compares two audit snapshots by stable item identity and reports what was added, removed or changed
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# key is "<module>|<path>|<kind>|<span hash>" (plus "#n" for repeats within one
+# snapshot); digest hashes the comparable payload, so line moves alone are
+# not changes; finding marks problems (as opposed to inventory items)
+Record = namedtuple("Record", "key artifact module path kind label line digest finding")
+
+# Location fields never take part in the comparison
+LOCATION_FIELDS = ("screen", "line", "column", "span", "spans")
+EXTRACTION_FILE = "enhanced_audit_extraction.json"
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def _digest(payload) -> str:
+    return _hash(json.dumps(payload, sort_keys=True, separators=(',', ':')))
+
+
+def _anchor(entry: Dict) -> str:
+    """The text identifying an entry within its file (whitespace-normalized code when there is any)"""
+    for field in ("code", "method", "target", "issue"):
+        if entry.get(field):
+            return " ".join(str(entry[field]).split())
+    return ""
+
+
+def _functional_records(data: Dict, screens: Dict[str, Tuple[str, str]]) -> Iterator[Tuple]:
+    for kind, entries in data.items():
+        for entry in entries:
+            path, module = screens.get(entry.get('screen'), (entry.get('screen'), None))
+            payload = {key: value for key, value in entry.items() if key not in LOCATION_FIELDS}
+            label = entry.get('issue') or entry.get('error') or ", ".join(entry.get('missing_states', [])) \
+                or f"{entry.get('count', 0)} TODO(s)"
+            yield module, path, kind, _anchor(entry), label, entry.get('line'), payload, True
+
+
+def _extraction_records(data: Dict, screens: Dict[str, Tuple[str, str]]) -> Iterator[Tuple]:
+    for number, module in data.get('modules', {}).items():
+        yield number, None, "module", number, module.get('name'), None, module, False
+    for kind, key in (("screen", 'screens'), ("widget", 'widgets'), ("model", 'models')):
+        for item in data.get(key, []):
+            yield item.get('module'), item.get('path'), kind, "", item.get('name'), None, item, False
+
+
+def _module_audit_records(data: Dict, screens: Dict[str, Tuple[str, str]]) -> Iterator[Tuple]:
+    for number, audit in data.items():
+        if not isinstance(audit, dict):
+            continue
+        for capability in audit.get('capabilities', {}).get('list', []):
+            yield (number, None, "capability", capability.get('name'), capability.get('name'), None,
+                   capability, False)
+        for screen in audit.get('screens', {}).get('list', []):
+            yield number, screen.get('path'), "screen_status", "", screen.get('status'), None, screen, False
+        for issue in audit.get('buttons_links', {}).get('issues', []):
+            path, _ = screens.get(issue.get('screen'), (issue.get('screen'), None))
+            payload = {key: value for key, value in issue.items() if key not in LOCATION_FIELDS}
+            yield number, path, "dead_button", _anchor(issue), issue.get('issue'), None, payload, True
+
+
+def _matrix_records(data: Dict, screens: Dict[str, Tuple[str, str]]) -> Iterator[Tuple]:
+    """Per-module specs_to_code / code_to_specs lists (comparison matrices and the comprehensive audit)"""
+    modules = data.get('modules', data)
+    for number, module in modules.items():
+        if not isinstance(module, dict):
+            continue
+        for side in ("specs_to_code", "code_to_specs"):
+            for name, items in module.get(side, {}).items():
+                for item in items if isinstance(items, list) else []:
+                    if not isinstance(item, dict):
+                        item = {"name": item}
+                    anchor = item.get('capability') or item.get('name') or item.get('screen') or ""
+                    yield (number, item.get('path'), f"{side}.{name}", anchor, anchor or item.get('path'), None,
+                           item, False)
+
+
+ARTIFACTS = {
+    "functional_test_issues.json": _functional_records,
+    EXTRACTION_FILE: _extraction_records,
+    "parallel_audit_results.json": _module_audit_records,
+    "comparison_matrices.json": _matrix_records,
+    "comprehensive_audit_results.json": _matrix_records,
+}
+
+
+def load_snapshot(path: Path) -> Dict[str, Dict]:
+    """Artifact name -> parsed JSON for a snapshot directory (or a single artifact file)"""
+    path = Path(path)
+    if path.is_dir():
+        files = [path / name for name in ARTIFACTS if (path / name).exists()]
+    elif path.name in ARTIFACTS:
+        files = [path]
+    else:
+        raise ValueError(f"{path} is neither a snapshot directory nor one of: {', '.join(ARTIFACTS)}")
+    snapshot = {}
+    for file in files:
+        with open(file, 'r', encoding='utf-8') as f:
+            snapshot[file.name] = json.load(f)
+    return snapshot
+
+
+def screen_index(*snapshots: Dict[str, Dict]) -> Dict[str, Tuple[str, str]]:
+    """Screen name -> (path, module) from the snapshots' extractions (later snapshots win)"""
+    index = {}
+    for snapshot in snapshots:
+        for screen in snapshot.get(EXTRACTION_FILE, {}).get('screens', []):
+            index[screen.get('name')] = (screen.get('path'), screen.get('module'))
+    return index
+
+
+def records(snapshot: Dict[str, Dict], screens: Dict[str, Tuple[str, str]]) -> Dict[str, Record]:
+    """Every item of the snapshot keyed by its stable identity"""
+    keyed = {}
+    for artifact, data in snapshot.items():
+        for module, path, kind, anchor, label, line, payload, finding in ARTIFACTS[artifact](data, screens):
+            base = f"{artifact}|{module or ''}|{path or ''}|{kind}|{_hash(anchor)}"
+            key = base
+            repeat = 1
+            while key in keyed:
+                repeat += 1
+                key = f"{base}#{repeat}"
+            keyed[key] = Record(key, artifact, module, path, kind, label, line, _digest(payload), finding)
+    return keyed
+
+
+def diff_snapshots(old: Dict[str, Dict], new: Dict[str, Dict]) -> Dict[str, List[Record]]:
+    """Added, removed and changed records (one hash join each way) for the artifacts both snapshots have"""
+    shared = set(old) & set(new)
+    screens = screen_index(old, new)
+    before = records({name: old[name] for name in shared}, screens)
+    after = records({name: new[name] for name in shared}, screens)
+    delta = {"added": [], "removed": [], "changed": []}
+    for key, record in after.items():
+        previous = before.get(key)
+        if previous is None:
+            delta["added"].append(record)
+        elif previous.digest != record.digest:
+            delta["changed"].append(record)
+    delta["removed"] = [record for key, record in before.items() if key not in after]
+    delta["unchanged"] = len(after) - len(delta["added"]) - len(delta["changed"])
+    delta["artifacts"] = sorted(shared)
+    return delta
+
+
+def render(delta: Dict, old_label: str, new_label: str, limit: int = 20) -> str:
+    """Compact text report: per-artifact counts, then up to limit items per artifact"""
+    lines = [f"Audit diff: {old_label} → {new_label}"]
+    marks = (("added", "+"), ("removed", "-"), ("changed", "~"))
+    for artifact in delta["artifacts"]:
+        grouped = {change: [r for r in delta[change] if r.artifact == artifact] for change, _ in marks}
+        counts = " ".join(f"{mark}{len(grouped[change])}" for change, mark in marks)
+        lines.append(f"\n{artifact}: {counts}")
+        shown = 0
+        for change, mark in marks:
+            for record in grouped[change]:
+                if shown == limit:
+                    break
+                location = (record.path or record.module or "") + (f":{record.line}" if record.line else "")
+                lines.append(f"  {mark} {record.kind:24} {location}  {record.label or ''}".rstrip())
+                shown += 1
+        hidden = sum(len(items) for items in grouped.values()) - shown
+        if hidden > 0:
+            lines.append(f"  … {hidden} more")
+    totals = " ".join(f"{mark}{len(delta[change])}" for change, mark in marks)
+    lines.append(f"\nTotal: {totals} ({delta['unchanged']} unchanged)")
+    return "\n".join(lines)
+
+
+def diff_main(argv: Optional[List[str]] = None) -> int:
+    """`audit diff`: compare two snapshots (docs/ directories or single artifacts)"""
+    parser = argparse.ArgumentParser(prog="audit diff", description="Show what changed between two audit runs")
+    parser.add_argument("old", type=Path,
+                        help="Earlier snapshot: a directory of audit JSON (e.g. docs/archive) or one file")
+    parser.add_argument("new", type=Path, help="Later snapshot (e.g. docs)")
+    parser.add_argument("--limit", type=int, default=20, help="Items listed per artifact (default: 20)")
+    parser.add_argument("--json", action="store_true", help="Print the delta as JSON")
+    parser.add_argument("--fail-on-added", action="store_true",
+                        help="Exit with status 1 if the new snapshot adds any finding (for CI gating)")
+    args = parser.parse_args(argv)
+
+    try:
+        old, new = load_snapshot(args.old), load_snapshot(args.new)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    delta = diff_snapshots(old, new)
+    if args.json:
+        print(json.dumps({
+            change: [record._asdict() for record in delta[change]] for change in ("added", "removed", "changed")
+        }, indent=2))
+    else:
+        print(render(delta, str(args.old), str(args.new), args.limit))
+    if args.fail_on_added and any(record.finding for record in delta["added"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(diff_main())
@@ -7,14 +7,24 @@ Extracts structured data from specs and code for comparison
 import os
 import re
 import json
+import argparse
 from pathlib import Path
 from typing import Dict, List, Set
 
+import audit_trace
+import spec_outline
+from source_corpus import SourceCorpus, SourceFile
+from spec_outline import SpecOutline
+
+WIDGET_METHOD_PATTERN = re.compile(r'Widget\s+_build(\w+)\([^)]*\)')
+ACTION_METHOD_PATTERN = re.compile(r'void\s+_handle(\w+)\([^)]*\)')
+
 class AuditExtractor:
-    def __init__(self, root_dir: str):
+    def __init__(self, root_dir: str, corpus: SourceCorpus = None):
         self.root_dir = Path(root_dir)
         self.specs_dir = self.root_dir / "docs" / "specs"
         self.code_dir = self.root_dir / "lib"
+        self.corpus = corpus or SourceCorpus.shared(self.code_dir)
         self.results = {
             "modules": {},
             "screens": [],
@@ -30,35 +40,25 @@ class AuditExtractor:
             return {}
         
         modules = {}
-        current_module = None
         
-        with open(product_def, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Find all module sections (### 3.X)
-        module_pattern = r'^### 3\.(\d+)\s+(.+?)$'
-        matches = re.finditer(module_pattern, content, re.MULTILINE)
+        # Find all module sections (### 3.X) in a single pass over the spec
+        outline = SpecOutline.from_file(product_def)
         
-        for match in matches:
-            module_num = match.group(1)
-            module_name = match.group(2).strip()
+        for module_num, section in outline.modules().items():
+            # Capabilities are the top-level "- **Name:**" bullets of the module
+            capabilities = []
+            for bullet in section.top_level_bullets():
+                named = bullet.bold_name()
+                if named:
+                    capabilities.append(named[0])
+            
             modules[module_num] = {
                 "number": module_num,
-                "name": module_name,
+                "name": section.name,
                 "features": [],
-                "capabilities": []
+                "capabilities": capabilities
             }
         
-        # Extract core capabilities for each module
-        for module_num, module_data in modules.items():
-            pattern = rf'^### 3\.{module_num}\s+{re.escape(module_data["name"])}(.*?)(?=^### 3\.|\Z)'
-            match = re.search(pattern, content, re.MULTILINE | re.DOTALL)
-            if match:
-                section = match.group(1)
-                # Extract capabilities
-                capabilities = re.findall(r'^- \*\*(.+?)\*\*:', section, re.MULTILINE)
-                module_data["capabilities"] = capabilities
-        
         return modules
     
     def extract_screens_from_code(self):
@@ -68,15 +68,13 @@ class AuditExtractor:
             return []
         
         screens = []
-        for screen_file in screens_dir.rglob("*.dart"):
-            if screen_file.name.endswith("_screen.dart") or screen_file.name == "main_navigation.dart":
-                rel_path = screen_file.relative_to(self.code_dir)
-                screens.append({
-                    "path": str(rel_path),
-                    "name": screen_file.stem,
-                    "module": self._infer_module(screen_file),
-                    "features": self._extract_features_from_screen(screen_file)
-                })
+        for source in self.corpus.screens():
+            screens.append({
+                "path": source.rel_path,
+                "name": source.stem,
+                "module": self._infer_module(source.path),
+                "features": self._extract_features_from_screen(source)
+            })
         
         return screens
     
@@ -104,25 +102,22 @@ class AuditExtractor:
             return module_map.get(parent, "unknown")
         return "unknown"
     
-    def _extract_features_from_screen(self, screen_file: Path) -> List[str]:
+    def _extract_features_from_screen(self, source: SourceFile) -> List[str]:
         """Extract feature names from screen file"""
         features = []
         try:
-            with open(screen_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            code = source.code
             
             # Look for widget methods that indicate features
-            widget_pattern = r'Widget\s+_build(\w+)\([^)]*\)'
-            widgets = re.findall(widget_pattern, content)
+            widgets = WIDGET_METHOD_PATTERN.findall(code)
             features.extend([f"build_{w.lower()}" for w in widgets])
             
             # Look for action methods
-            action_pattern = r'void\s+_handle(\w+)\([^)]*\)'
-            actions = re.findall(action_pattern, content)
+            actions = ACTION_METHOD_PATTERN.findall(code)
             features.extend([f"handle_{a.lower()}" for a in actions])
             
         except Exception as e:
-            print(f"Error reading {screen_file}: {e}")
+            print(f"Error reading {source.path}: {e}")
         
         return features
     
@@ -133,12 +128,11 @@ class AuditExtractor:
             return []
         
         widgets = []
-        for widget_file in widgets_dir.rglob("*.dart"):
-            rel_path = widget_file.relative_to(self.code_dir)
+        for source in self.corpus.under("widgets"):
             widgets.append({
-                "path": str(rel_path),
-                "name": widget_file.stem,
-                "category": self._infer_widget_category(widget_file)
+                "path": source.rel_path,
+                "name": source.stem,
+                "category": self._infer_widget_category(source.path)
             })
         
         return widgets
@@ -157,11 +151,10 @@ class AuditExtractor:
             return []
         
         models = []
-        for model_file in models_dir.rglob("*.dart"):
-            rel_path = model_file.relative_to(self.code_dir)
+        for source in self.corpus.under("models"):
             models.append({
-                "path": str(rel_path),
-                "name": model_file.stem
+                "path": source.rel_path,
+                "name": source.stem
             })
         
         return models
@@ -190,6 +183,22 @@ class AuditExtractor:
         print(f"Results saved to {output_path}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract modules, screens, widgets and models for the audit")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument_patterns(spec_outline)
+        audit_trace.instrument(
+            AuditExtractor,
+            "run_extraction", "extract_modules_from_specs", "extract_screens_from_code",
+            "extract_widgets_from_code", "extract_models_from_code", "save_results",
+        )
+        audit_trace.instrument(AuditExtractor, "_extract_features_from_screen", cat="file",
+                               label=lambda self, source: source.rel_path)
+    
     extractor = AuditExtractor(".")
     results = extractor.run_extraction()
     extractor.save_results("docs/audit_extraction.json")
@@ -198,4 +207,4 @@ if __name__ == "__main__":
     print(f"Screens found: {len(results['screens'])}")
     print(f"Widgets found: {len(results['widgets'])}")
     print(f"Models found: {len(results['models'])}")
-
+    audit_trace.finish()
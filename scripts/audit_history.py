@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Audit History
+Per-module coverage, missing-state and dead-button trends across commits, read straight from git objects
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import audit_trace
+from analysis_cache import AnalysisCache
+from enhanced_audit_extractor import EnhancedAuditExtractor, screen_module
+from parallel_module_auditor import ParallelModuleAuditor, scan_screen
+from source_corpus import SourceCorpus, SourceFile
+from spec_outline import SpecOutline
+
+HISTORY_VERSION = "2"
+SCREENS_DIR = "lib/screens"
+SPEC_FILE = "docs/specs/Product_Definition_v2.5.1_10of10.md"
+OUTPUT_FILE = "docs/audit_history.json"
+# Blobs analyzed per pool round (bounds how many decoded sources are held at once)
+BLOB_BATCH = 256
+METRICS = ("capability_coverage", "capabilities", "missing_states", "dead_buttons")
+
+
+class GitObjects:
+    """Reads commits, trees and blobs through one long-lived `git cat-file --batch` process"""
+
+    def __init__(self, repo_dir: Path):
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"], cwd=repo_dir,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+        # (tree oid, repo path of the tree) -> [(repo path, blob oid)] of the wanted files below it
+        self._trees: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+
+    def read(self, rev: str) -> Tuple[str, bytes]:
+        """(object type, raw content) of rev"""
+        self.process.stdin.write(rev.encode('utf-8') + b"\n")
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().decode('utf-8').split()
+        if len(header) != 3:
+            raise KeyError(f"git object {rev} not found")
+        _, kind, size = header
+        data = self.process.stdout.read(int(size))
+        self.process.stdout.read(1)  # trailing newline
+        return kind, data
+
+    @staticmethod
+    def _entries(data: bytes) -> Iterator[Tuple[str, str, str]]:
+        """(mode, name, oid) of a raw tree object"""
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            yield data[pos:space].decode(), data[space + 1:nul].decode('utf-8'), data[nul + 1:nul + 21].hex()
+            pos = nul + 21
+
+    def files(self, commit: str, wanted: List[str]) -> Dict[str, str]:
+        """Repo path -> blob oid of the files at or below the wanted repo paths in commit
+
+        Subtrees are memoized by object id, so a directory unchanged since an
+        earlier commit is never read again.
+        """
+        _, data = self.read(commit)
+        tree = data.split(b"\n", 1)[0].split()[1].decode()
+        return dict(self._walk(tree, "", wanted))
+
+    def _walk(self, tree: str, prefix: str, wanted: List[str]) -> List[Tuple[str, str]]:
+        key = (tree, prefix)
+        if key not in self._trees:
+            found = []
+            for mode, name, oid in self._entries(self.read(tree)[1]):
+                path = prefix + name
+                inside = any(path == w or path.startswith(w + "/") for w in wanted)
+                if mode == "40000":
+                    if inside or any(w.startswith(path + "/") for w in wanted):
+                        found.extend(self._walk(oid, path + "/", wanted))
+                elif inside and not mode.startswith("120"):
+                    found.append((path, oid))
+            self._trees[key] = found
+        return self._trees[key]
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+_worker_extractor: Optional[EnhancedAuditExtractor] = None
+
+
+def _analyze_blob(item: Tuple[str, str, str]) -> Tuple[str, Dict]:
+    """Pool entry point: (root_dir, lib-relative path, text) -> (path, {"screen", "scan"})"""
+    global _worker_extractor
+    root_dir, rel_path, text = item
+    if _worker_extractor is None:
+        _worker_extractor = EnhancedAuditExtractor(root_dir, corpus=SourceCorpus.from_files(Path(root_dir) / "lib", {}),
+                                                   use_cache=False)
+    source = SourceFile(Path(root_dir) / "lib" / rel_path, rel_path, text=text)
+    try:
+        scan = scan_screen(text, source.tokens)
+    except Exception as e:
+        scan = {"error": str(e)}
+    return rel_path, {"screen": _worker_extractor.analyze_screen(source), "scan": scan}
+
+
+def _is_screen(rel_path: str) -> bool:
+    name = rel_path.rsplit("/", 1)[-1]
+    return name.endswith("_screen.dart") or name == "main_navigation.dart"
+
+
+class AuditHistory:
+    """Replays the module audit over a range of commits without checking any of them out
+
+    Screen files and the Product Definition are read as blobs; each distinct
+    (path, blob) is analyzed once, in parallel, and kept in the analysis cache
+    across runs, so a commit only costs the files it changed.
+    """
+
+    def __init__(self, root_dir: str = ".", executor: str = "thread", workers: int = 8, use_cache: bool = True):
+        self.root_dir = Path(root_dir)
+        self.executor = executor
+        self.workers = workers
+        self.cache = AnalysisCache(self.root_dir, "audit_history", HISTORY_VERSION) if use_cache else None
+        # Path of root_dir inside the repository ("" at the top level)
+        self.prefix = self._git("rev-parse", "--show-prefix").strip()
+        self.extractor = EnhancedAuditExtractor(str(self.root_dir), corpus=SourceCorpus.from_files(
+            self.root_dir / "lib", {}), use_cache=False)
+        self._blobs: Dict[Tuple[str, str], Dict] = {}
+        self._specs: Dict[str, Dict] = {}
+        self._module_memo: Dict[Tuple, Dict] = {}
+
+    def _git(self, *args: str) -> str:
+        result = subprocess.run(["git", *args], cwd=self.root_dir, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    def commits(self, rev: str = "HEAD", max_commits: int = 200) -> List[Dict]:
+        """First-parent commits of rev that touched the screens or the spec, oldest first"""
+        log = self._git("log", "--first-parent", f"--max-count={max_commits}", "--format=%H%x09%ct%x09%s",
+                        rev, "--", SCREENS_DIR, SPEC_FILE)
+        commits = []
+        for line in log.splitlines():
+            sha, timestamp, subject = line.split("\t", 2)
+            date = datetime.fromtimestamp(int(timestamp), tz=timezone.utc).isoformat()
+            commits.append({"commit": sha, "date": date, "subject": subject})
+        return commits[::-1]
+
+    def _analyze_blobs(self, git: GitObjects, blobs: List[Tuple[str, str]]):
+        """Fill self._blobs for (lib-relative path, oid) pairs not analyzed yet"""
+        missing = []
+        for rel_path, oid in blobs:
+            if (rel_path, oid) in self._blobs:
+                continue
+            cached = self.cache.get(f"{rel_path}@{oid}", oid) if self.cache is not None else None
+            if cached is not None:
+                self._blobs[(rel_path, oid)] = cached
+            else:
+                missing.append((rel_path, oid))
+
+        pool_class = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+        with pool_class(max_workers=self.workers) as pool:
+            for start in range(0, len(missing), BLOB_BATCH):
+                batch = missing[start:start + BLOB_BATCH]
+                work = [(str(self.root_dir), rel_path, git.read(oid)[1].decode('utf-8', errors='replace'))
+                        for rel_path, oid in batch]
+                for (rel_path, oid), (_, result) in zip(batch, pool.map(_analyze_blob, work)):
+                    self._blobs[(rel_path, oid)] = result
+                    if self.cache is not None:
+                        self.cache.put(f"{rel_path}@{oid}", oid, result)
+        if self.cache is not None:
+            self.cache.flush()
+
+    def _modules(self, git: GitObjects, oid: Optional[str]) -> Dict:
+        if oid is None:
+            return {}
+        if oid not in self._specs:
+            text = git.read(oid)[1].decode('utf-8', errors='replace')
+            self._specs[oid] = self.extractor.modules_from_outline(SpecOutline(text))
+        return self._specs[oid]
+
+    def _module_stats(self, auditor: ParallelModuleAuditor, module_data: Dict, screens: List[Dict]) -> Dict:
+        summary = auditor.summarize_module(module_data, screens)
+        capabilities = summary["capabilities"]
+        total = capabilities["total"]
+        return {
+            "capability_coverage": round(100 * capabilities["implemented"] / total, 1) if total else None,
+            "capabilities": total,
+            "missing_states": len(summary["state_handling"]["issues"]),
+            "dead_buttons": summary["buttons_links"]["dead_buttons"],
+        }
+
+    def _commit_stats(self, screens: List[Tuple[str, str]], spec: Optional[str]) -> Dict:
+        """Per-module and overall stats for one commit's screens (lib-relative path, oid)"""
+        modules = self._specs.get(spec, {})
+        analyses = [self._blobs[screen] for screen in screens]
+        # Every screen's scan is handed over, so the auditor never reads a file
+        auditor = ParallelModuleAuditor(str(self.root_dir), corpus=SourceCorpus.from_files(self.root_dir / "lib", {}))
+        auditor.use_scans({rel_path: analysis["scan"] for (rel_path, _), analysis in zip(screens, analyses)})
+
+        by_module: Dict[str, List[Tuple[Tuple[str, str], Dict]]] = {}
+        for screen, analysis in zip(screens, analyses):
+            by_module.setdefault(analysis["screen"].get('module'), []).append((screen, analysis["screen"]))
+
+        stats = {}
+        for module_num, module_data in modules.items():
+            # Screens carry "3.N" modules; the spec modules are keyed N
+            module_screens = by_module.get(screen_module(module_num), [])
+            # A module whose spec and screen blobs are unchanged since an earlier commit has the same stats
+            key = (spec, module_num, tuple(screen for screen, _ in module_screens))
+            if key not in self._module_memo:
+                self._module_memo[key] = self._module_stats(auditor, module_data, [data for _, data in module_screens])
+            stats[module_num] = self._module_memo[key]
+        totals = {
+            "screens": len(analyses),
+            "screens_missing_states": sum(
+                1 for a in analyses
+                if not all(a["screen"].get('implementation', {}).get(f"has_{state}_state")
+                           for state in ("loading", "empty", "error"))
+            ),
+            "dead_buttons": sum(len(a["scan"].get("dead_buttons", [])) for a in analyses if a["scan"]),
+        }
+        return {"modules": stats, "totals": totals}
+
+    def run(self, rev: str = "HEAD", max_commits: int = 200) -> Dict:
+        """Trend of every module across the commits of rev, as series aligned with the commit list
+
+        modules[num][metric][i] is the metric at commits[i] (None while the
+        module is absent from that commit's Product Definition).
+        """
+        commits = self.commits(rev, max_commits)
+        screens_dir = self.prefix + SCREENS_DIR
+        spec_file = self.prefix + SPEC_FILE
+        lib_prefix = self.prefix + "lib/"
+        git = GitObjects(self.root_dir)
+        try:
+            snapshots = []
+            with audit_trace.span("read trees"):
+                for commit in commits:
+                    files = git.files(commit["commit"], [screens_dir, spec_file])
+                    screens = sorted((path[len(lib_prefix):], oid) for path, oid in files.items()
+                                     if path.endswith(".dart") and _is_screen(path))
+                    snapshots.append((screens, files.get(spec_file)))
+            with audit_trace.span("analyze blobs"):
+                self._analyze_blobs(git, sorted({screen for screens, _ in snapshots for screen in screens}))
+            with audit_trace.span("parse specs"):
+                for _, spec in snapshots:
+                    self._modules(git, spec)
+        finally:
+            git.close()
+
+        # Serial: the memo makes each commit cost only the modules it changed
+        with audit_trace.span("commit stats"):
+            stats = [self._commit_stats(screens, spec) for screens, spec in snapshots]
+
+        series: Dict[str, Dict] = {}
+        for index, ((_, spec), commit, commit_stats) in enumerate(zip(snapshots, commits, stats)):
+            commit["totals"] = commit_stats["totals"]
+            for module_num, values in commit_stats["modules"].items():
+                if module_num not in series:
+                    series[module_num] = {"name": None, **{metric: [None] * len(commits) for metric in METRICS}}
+                series[module_num]["name"] = self._specs[spec][module_num].get('name')
+                for metric in METRICS:
+                    series[module_num][metric][index] = values[metric]
+        return {"commits": commits, "modules": series}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit trends across git history, without checking out commits")
+    parser.add_argument("rev", nargs="?", default="HEAD", help="Revision or range to walk (default: HEAD)")
+    parser.add_argument("--max-commits", type=int, default=200,
+                        help="Most recent commits touching the screens or spec to include (default: 200)")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="Pool used for the per-blob analysis (process sidesteps the GIL)")
+    parser.add_argument("--workers", type=int, default=8, help="Number of pool workers")
+    parser.add_argument("--no-cache", action="store_true", help="Re-analyze every blob, ignoring .audit_cache/")
+    parser.add_argument("--output", default=OUTPUT_FILE, help=f"Time series JSON (default: {OUTPUT_FILE})")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument(AuditHistory, "commits", "_analyze_blobs")
+
+    start = time.perf_counter()
+    try:
+        history = AuditHistory(".", executor=args.executor, workers=args.workers,
+                               use_cache=not args.no_cache).run(args.rev, args.max_commits)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    print(f"History of {len(history['commits'])} commit(s) across {len(history['modules'])} module(s) "
+          f"written to {args.output} in {time.perf_counter() - start:.2f}s")
+    audit_trace.finish()
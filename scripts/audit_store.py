@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Audit Store
+Optional SQLite mirror of the audit results, with indexed tables answering single questions without loading the JSON
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+STORE_FILE = "docs/audit_results.sqlite3"
+
+# Column lists per table; build_rows() emits rows in this order
+TABLES = {
+    "modules": [
+        ("number", "TEXT PRIMARY KEY"), ("name", "TEXT"), ("purpose", "TEXT"),
+        ("capabilities", "INTEGER"), ("capabilities_implemented", "INTEGER"),
+        ("screens", "INTEGER"), ("screens_implemented", "INTEGER"), ("dead_buttons", "INTEGER"),
+        ("wired", "INTEGER"), ("mock", "INTEGER"), ("not_wired", "INTEGER"),
+    ],
+    "capabilities": [
+        ("module", "TEXT"), ("name", "TEXT"), ("description", "TEXT"), ("status", "TEXT"),
+    ],
+    "screens": [
+        ("path", "TEXT PRIMARY KEY"), ("name", "TEXT"), ("class_name", "TEXT"), ("module", "TEXT"),
+        ("status", "TEXT"), ("has_stateful", "INTEGER"), ("has_setstate", "INTEGER"),
+        ("has_loading_state", "INTEGER"), ("has_empty_state", "INTEGER"), ("has_error_state", "INTEGER"),
+        ("has_navigation", "INTEGER"), ("api_calls", "INTEGER"), ("has_mock_data", "INTEGER"),
+        ("backend_notes", "INTEGER"), ("imports", "INTEGER"),
+    ],
+    "widgets": [
+        ("path", "TEXT PRIMARY KEY"), ("name", "TEXT"), ("class_name", "TEXT"), ("category", "TEXT"), ("type", "TEXT"),
+    ],
+    "models": [
+        ("path", "TEXT PRIMARY KEY"), ("name", "TEXT"), ("class_name", "TEXT"), ("fields", "INTEGER"),
+    ],
+    "findings": [
+        ("kind", "TEXT"), ("path", "TEXT"), ("screen", "TEXT"), ("module", "TEXT"),
+        ("line", "INTEGER"), ("column", "INTEGER"), ("issue", "TEXT"), ("code", "TEXT"), ("detail", "TEXT"),
+    ],
+}
+
+INDEXES = [
+    ("capabilities", "module"), ("capabilities", "status"),
+    ("screens", "module"), ("screens", "status"),
+    ("widgets", "category"),
+    ("findings", "kind"), ("findings", "module"), ("findings", "path"),
+]
+
+# Finding fields that get their own column; everything else goes to detail as JSON
+FINDING_COLUMNS = ("screen", "line", "column", "issue", "code", "span")
+STATES = ("loading", "empty", "error")
+
+
+def _flag(value) -> int:
+    return 1 if value else 0
+
+
+def build_rows(extraction: Dict, functional: Optional[Dict] = None,
+               module_audit: Optional[Dict] = None) -> Dict[str, List[list]]:
+    """Table rows for the extraction plus (optionally) the functional issues and module audit"""
+    module_audit = module_audit or {}
+    rows = {table: [] for table in TABLES}
+
+    for number, module in extraction.get('modules', {}).items():
+        audit = module_audit.get(number, {})
+        capabilities = audit.get('capabilities', {})
+        screens = audit.get('screens', {})
+        backend = audit.get('backend_integration', {})
+        rows["modules"].append([
+            number, module.get('name'), module.get('purpose'),
+            capabilities.get('total', len(module.get('core_capabilities', []))), capabilities.get('implemented'),
+            screens.get('total'), screens.get('implemented'), audit.get('buttons_links', {}).get('dead_buttons'),
+            backend.get('wired'), backend.get('mock'), backend.get('not_wired'),
+        ])
+        # Audited capabilities carry a status; otherwise fall back to the spec's list
+        if capabilities.get('list'):
+            for capability in capabilities['list']:
+                rows["capabilities"].append([number, capability.get('name'), capability.get('description'),
+                                             capability.get('status')])
+        else:
+            for capability in module.get('core_capabilities', []):
+                rows["capabilities"].append([number, capability.get('name'), capability.get('description'), None])
+
+    statuses = {
+        screen.get('path'): screen.get('status')
+        for audit in module_audit.values() if isinstance(audit, dict)
+        for screen in audit.get('screens', {}).get('list', [])
+    }
+    screen_paths = {}
+    for screen in extraction.get('screens', []):
+        impl = screen.get('implementation', {})
+        screen_paths[screen.get('name')] = (screen.get('path'), screen.get('module'))
+        rows["screens"].append([
+            screen.get('path'), screen.get('name'), screen.get('class_name'), screen.get('module'),
+            statuses.get(screen.get('path')),
+            _flag(impl.get('has_stateful')), _flag(impl.get('has_setstate')),
+            _flag(impl.get('has_loading_state')), _flag(impl.get('has_empty_state')),
+            _flag(impl.get('has_error_state')), _flag(impl.get('has_navigation')),
+            impl.get('api_calls_count', 0), _flag(impl.get('has_mock_data')), _flag(impl.get('backend_notes')),
+            screen.get('imports_count'),
+        ])
+
+    for widget in extraction.get('widgets', []):
+        rows["widgets"].append([widget.get('path'), widget.get('name'), widget.get('class_name'),
+                                widget.get('category'), widget.get('type')])
+    for model in extraction.get('models', []):
+        rows["models"].append([model.get('path'), model.get('name'), model.get('class_name'),
+                               len(model.get('fields', []))])
+
+    for kind, entries in (functional or {}).items():
+        for entry in entries:
+            path, module = screen_paths.get(entry.get('screen'), (None, None))
+            # Summary-style findings name their subject in other fields
+            issue = (entry.get('issue') or entry.get('error')
+                     or ", ".join(entry.get('missing_states', [])) or "; ".join(entry.get('todos', [])))
+            detail = {key: value for key, value in entry.items() if key not in FINDING_COLUMNS}
+            rows["findings"].append([
+                kind, path, entry.get('screen'), module, entry.get('line'), entry.get('column'),
+                issue, entry.get('code'), json.dumps(detail, sort_keys=True) if detail else None,
+            ])
+    return rows
+
+
+def write_store(db_path: Path, rows: Dict[str, List[list]]):
+    """(Re)create the store at db_path from build_rows() output, replacing it atomically"""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_suffix(".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        for table, columns in TABLES.items():
+            conn.execute(f"CREATE TABLE {table} ({', '.join(f'{name} {kind}' for name, kind in columns)})")
+            placeholders = ", ".join("?" * len(columns))
+            conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows.get(table, []))
+        for table, column in INDEXES:
+            conn.execute(f"CREATE INDEX idx_{table}_{column} ON {table} ({column})")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+
+
+class AuditStore:
+    """Read-only queries over a store written by write_store()"""
+
+    def __init__(self, db_path: Path = Path(STORE_FILE)):
+        self.db_path = Path(db_path)
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"{self.db_path} not found (run the audit with --store first)")
+        self.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+
+    def execute(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        return self.conn.execute(sql, params).fetchall()
+
+    def modules(self) -> List[sqlite3.Row]:
+        return self.execute("SELECT number, name, capabilities, capabilities_implemented, screens, "
+                            "screens_implemented, dead_buttons, wired, mock, not_wired FROM modules")
+
+    def screens(self, module: str = None, missing: str = None, status: str = None) -> List[sqlite3.Row]:
+        """Screens, optionally filtered by module, a missing state (loading/empty/error) and status"""
+        clauses, params = [], []
+        if module is not None:
+            clauses.append("module = ?")
+            params.append(module)
+        if missing is not None:
+            if missing not in STATES:
+                raise ValueError(f"Unknown state {missing!r} (expected one of {', '.join(STATES)})")
+            clauses.append(f"has_{missing}_state = 0")
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.execute(f"SELECT path, name, module, status, has_loading_state, has_empty_state, "
+                            f"has_error_state, api_calls, has_mock_data FROM screens{where} ORDER BY path", params)
+
+    def findings(self, kind: str = None, module: str = None, path: str = None,
+                 group_by: str = None) -> List[sqlite3.Row]:
+        """Findings filtered by kind/module/path, or their counts grouped by one column"""
+        clauses, params = [], []
+        for column, value in (("kind", kind), ("module", module), ("path", path)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        if group_by is not None:
+            if group_by not in ("kind", "module", "path", "screen"):
+                raise ValueError(f"Cannot group findings by {group_by!r}")
+            return self.execute(f"SELECT {group_by}, COUNT(*) AS count FROM findings{where} "
+                                f"GROUP BY {group_by} ORDER BY count DESC, {group_by}", params)
+        return self.execute(f"SELECT kind, path, line, column, issue FROM findings{where} "
+                            f"ORDER BY path, line", params)
+
+    def close(self):
+        self.conn.close()
+
+
+def _print_rows(rows: List[sqlite3.Row], as_json: bool = False):
+    if as_json:
+        print(json.dumps([dict(row) for row in rows], indent=2))
+        return
+    if not rows:
+        print("(no rows)")
+        return
+    columns = rows[0].keys()
+    table = [[("" if value is None else str(value)) for value in row] for row in rows]
+    widths = [max(len(column), *(len(values[i]) for values in table)) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)).rstrip())
+    print("  ".join("-" * width for width in widths))
+    for values in table:
+        print("  ".join(value.ljust(width) for value, width in zip(values, widths)).rstrip())
+    print(f"({len(rows)} rows)")
+
+
+def query_main(argv: Optional[List[str]] = None) -> int:
+    """`audit query`: answer one question from the store"""
+    parser = argparse.ArgumentParser(prog="audit query", description="Query the SQLite audit store")
+    parser.add_argument("--db", type=Path, default=Path(STORE_FILE), help=f"Store to read (default: {STORE_FILE})")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    subparsers = parser.add_subparsers(dest="table", required=True)
+
+    subparsers.add_parser("modules", help="Per-module summary")
+    screens = subparsers.add_parser("screens", help="Screens, e.g. `screens --module 3.5 --missing error`")
+    screens.add_argument("--module")
+    screens.add_argument("--missing", choices=STATES, help="Only screens without this state")
+    screens.add_argument("--status", help="WIRED, MOCK, IMPLEMENTED, PARTIAL or MISSING")
+    findings = subparsers.add_parser("findings", help="Findings, e.g. `findings --kind dead_buttons --by path`")
+    findings.add_argument("--kind", help="dead_buttons, broken_navigation, missing_state_handling, ...")
+    findings.add_argument("--module")
+    findings.add_argument("--path")
+    findings.add_argument("--by", choices=["kind", "module", "path", "screen"], help="Count findings per value")
+    sql = subparsers.add_parser("sql", help="Run a read-only SQL statement")
+    sql.add_argument("statement")
+    args = parser.parse_args(argv)
+
+    try:
+        store = AuditStore(args.db)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    try:
+        if args.table == "modules":
+            rows = store.modules()
+        elif args.table == "screens":
+            rows = store.screens(module=args.module, missing=args.missing, status=args.status)
+        elif args.table == "findings":
+            rows = store.findings(kind=args.kind, module=args.module, path=args.path, group_by=args.by)
+        else:
+            rows = store.execute(args.statement)
+    except sqlite3.Error as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        store.close()
+    _print_rows(rows, args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the SQLite audit store from the docs/*.json results")
+    parser.add_argument("--output", default=STORE_FILE, help=f"Store to write (default: {STORE_FILE})")
+    args = parser.parse_args()
+
+    docs = Path("docs")
+    with open(docs / "enhanced_audit_extraction.json", 'r', encoding='utf-8') as f:
+        extraction = json.load(f)
+    optional = {}
+    for key, name in (("functional", "functional_test_issues.json"), ("module_audit", "parallel_audit_results.json")):
+        if (docs / name).exists():
+            with open(docs / name, 'r', encoding='utf-8') as f:
+                optional[key] = json.load(f)
+    write_store(Path(args.output), build_rows(extraction, **optional))
+    print(f"Store saved to {args.output}")
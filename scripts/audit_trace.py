@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Audit Trace
+Opt-in stage / file / regex profiling for the audit scripts, written as Chrome trace-event JSON
+
+Nothing here is active unless a script is run with --trace: start() installs
+the tracer, and instrument()/instrument_patterns() swap traced wrappers in
+place of methods and module-level compiled patterns. Without --trace the
+original functions and patterns are used untouched.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Individual regex calls shorter than this are only aggregated, not emitted as events
+MIN_PATTERN_EVENT_US = 50
+# Span categories ranked in the text summary (per-file/module/item spans only go to the trace)
+SUMMARY_CATEGORIES = ("stage", "check")
+
+_tracer: Optional["Tracer"] = None
+_NULL_SPAN = nullcontext()
+
+
+class PatternStats:
+    """Cumulative calls, hits and time for one compiled pattern"""
+
+    def __init__(self, label: str, pattern: str):
+        self.label = label
+        self.pattern = pattern
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "label": self.label,
+            "pattern": self.pattern,
+            "calls": self.calls,
+            "hits": self.hits,
+            "total_ms": round(self.seconds * 1000, 3),
+        }
+
+
+class Tracer:
+    """Collects complete ("X") trace events and per-pattern statistics"""
+
+    def __init__(self, output_path: Path, top: int = 15):
+        self.output_path = Path(output_path)
+        self.top = top
+        self.events: List[Dict] = []
+        self.patterns: Dict[str, PatternStats] = {}
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self._threads: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        if ident not in self._threads:
+            with self._lock:
+                self._threads.setdefault(ident, len(self._threads) + 1)
+        return self._threads[ident]
+
+    def _us(self, seconds: float) -> float:
+        return round((seconds - self.origin) * 1_000_000, 3)
+
+    def record(self, name: str, cat: str, start: float, end: float, args: Optional[Dict] = None):
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": self._us(start),
+            "dur": round((end - start) * 1_000_000, 3),
+            "pid": self.pid,
+            "tid": self._tid(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def pattern_stats(self, label: str, pattern: str) -> PatternStats:
+        with self._lock:
+            if label not in self.patterns:
+                self.patterns[label] = PatternStats(label, pattern)
+            return self.patterns[label]
+
+    def add_pattern_call(self, stats: PatternStats, method: str, start: float, end: float, hits: int):
+        with self._lock:
+            stats.calls += 1
+            stats.hits += hits
+            stats.seconds += end - start
+        if (end - start) * 1_000_000 >= MIN_PATTERN_EVENT_US:
+            self.record(stats.label, "pattern", start, end, {"method": method, "hits": hits})
+
+    def hot_patterns(self) -> List[PatternStats]:
+        return sorted(self.patterns.values(), key=lambda s: s.seconds, reverse=True)[:self.top]
+
+    def summary(self) -> str:
+        """Plain-text top-N table of the most expensive patterns and stages"""
+        lines = [f"Top {self.top} patterns by cumulative time"]
+        lines.append(f"{'ms':>10} {'calls':>8} {'hits':>8}  pattern")
+        for stats in self.hot_patterns():
+            lines.append(f"{stats.seconds * 1000:10.2f} {stats.calls:8d} {stats.hits:8d}  {stats.label}")
+
+        stages: Dict[str, float] = {}
+        for event in self.events:
+            if event["cat"] in SUMMARY_CATEGORIES:
+                stages[event["name"]] = stages.get(event["name"], 0.0) + event["dur"]
+        lines.append("")
+        lines.append("Stages by cumulative time (nested stages are included in their parents)")
+        for name, duration in sorted(stages.items(), key=lambda item: item[1], reverse=True)[:self.top]:
+            lines.append(f"{duration / 1000:10.2f}  {name}")
+        return "\n".join(lines)
+
+    def write(self) -> Path:
+        """Write the trace JSON (loadable in Perfetto / chrome://tracing) and the text summary"""
+        metadata = [{
+            "name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+            "args": {"name": self.output_path.stem},
+        }]
+        metadata.extend(
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": f"thread-{tid}"}}
+            for tid in self._threads.values()
+        )
+        trace = {
+            "traceEvents": metadata + self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"patterns": [s.as_dict() for s in self.hot_patterns()]},
+        }
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        summary_path = self.output_path.with_suffix(".summary.txt")
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(self.summary() + "\n")
+        return summary_path
+
+
+class TracedPattern:
+    """Stand-in for a compiled re.Pattern that reports each call to the tracer"""
+
+    def __init__(self, pattern: re.Pattern, label: str, tracer: Tracer):
+        self._pattern = pattern
+        self._tracer = tracer
+        self._stats = tracer.pattern_stats(label, pattern.pattern)
+
+    def __getattr__(self, name):
+        # pattern, flags, groups, groupindex, ...
+        return getattr(self._pattern, name)
+
+    def _timed(self, method: str, call: Callable, count: Callable):
+        start = time.perf_counter()
+        result = call()
+        end = time.perf_counter()
+        self._tracer.add_pattern_call(self._stats, method, start, end, count(result))
+        return result
+
+    def search(self, *args, **kwargs):
+        return self._timed("search", lambda: self._pattern.search(*args, **kwargs), lambda m: int(m is not None))
+
+    def match(self, *args, **kwargs):
+        return self._timed("match", lambda: self._pattern.match(*args, **kwargs), lambda m: int(m is not None))
+
+    def fullmatch(self, *args, **kwargs):
+        return self._timed("fullmatch", lambda: self._pattern.fullmatch(*args, **kwargs), lambda m: int(m is not None))
+
+    def findall(self, *args, **kwargs):
+        return self._timed("findall", lambda: self._pattern.findall(*args, **kwargs), len)
+
+    def sub(self, *args, **kwargs):
+        return self._timed("sub", lambda: self._pattern.subn(*args, **kwargs), lambda r: r[1])[0]
+
+    def subn(self, *args, **kwargs):
+        return self._timed("subn", lambda: self._pattern.subn(*args, **kwargs), lambda r: r[1])
+
+    def split(self, *args, **kwargs):
+        return self._timed("split", lambda: self._pattern.split(*args, **kwargs), lambda r: len(r) - 1)
+
+    def finditer(self, *args, **kwargs):
+        # Matches are produced lazily, so time the whole iteration
+        start = time.perf_counter()
+        hits = 0
+        elapsed = 0.0
+        iterator = self._pattern.finditer(*args, **kwargs)
+        try:
+            while True:
+                step = time.perf_counter()
+                try:
+                    match = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - step
+                    break
+                elapsed += time.perf_counter() - step
+                hits += 1
+                yield match
+        finally:
+            self._tracer.add_pattern_call(self._stats, "finditer", start, start + elapsed, hits)
+
+
+def start(output_path: Path, top: int = 15) -> Tracer:
+    """Enable tracing for this process"""
+    global _tracer
+    _tracer = Tracer(output_path, top)
+    return _tracer
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, cat: str = "stage", **args):
+    """Context manager recording a span; a shared no-op context when tracing is off"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, cat, args)
+
+
+class _Span:
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.cat, self.start, time.perf_counter(), self.args)
+        return False
+
+
+def instrument(owner, *names: str, cat: str = "stage", label: Callable = None):
+    """Replace owner.<name> (functions or methods) with span-recording wrappers
+
+    label, if given, is called with the original arguments and names the
+    span (e.g. the file being analyzed); otherwise the qualified function
+    name is used. Does nothing unless tracing has been started.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return
+    for name in names:
+        func = getattr(owner, name)
+        qualname = getattr(func, "__qualname__", name)
+
+        def wrap(func=func, qualname=qualname):
+            @wraps(func)
+            def traced(*args, **kwargs):
+                start_time = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    span_name = str(label(*args, **kwargs)) if label else qualname
+                    tracer.record(span_name, cat, start_time, time.perf_counter(),
+                                  {"function": qualname} if label else None)
+            return traced
+
+        setattr(owner, name, wrap())
+
+
+def instrument_patterns(namespace, prefix: str = ""):
+    """Swap every compiled pattern held at module level in namespace for a TracedPattern
+
+    namespace is a module (or the dict of a script's globals); patterns are
+    labelled "<prefix><NAME>". Does nothing unless tracing has been started.
+    """
+    if _tracer is None:
+        return
+    scope = namespace if isinstance(namespace, dict) else vars(namespace)
+    if not prefix:
+        module_name = scope.get("__name__", "")
+        if module_name == "__main__" and scope.get("__file__"):
+            module_name = Path(scope["__file__"]).stem
+        prefix = f"{module_name}." if module_name else ""
+    for name, value in list(scope.items()):
+        if isinstance(value, re.Pattern):
+            scope[name] = TracedPattern(value, f"{prefix}{name}", _tracer)
+
+
+def add_arguments(parser):
+    """--trace / --trace-top options shared by every audit script"""
+    parser.add_argument("--trace", type=Path, metavar="OUT_JSON",
+                        help="Write a Chrome trace-event profile (open in Perfetto) and a hot-pattern summary")
+    parser.add_argument("--trace-top", type=int, default=15, metavar="N",
+                        help="Patterns and stages listed in the trace summary (default: 15)")
+
+
+def finish():
+    """Write the trace and print the hot-pattern summary, if tracing is on"""
+    global _tracer
+    if _tracer is None:
+        return
+    tracer, _tracer = _tracer, None
+    summary_path = tracer.write()
+    print(f"\n{tracer.summary()}")
+    print(f"\nTrace written to {tracer.output_path} (summary: {summary_path})")
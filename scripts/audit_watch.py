@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Audit Watch
+Keeps the corpus and per-file results warm and re-audits only what an edit touches
+"""
+
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import audit_trace
+from enhanced_audit_extractor import EnhancedAuditExtractor, screen_module
+from functional_test_checker import FunctionalTestChecker
+from generate_comprehensive_audit import generate_comprehensive_report
+from navigation_graph import class_index
+from parallel_module_auditor import ParallelModuleAuditor
+from source_corpus import SourceCorpus
+
+WATCHED_DIRS = ("lib", "docs/specs")
+FUNCTIONAL_ISSUES_FILE = "docs/functional_test_issues.json"
+MODULE_RESULTS_FILE = "docs/parallel_audit_results.json"
+FINAL_REPORT_FILE = "docs/COMPREHENSIVE_AUDIT_FINAL.md"
+
+
+def snapshot(root_dir: Path, dirs=WATCHED_DIRS) -> Dict[str, Tuple[int, int]]:
+    """(size, mtime_ns) of every file under dirs, keyed by root-relative posix path"""
+    files = {}
+    for subdir in dirs:
+        for dirpath, _, filenames in os.walk(root_dir / subdir):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files[path.relative_to(root_dir).as_posix()] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def diff_snapshots(before: Dict[str, Tuple[int, int]], after: Dict[str, Tuple[int, int]]) -> Set[str]:
+    """Paths added, removed or modified between two snapshots"""
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+def changed_since(root_dir: Path, rev: str) -> Set[str]:
+    """Root-relative paths that differ from git revision rev (committed, uncommitted and untracked)"""
+    commands = (
+        ["git", "diff", "--name-only", "--relative", rev, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    )
+    changed = set()
+    for command in commands:
+        result = subprocess.run(command, cwd=root_dir, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed: {result.stderr.strip()}")
+        changed.update(line for line in result.stdout.splitlines() if line)
+    return changed
+
+
+class AuditWatcher:
+    """Incremental functional checks and module audits driven by a stdlib polling loop
+
+    The first refresh analyzes everything (unless seeded with a previous
+    run's results); after that, an edited screen is re-extracted and
+    re-checked on its own, and only the modules that own
+    it (before or after the edit) are re-audited. Spec edits re-extract the
+    modules and re-audit all of them.
+    """
+
+    def __init__(self, root_dir: str = ".", use_cache: bool = True, interval: float = 1.0):
+        self.root_dir = Path(root_dir)
+        self.interval = interval
+        self.corpus = SourceCorpus.shared(self.root_dir / "lib")
+        # Unchanged files keep their lexed views between refreshes
+        self.corpus.retain_lexed = True
+        self.extractor = EnhancedAuditExtractor(str(self.root_dir), corpus=self.corpus, use_cache=use_cache)
+        self.checker = FunctionalTestChecker(str(self.root_dir), corpus=self.corpus)
+        self.module_auditor = ParallelModuleAuditor(str(self.root_dir), corpus=self.corpus)
+        self.screen_issues: Dict[str, Dict[str, List]] = {}
+        self.extraction: Dict = {}
+        self.functional: Dict = {}
+        self._seeded = False
+        self._snapshot = snapshot(self.root_dir)
+
+    def seed(self, extraction: Dict, functional: Dict, module_results: Dict, changed: Set[str],
+             classes: Dict[str, str]):
+        """Start from a previous run's results instead of a full first refresh
+
+        Everything outside changed (root-relative paths) is taken as is; the
+        following refresh(changed) then re-analyzes only the changed files.
+        classes is that run's class index, so a class added, moved or removed
+        since still re-checks every screen.
+        """
+        lib_changed = {path[len("lib/"):] for path in changed if path.startswith("lib/")}
+        self.extraction = extraction
+        self.extractor.seed(extraction, lib_changed)
+        self.functional = functional
+        self.screen_issues = FunctionalTestChecker.split_issues(
+            functional, self.corpus.screens(include_navigation=False)
+        )
+        for rel_path in lib_changed:
+            self.screen_issues.pop(rel_path, None)
+        self.module_auditor.results = dict(module_results)
+        self.checker.classes = self.module_auditor.classes = classes
+        self._seeded = True
+    
+    def _screen_modules(self) -> Dict[str, str]:
+        return {screen.get('path'): screen.get('module') for screen in self.extraction.get('screens', [])}
+
+    def _check_screens(self, changed: Optional[Set[str]] = None):
+        """Re-check changed screens (all of them if changed is None) and re-merge the issues"""
+        screens = self.corpus.screens(include_navigation=False)
+        live = {source.rel_path for source in screens}
+        for rel_path in list(self.screen_issues):
+            if rel_path not in live:
+                del self.screen_issues[rel_path]
+        for source in screens:
+            if changed is None or source.rel_path in changed or source.rel_path not in self.screen_issues:
+                self.screen_issues[source.rel_path] = self.checker.screen_issues(source)
+        self.functional = FunctionalTestChecker.merge_issues(
+            [self.screen_issues[source.rel_path] for source in screens]
+        )
+
+    def refresh(self, changed: Optional[Set[str]] = None) -> List[str]:
+        """Bring the results up to date after changed (root-relative paths); None means everything
+
+        Returns the module numbers that were re-audited.
+        """
+        lib_changed = None
+        specs_changed = changed is None
+        if changed is not None:
+            lib_changed = {path[len("lib/"):] for path in changed if path.startswith("lib/")}
+            specs_changed = any(path.startswith("docs/specs/") for path in changed)
+            self.corpus.refresh(lib_changed)
+
+        with audit_trace.span("extraction", cat="stage"):
+            old_modules = self._screen_modules()
+            self.extraction = self.extractor.run_extraction(specs=specs_changed)
+            new_modules = self._screen_modules()
+
+        with audit_trace.span("functional", cat="stage"):
+            # Navigation targets resolve through the class index, so a class
+            # added, moved or removed anywhere re-checks every screen
+            classes = class_index(self.corpus)
+            classes_changed = classes != self.checker.classes
+            self.checker.classes = self.module_auditor.classes = classes
+            self._check_screens(None if classes_changed else lib_changed)
+
+        with audit_trace.span("module_audit", cat="stage"):
+            modules = self.extraction.get('modules', {})
+            if specs_changed or classes_changed or not self.module_auditor.results:
+                affected = list(modules)
+            else:
+                # Screens carry "3.N" modules; the spec modules are keyed N
+                module_nums = {screen_module(module_num): module_num for module_num in modules}
+                affected = sorted({
+                    module_nums[module]
+                    for path in lib_changed
+                    for module in (old_modules.get(path), new_modules.get(path))
+                    if module in module_nums
+                })
+            self.module_auditor.reaudit_modules(affected, self.extraction, sorted(lib_changed or []))
+
+        with audit_trace.span("final_report", cat="stage"):
+            self._write_json(FUNCTIONAL_ISSUES_FILE, self.functional)
+            self._write_json(MODULE_RESULTS_FILE, self.module_auditor.results)
+            report = generate_comprehensive_report(self.module_auditor.results, self.functional, self.extraction)
+            with open(self.root_dir / FINAL_REPORT_FILE, 'w', encoding='utf-8') as f:
+                f.write(report)
+        return affected
+
+    def _write_json(self, rel_path: str, data):
+        with open(self.root_dir / rel_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def poll(self) -> Set[str]:
+        """Paths changed since the previous poll"""
+        current = snapshot(self.root_dir)
+        changed = diff_snapshots(self._snapshot, current)
+        self._snapshot = current
+        return changed
+
+    def watch(self, max_cycles: Optional[int] = None):
+        """Poll every interval seconds and refresh on change, until Ctrl-C (or max_cycles polls)
+
+        A seeded watcher starts polling straight away; otherwise a full
+        refresh warms it up first.
+        """
+        if self._seeded:
+            print(f"👀 Watching {', '.join(WATCHED_DIRS)} (Ctrl-C to stop)")
+        else:
+            start = time.perf_counter()
+            self.refresh()
+            print(f"👀 Watching {', '.join(WATCHED_DIRS)} (warmed up in {time.perf_counter() - start:.2f}s, "
+                  f"Ctrl-C to stop)")
+        cycles = 0
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                cycles += 1
+                time.sleep(self.interval)
+                changed = self.poll()
+                if not changed:
+                    continue
+                start = time.perf_counter()
+                affected = self.refresh(changed)
+                listed = ", ".join(sorted(changed)[:3]) + (" ..." if len(changed) > 3 else "")
+                print(f"🔄 {len(changed)} changed ({listed}): re-audited {len(affected)} module(s) "
+                      f"in {time.perf_counter() - start:.2f}s")
+        except KeyboardInterrupt:
+            print("\nStopped watching")
@@ -4,17 +4,32 @@ Comprehensive Frontend Audit Script
 Performs detailed specs vs code and code vs specs audit
 """
 
+import argparse
 import json
 import os
 import re
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+import audit_trace
+import identifier_index
+from enhanced_audit_extractor import screen_module
+from identifier_index import IdentifierIndex
+from source_corpus import SourceCorpus
+
+NAVIGATION_CALL_PATTERN = re.compile(r'Navigator\.(push|pop)')
+WIDGET_METHOD_PATTERN = re.compile(r'Widget\s+_build\w+\(')
+ACTION_METHOD_PATTERN = re.compile(r'void\s+_handle\w+\(')
+API_CALL_PATTERN = re.compile(r'await\s+\w+\.(fetch|get|post|put|delete)')
+
 class ComprehensiveAuditor:
-    def __init__(self, root_dir: str):
+    def __init__(self, root_dir: str, corpus: SourceCorpus = None):
         self.root_dir = Path(root_dir)
         self.specs_dir = self.root_dir / "docs" / "specs"
         self.code_dir = self.root_dir / "lib"
+        self.corpus = corpus or SourceCorpus.shared(self.code_dir)
+        self._identifiers = None
+        self._widget_files = None
         self.results = {
             "modules": {},
             "summary": {
@@ -38,26 +53,28 @@ class ComprehensiveAuditor:
     
     def audit_screen_implementation(self, screen_path: str, module_num: str) -> Dict:
         """Audit a single screen for implementation status"""
-        screen_file = self.code_dir / screen_path
-        if not screen_file.exists():
+        source = self.corpus.get(screen_path)
+        if source is None:
             return {"status": "MISSING", "details": {}}
         
         try:
-            with open(screen_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Code checks ignore comments and string literals; markers come from the shared per-file scan
+            tokens = source.tokens
+            code = tokens.code
+            markers = source.markers
             
             details = {
                 "file_exists": True,
-                "has_state_management": "StatefulWidget" in content or "setState" in content,
-                "has_loading_state": "isLoading" in content or "SkeletonLoader" in content,
-                "has_empty_state": "EmptyStateCard" in content or "empty" in content.lower(),
-                "has_error_state": "error" in content.lower() or "ErrorStateCard" in content,
-                "navigation_imports": len(re.findall(r'Navigator\.(push|pop)', content)),
-                "widget_methods": len(re.findall(r'Widget\s+_build\w+\(', content)),
-                "action_methods": len(re.findall(r'void\s+_handle\w+\(', content)),
-                "api_calls": len(re.findall(r'await\s+\w+\.(fetch|get|post|put|delete)', content)),
-                "mock_data": "Mock" in content or "mock" in content.lower(),
-                "backend_integration": "TODO.*backend" in content or "Backend verification" in content,
+                "has_state_management": markers.has("stateful_widget", "set_state"),
+                "has_loading_state": markers.has("is_loading", "skeleton_loader"),
+                "has_empty_state": markers.has("empty_state_card", "empty"),
+                "has_error_state": markers.has("error", "error_state_card"),
+                "navigation_imports": len(NAVIGATION_CALL_PATTERN.findall(code)),
+                "widget_methods": len(WIDGET_METHOD_PATTERN.findall(code)),
+                "action_methods": len(ACTION_METHOD_PATTERN.findall(code)),
+                "api_calls": len(API_CALL_PATTERN.findall(code)),
+                "mock_data": markers.has("mock_class", "mock"),
+                "backend_integration": markers.has("todo_backend", "backend_verification"),
             }
             
             # Determine status
@@ -76,39 +93,58 @@ class ComprehensiveAuditor:
         except Exception as e:
             return {"status": "ERROR", "error": str(e)}
     
+    @property
+    def identifiers(self) -> IdentifierIndex:
+        """Identifier -> files index over lib/, built once per run"""
+        if self._identifiers is None:
+            self._identifiers = IdentifierIndex(self.corpus)
+        return self._identifiers
+    
+    def _find_widget_file(self, widget_name: str):
+        """Resolve a widget name to its file under lib/widgets/"""
+        if self._widget_files is None:
+            self._widget_files = {}
+            for source in self.corpus.under("widgets"):
+                self._widget_files.setdefault(source.stem, source)
+        
+        # Prefer lib/widgets/<name>.dart, then the first match in subdirectories
+        return self.corpus.get(f"widgets/{widget_name}.dart") or self._widget_files.get(widget_name)
+    
     def audit_widget_usage(self, widget_name: str) -> Dict:
         """Check if widget is used and documented"""
-        # Check if widget file exists
-        widget_file = self.code_dir / "widgets" / f"{widget_name}.dart"
-        if not widget_file.exists():
-            # Try to find in subdirectories
-            widget_files = list(self.code_dir.glob(f"widgets/**/{widget_name}.dart"))
-            if widget_files:
-                widget_file = widget_files[0]
-            else:
-                return {"status": "NOT_FOUND"}
+        widget_file = self._find_widget_file(widget_name)
+        if widget_file is None:
+            return {"status": "NOT_FOUND"}
         
-        # Check usage across codebase
-        usage_count = 0
-        for dart_file in self.code_dir.rglob("*.dart"):
-            if dart_file != widget_file:
-                try:
-                    with open(dart_file, 'r', encoding='utf-8') as f:
-                        if widget_name in f.read():
-                            usage_count += 1
-                except:
-                    pass
+        # Count files (other than the widget's own) that reference it
+        usage_count = self.identifiers.usage_count(widget_name, exclude=[widget_file.rel_path])
         
         return {
             "status": "FOUND",
-            "file": str(widget_file.relative_to(self.code_dir)),
+            "file": widget_file.rel_path,
             "usage_count": usage_count
         }
     
+    def audit_all_widget_usage(self, widgets: List) -> Dict:
+        """Usage counts for every extracted widget, plus the ones nothing references"""
+        usage = {}
+        for widget in widgets:
+            name = widget.get('name')
+            if name and name not in usage:
+                usage[name] = self.audit_widget_usage(name)
+        
+        return {
+            "total": len(usage),
+            "unused": sorted(name for name, audit in usage.items()
+                             if audit["status"] == "FOUND" and audit["usage_count"] == 0),
+            "widgets": usage
+        }
+    
     def audit_module_comprehensive(self, module_num: str, module_data: Dict, 
                                    screens: List, widgets: List) -> Dict:
         """Comprehensive audit for a single module"""
-        module_screens = [s for s in screens if s.get('module') == module_num]
+        module_id = screen_module(module_num)
+        module_screens = [s for s in screens if s.get('module') == module_id]
         
         audit = {
             "module_number": module_num,
@@ -158,10 +194,11 @@ class ComprehensiveAuditor:
         
         return audit
     
-    def run_comprehensive_audit(self):
-        """Run full comprehensive audit"""
-        print("Loading extraction data...")
-        extraction_data = self.load_extraction_data()
+    def run_comprehensive_audit(self, extraction_data: Dict = None):
+        """Run full comprehensive audit (on extraction_data, or docs/audit_extraction.json)"""
+        if extraction_data is None:
+            print("Loading extraction data...")
+            extraction_data = self.load_extraction_data()
         
         if not extraction_data:
             print("No extraction data found. Run audit_extractor.py first.")
@@ -188,6 +225,9 @@ class ComprehensiveAuditor:
         self.results["summary"]["total_screens"] = len(screens)
         self.results["summary"]["total_widgets"] = len(widgets)
         
+        print("Indexing widget usage...")
+        self.results["widget_usage"] = self.audit_all_widget_usage(widgets)
+        
         return self.results
     
     def save_results(self, output_file: str):
@@ -198,8 +238,26 @@ class ComprehensiveAuditor:
         print(f"\nAudit results saved to {output_path}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit specs vs code and code vs specs")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument_patterns(identifier_index)
+        audit_trace.instrument(
+            ComprehensiveAuditor,
+            "run_comprehensive_audit", "load_extraction_data", "audit_all_widget_usage", "save_results",
+        )
+        audit_trace.instrument(ComprehensiveAuditor, "audit_module_comprehensive", cat="module",
+                               label=lambda self, module_num, *args: f"Module {module_num}")
+        audit_trace.instrument(ComprehensiveAuditor, "audit_screen_implementation", cat="file",
+                               label=lambda self, screen_path, module_num: screen_path)
+    
     auditor = ComprehensiveAuditor(".")
     results = auditor.run_comprehensive_audit()
     auditor.save_results("docs/comprehensive_audit_results.json")
     print("\nComprehensive audit complete!")
+    audit_trace.finish()
 
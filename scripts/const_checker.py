@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Const Checker
+Finds widget instantiations that could be const but are not, using an index of the const constructors in lib/
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import audit_trace
+from dart_lexer import STRING, DartTokens, word_start
+from enhanced_audit_extractor import infer_module
+from handler_extractor import call_arguments, expression_end
+from source_corpus import SourceCorpus, SourceFile
+
+# Framework constructors known to be const ("Class" or "Class.named"); classes
+# declared in lib/ are indexed from their source instead
+FRAMEWORK_CONST_CONSTRUCTORS = frozenset({
+    "Align", "Alignment", "AlwaysScrollableScrollPhysics", "AspectRatio", "BorderRadius.all", "BorderSide",
+    "BouncingScrollPhysics", "BoxConstraints", "BoxDecoration", "BoxShadow", "Card", "Center", "Chip",
+    "CircularProgressIndicator", "ClampingScrollPhysics", "ClipRRect", "Color", "ColoredBox", "Column",
+    "DecoratedBox", "Divider", "DropdownMenuItem", "Duration", "EdgeInsets.all", "EdgeInsets.fromLTRB",
+    "EdgeInsets.only", "EdgeInsets.symmetric", "Expanded", "FittedBox", "Flexible", "Hero", "Icon",
+    "IgnorePointer", "InputDecoration", "Key", "LinearGradient", "LinearProgressIndicator", "ListTile",
+    "NeverScrollableScrollPhysics", "Offset", "Opacity", "Padding", "Placeholder", "PopupMenuDivider",
+    "PopupMenuItem", "Positioned", "Radius.circular", "Row", "SafeArea", "Size", "SizedBox", "SizedBox.expand",
+    "SizedBox.shrink", "SizedBox.square", "SnackBar", "Spacer", "Stack", "Tab", "Text", "TextSpan", "TextStyle",
+    "ValueKey", "VerticalDivider", "Visibility", "Wrap",
+})
+FRAMEWORK_CONST_CLASSES = frozenset(constructor.split('.')[0] for constructor in FRAMEWORK_CONST_CONSTRUCTORS)
+# Lower-case framework types whose static members are constants (double.infinity)
+CORE_TYPES = frozenset({"double", "int"})
+
+CLASS_DECLARATION_PATTERN = re.compile(r'(class|enum)\s+(\w+)[^{;]*\{')
+STATIC_CONST_PATTERN = re.compile(r'static\s+const\s+(?:[\w<>?, ]+\s+)?(\w+)\s*=')
+CONSTRUCTOR_DECLARATION_PATTERN = re.compile(r'const\s+(\w+)(?:\s*\.\s*(\w+))?\s*\(')
+# Literal-led (a file never opens with a declaration, so line 1 need not match)
+TOP_LEVEL_CONST_PATTERN = re.compile(r'\nconst\s+(?:[\w<>?, ]+\s+)?(\w+)\s*=')
+CONST_KEYWORD_PATTERN = re.compile(r'const\s')
+# Formatted Dart never spaces a constructor name from its parenthesis
+INSTANTIATION_PATTERN = re.compile(r'(_?[A-Z]\w*)(?:\.([a-z_]\w*))?(?:<[^<>()]*>)?\(')
+NUMBER_PATTERN = re.compile(r'-?\s*(?:0[xX][0-9A-Fa-f]+|\d*\.?\d+(?:[eE][+-]?\d+)?)')
+MEMBER_PATTERN = re.compile(r'(\w+)\s*\.\s*(\w+)')
+LIST_LITERAL_PATTERN = re.compile(r'(?:<[^<>()]*>\s*)?\[')
+CONST_LITERAL_PATTERN = re.compile(r'(?:<[^<>()]*>\s*)?[\[{]')
+INTERPOLATION_PATTERN = re.compile(r'(?<!\\)\$')
+NON_SPACE_PATTERN = re.compile(r'\S')
+# Closures and lower-case identifiers other than argument labels (locals,
+# fields, methods, context, widget.x): no constant expression holds one
+NON_CONSTANT_PATTERN = re.compile(
+    r'=>|(?<![\w.$])(?!(?:true|false|null|const|double|int)\b)(?:[a-z]|_+[a-z0-9])\w*(?!\w|\s*:)'
+)
+CONSTANT_WORDS = {"true", "false", "null"}
+
+
+class ConstIndex:
+    """Const constructors, static const fields, enums and top-level constants declared in lib/
+
+    Each table maps a scope to the names declared in it: "" for public names
+    and the declaring file's lib-relative path for private (_-prefixed) ones,
+    so private classes that share a name across files (_InfoRow, _StatItem)
+    are told apart.
+    """
+
+    def __init__(self):
+        self.constructors: Dict[str, Set[str]] = {}
+        self.const_classes: Dict[str, Set[str]] = {}
+        self.classes: Dict[str, Set[str]] = {}
+        self.enums: Dict[str, Set[str]] = {}
+        self.fields: Dict[str, Set[str]] = {}
+        self.top_level: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def build(cls, corpus: SourceCorpus) -> "ConstIndex":
+        index = cls()
+        for source in corpus:
+            if source.error is None:
+                index.add(source.tokens, source.rel_path)
+        return index
+
+    @staticmethod
+    def _add(table: Dict[str, Set[str]], name: str, scope: str):
+        table.setdefault(scope if name.startswith('_') else "", set()).add(name)
+
+    @staticmethod
+    def names(table: Dict[str, Set[str]], scope: str) -> Tuple[Set[str], Set[str]]:
+        """(public, private) names of table visible from the file scope"""
+        return table.get("", set()), table.get(scope, set())
+
+    @staticmethod
+    def _has(table: Dict[str, Set[str]], name: str, scope: str) -> bool:
+        return name in table.get(scope if name.startswith('_') else "", ())
+
+    def add(self, tokens: DartTokens, scope: str):
+        """Index the declarations of one file (scope is its lib-relative path)"""
+        code = tokens.code
+        for match in CLASS_DECLARATION_PATTERN.finditer(code):
+            if not word_start(code, match.start(), after_dot=False):
+                continue
+            kind, name = match.group(1), match.group(2)
+            self._add(self.classes, name, scope)
+            if kind == "enum":
+                self._add(self.enums, name, scope)
+                continue
+            close = tokens.closing(match.end() - 1)
+            if close is None:
+                continue
+            for constructor in CONSTRUCTOR_DECLARATION_PATTERN.finditer(code, match.end(), close):
+                if constructor.group(1) == name:
+                    self._add(self.constructors, name + ("." + constructor.group(2) if constructor.group(2) else ""),
+                              scope)
+                    self._add(self.const_classes, name, scope)
+            for field in STATIC_CONST_PATTERN.finditer(code, match.end(), close):
+                self._add(self.fields, f"{name}.{field.group(1)}", scope)
+        for match in TOP_LEVEL_CONST_PATTERN.finditer(code):
+            self._add(self.top_level, match.group(1), scope)
+
+    def constructor_count(self) -> int:
+        return sum(len(names) for names in self.constructors.values())
+
+    def const_constructor(self, constructor: str, scope: str) -> bool:
+        """True if constructor ("Class" or "Class.named"), as seen from the file scope, is const"""
+        if self._has(self.constructors, constructor, scope):
+            return True
+        return (not self._has(self.classes, constructor.split('.')[0], scope)
+                and constructor in FRAMEWORK_CONST_CONSTRUCTORS)
+
+    def constant_member(self, owner: str, member: str, scope: str) -> bool:
+        """True if owner.member is a compile-time constant
+
+        Members of classes declared in lib/ must be static const fields or enum
+        values; any other Class.member (Icons.add, Colors.white,
+        MainAxisAlignment.center) is taken to be a framework constant.
+        """
+        if self._has(self.classes, owner, scope):
+            return self._has(self.enums, owner, scope) or self._has(self.fields, f"{owner}.{member}", scope)
+        return owner[0].isupper() or owner in CORE_TYPES
+
+    def constant_name(self, name: str, scope: str) -> bool:
+        """True if name is a top-level constant visible from the file scope"""
+        return self._has(self.top_level, name, scope)
+
+
+class ConstScanner:
+    """Const-eligible instantiations of one file"""
+
+    def __init__(self, tokens: DartTokens, index: ConstIndex, scope: str):
+        self.tokens = tokens
+        self.code = tokens.code
+        self.index = index
+        self.scope = scope
+        # start of an instantiation -> whether it is a constant expression
+        self._constant_calls: Dict[int, bool] = {}
+        self._constants = index.names(index.top_level, scope)
+
+    def _holds_non_constant(self, start: int, end: int) -> bool:
+        """True if code[start:end] holds a NON_CONSTANT_PATTERN hit (rejecting it without an argument walk)
+
+        Calls that are not constant tend to show a local or a closure early on,
+        so the search usually stops well before end.
+        """
+        public, private = self._constants
+        match = NON_CONSTANT_PATTERN.search(self.code, start, end)
+        while match is not None and (match.group() in public or match.group() in private):
+            match = NON_CONSTANT_PATTERN.search(self.code, match.end(), end)
+        return match is not None
+
+    def opportunities(self) -> List[tuple]:
+        """(start, open paren, close paren, constructor) of each outermost instantiation that could be const"""
+        code = self.code
+        tokens = self.tokens
+        const_constructor = self.index.const_constructor
+        # Classes with some const constructor, to drop every other call at a set lookup
+        public, private = self.index.names(self.index.const_classes, self.scope)
+        # Explicit const expressions and declarations nest or are disjoint, so an
+        # offset is inside one iff it precedes the furthest end seen so far
+        contexts = [match.start() for match in CONST_KEYWORD_PATTERN.finditer(code)
+                    if word_start(code, match.start(), after_dot=False)]
+        covered = 0
+        reached = 0
+        found = []
+        for match in INSTANTIATION_PATTERN.finditer(code):
+            name, named = match.group(1, 2)
+            if name not in public and name not in private and name not in FRAMEWORK_CONST_CLASSES:
+                continue
+            constructor = name + "." + named if named else name
+            if not const_constructor(constructor, self.scope):
+                continue
+            start = match.start()
+            if not word_start(code, start, after_dot=False):
+                continue
+            while reached < len(contexts) and contexts[reached] < start:
+                if contexts[reached] >= covered:  # a nested context ends within the one holding it
+                    covered = max(covered, expression_end(tokens, contexts[reached] + 6))
+                reached += 1
+            if start < covered:  # includes a const written on the line above the call
+                continue
+            close = tokens.closing(match.end() - 1)
+            if close is None or not self._constant_call(start, match.end() - 1, close):
+                continue
+            found.append((start, match.end() - 1, close, constructor))
+            covered = max(covered, close + 1)
+        return found
+
+    def _constant_call(self, start: int, open_paren: int, close: int) -> bool:
+        if start not in self._constant_calls:
+            self._constant_calls[start] = not self._holds_non_constant(open_paren, close) and all(
+                self.constant(value_start, value_end)
+                for _, value_start, value_end in call_arguments(self.tokens, open_paren, close)
+            )
+        return self._constant_calls[start]
+
+    def constant(self, start: int, end: int) -> bool:
+        """True if code[start:end] is a constant expression (literals, constants, const-able calls and lists)"""
+        code = self.code
+        while start < end and code[start].isspace():
+            start += 1
+        while end > start and code[end - 1].isspace():
+            end -= 1
+        if start == end:
+            return False
+        first = code[start]
+        if first in '\'"':
+            return self._constant_string(start, end)
+        if first.isdigit() or first in '-.':
+            return NUMBER_PATTERN.fullmatch(code, start, end) is not None
+        if first == '[' or first == '<':
+            literal = LIST_LITERAL_PATTERN.match(code, start, end)
+            return literal is not None and self._constant_list(literal.end() - 1, end)
+        if end - start <= 5 and code[start:end] in CONSTANT_WORDS:
+            return True
+        if CONST_KEYWORD_PATTERN.match(code, start, end):
+            # Already const, as long as the const call or literal is the whole value
+            # (not const Color(...).withOpacity(0.1))
+            head = start + 6
+            while code[head].isspace():
+                head += 1
+            literal = INSTANTIATION_PATTERN.match(code, head, end) or CONST_LITERAL_PATTERN.match(code, head, end)
+            return literal is not None and self.tokens.closing(literal.end() - 1) == end - 1
+        instantiation = INSTANTIATION_PATTERN.match(code, start, end)
+        if instantiation is not None:
+            name, named = instantiation.group(1, 2)
+            close = self.tokens.closing(instantiation.end() - 1)
+            return (close == end - 1 and self.index.const_constructor(name + "." + named if named else name, self.scope)
+                    and self._constant_call(start, instantiation.end() - 1, close))
+        member = MEMBER_PATTERN.fullmatch(code, start, end)
+        if member is not None:
+            return self.index.constant_member(member.group(1), member.group(2), self.scope)
+        return self.index.constant_name(code[start:end], self.scope)
+
+    def _constant_string(self, start: int, end: int) -> bool:
+        """True if code[start:end] is one or more adjacent string literals without interpolation"""
+        text = self.tokens.text
+        pos = start
+        while pos < end:
+            literal = self.tokens.literal_at(pos)
+            if literal is None or literal.kind != STRING:
+                return False
+            if text[literal.start] != 'r' and INTERPOLATION_PATTERN.search(text, literal.start, literal.end):
+                return False
+            pos = literal.end
+            while pos < end and self.code[pos].isspace():
+                pos += 1
+        return pos == end
+
+    def _constant_list(self, bracket: int, end: int) -> bool:
+        """True if the list literal opened at bracket (and closed at end - 1) has only constant elements"""
+        close = self.tokens.closing(bracket)
+        if close != end - 1 or self._holds_non_constant(bracket, close):
+            return False
+        pos = bracket + 1
+        while pos < close:
+            item_end = expression_end(self.tokens, pos)
+            if NON_SPACE_PATTERN.search(self.code, pos, item_end) and not self.constant(pos, item_end):
+                return False
+            if item_end >= close:
+                break
+            pos = item_end + 1
+        return True
+
+
+class ConstChecker:
+    """Counts const-eligible instantiations per file and per module in lib/screens and lib/widgets"""
+
+    def __init__(self, root_dir: str, corpus: SourceCorpus = None):
+        self.root_dir = Path(root_dir)
+        self.code_dir = self.root_dir / "lib"
+        self.corpus = corpus or SourceCorpus.shared(self.code_dir)
+        self.index: Optional[ConstIndex] = None
+        self.files: List[Dict] = []
+
+    @staticmethod
+    def module_of(source: SourceFile) -> str:
+        """Module number for screens, the lib-relative directory (e.g. widgets/global) for anything else"""
+        if source.rel_path.startswith("screens/"):
+            return infer_module(source.path)
+        return source.rel_path.rsplit('/', 1)[0]
+
+    def check_file(self, source: SourceFile) -> Dict:
+        """Const-eligible instantiations of one file"""
+        result = {"path": source.rel_path, "module": self.module_of(source)}
+        try:
+            tokens = source.tokens
+        except Exception as e:
+            result["error"] = f"Could not read file: {str(e)}"
+            return result
+        opportunities = []
+        for start, open_paren, close, constructor in ConstScanner(tokens, self.index, source.rel_path).opportunities():
+            line, column = source.lines.line_col(start)
+            opportunities.append({
+                "line": line,
+                "column": column,
+                "constructor": constructor,
+                "old": tokens.text[start:open_paren + 1],
+                "new": "const " + tokens.text[start:open_paren + 1],
+            })
+        result["count"] = len(opportunities)
+        result["opportunities"] = opportunities
+        return result
+
+    def check_all_files(self):
+        """Index the const declarations of lib/, then check every screen and widget file"""
+        self.index = ConstIndex.build(self.corpus)
+        sources = self.corpus.under("screens") + self.corpus.under("widgets")
+        self.files = [self.check_file(source) for source in sources]
+
+    def summarize(self) -> Dict:
+        """Totals per module and per constructor"""
+        modules: Dict[str, Dict] = {}
+        constructors: Dict[str, int] = {}
+        for result in self.files:
+            module = modules.setdefault(result["module"], {"files": 0, "opportunities": 0})
+            module["files"] += 1
+            module["opportunities"] += result.get("count", 0)
+            for opportunity in result.get("opportunities", []):
+                constructors[opportunity["constructor"]] = constructors.get(opportunity["constructor"], 0) + 1
+        return {
+            "files": len(self.files),
+            "opportunities": sum(module["opportunities"] for module in modules.values()),
+            "const_constructors_indexed": self.index.constructor_count() if self.index else 0,
+            "modules": dict(sorted(modules.items(), key=lambda item: (-item[1]["opportunities"], item[0]))),
+            "constructors": dict(sorted(constructors.items(), key=lambda item: (-item[1], item[0]))),
+        }
+
+    def fix_list(self) -> List[Dict]:
+        """Fixes in the fix_all_issues_parallel.py shape: file (project-relative), line, old and new text"""
+        return [
+            {"file": f"lib/{result['path']}", "line": opportunity["line"],
+             "old": opportunity["old"], "new": opportunity["new"]}
+            for result in self.files
+            for opportunity in result.get("opportunities", [])
+        ]
+
+    def run_checks(self) -> Dict:
+        """Run the const checks and print the totals per module"""
+        print("Checking screens and widgets for missing const constructors...")
+        self.check_all_files()
+        summary = self.summarize()
+        print(f"\nFound {summary['opportunities']} const opportunities in {summary['files']} files "
+              f"({summary['const_constructors_indexed']} const constructors indexed in lib/)")
+        for module, totals in summary["modules"].items():
+            if totals["opportunities"]:
+                print(f"  - {module}: {totals['opportunities']}")
+        return {
+            "summary": summary,
+            "files": [result for result in self.files if result.get("count") or result.get("error")],
+        }
+
+    def save_results(self, results, output_file: str):
+        """Save results to JSON"""
+        with open(self.root_dir / output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find widget instantiations that could be const")
+    parser.add_argument("--fixes", metavar="PATH",
+                        help="also write the fix list (file, line, old, new) to PATH, relative to the project root")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument(ConstChecker, "run_checks", "check_all_files", "save_results")
+        audit_trace.instrument(ConstChecker, "check_file", cat="file", label=lambda self, source: source.rel_path)
+
+    checker = ConstChecker(".")
+    results = checker.run_checks()
+    checker.save_results(results, "docs/const_opportunities.json")
+    if args.fixes:
+        checker.save_results(checker.fix_list(), args.fixes)
+    audit_trace.finish()
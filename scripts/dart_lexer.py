@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Dart Lexer
+Single-pass tokenizer marking comments, strings, identifiers and bracket depth in Dart source
+"""
+
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from typing import Iterator, List, Optional
+
+COMMENT = "comment"
+STRING = "string"
+IDENTIFIER = "identifier"
+NUMBER = "number"
+OPEN = "open"
+CLOSE = "close"
+PUNCT = "punct"
+
+# kind is one of the constants above; depth is the bracket nesting level the
+# token sits at (an opening bracket and its matching close share a depth)
+Token = namedtuple("Token", "kind start end depth")
+# A comment or string found by the literal-only pass (kind is COMMENT or STRING)
+Literal = namedtuple("Literal", "kind start end")
+
+# Literals without ${...} interpolation are matched whole; interpolated strings,
+# raw strings and (possibly nested) block comments go to the scanners below.
+# Every branch starts from one character of [/'"] (so a search can skip plain
+# code at C speed) and dispatches on it with a lookbehind.
+_LITERALS = r'''
+    [/'"]
+    (?:
+        (?<=/)(?:(?P<comment>/[^\n]*)|(?P<block_comment>\*))
+      | (?P<string>
+            (?<=')(?:''(?:[^'\\$]|\\[\s\S]|\$(?!\{)|'(?!''))*\'\'\' | (?!'')(?:[^'\\\n$]|\\.|\$(?!\{))*')
+          | (?<=")(?:""(?:[^"\\$]|\\[\s\S]|\$(?!\{)|"(?!""))*""" | (?!"")(?:[^"\\\n$]|\\.|\$(?!\{))*")
+        )
+      | (?P<string_start>(?<=['"]))
+    )
+'''
+
+# Most frequent alternatives first; an r directly before a quote starts a raw string
+_TOKEN_PATTERN = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<identifier>(?:r(?!['"])|[A-Za-qs-z_$])[A-Za-z0-9_$]*)
+  | (?P<open>[(\[{])
+  | (?P<close>[)\]}])
+  | (?P<punct>[^\sA-Za-z0-9_$'"(){}\[\]/]+|/(?![/*]))
+  | ''' + _LITERALS + r'''
+  | (?P<raw_string_start>r)
+  | (?P<number>0[xX][0-9A-Fa-f]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+''', re.VERBOSE)
+
+# Comments and strings only
+_LITERAL_PATTERN = re.compile(_LITERALS, re.VERBOSE)
+# Matches at every single quote; plain holds the rest of a one-line string
+# without escapes or interpolation (the bulk of Dart literals). A pattern led
+# by one literal character is scanned for at C speed, unlike [/'"] above
+_SINGLE_QUOTE_PATTERN = re.compile(r"'(?P<plain>(?!'')[^'\\\n$]*')?")
+_CLOSERS = {'(': ')', '[': ']', '{': '}'}
+
+_BLOCK_COMMENT_PATTERN = re.compile(r'/\*|\*/')
+_BLANK = re.compile(r'[^\n]')
+
+
+def _skip_block_comment(text: str, pos: int) -> int:
+    """End of the (nestable) block comment opening at pos"""
+    depth = 0
+    for match in _BLOCK_COMMENT_PATTERN.finditer(text, pos):
+        depth += 1 if match.group(0) == '/*' else -1
+        if depth == 0:
+            return match.end()
+    return len(text)
+
+
+def _skip_interpolation(text: str, pos: int) -> int:
+    """End of a ${...} expression whose body starts at pos (just after the brace)"""
+    depth = 1
+    length = len(text)
+    while pos < length:
+        match = _TOKEN_PATTERN.match(text, pos)
+        if match is None:
+            pos += 1
+            continue
+        kind = match.lastgroup
+        if kind == "block_comment":
+            pos = _skip_block_comment(text, pos)
+            continue
+        if kind == "string_start" or kind == "raw_string_start":
+            pos = _skip_string(text, pos)
+            continue
+        pos = match.end()
+        if kind == "open" and match.group(0) == '{':
+            depth += 1
+        elif kind == "close" and match.group(0) == '}':
+            depth -= 1
+            if depth == 0:
+                return pos
+    return length
+
+
+def _skip_string(text: str, pos: int) -> int:
+    """End of the string literal starting at pos, stepping over ${...} interpolations"""
+    raw = text[pos] == 'r'
+    if raw:
+        pos += 1
+    quote = text[pos:pos + 3] if text[pos:pos + 3] in ("'''", '"""') else text[pos]
+    pos += len(quote)
+    length = len(text)
+    while pos < length:
+        if text.startswith(quote, pos):
+            return pos + len(quote)
+        char = text[pos]
+        if char == '\n' and len(quote) == 1:
+            return pos  # unterminated single-line literal
+        if char == '\\' and not raw:
+            pos += 2
+        elif char == '$' and not raw and text.startswith('${', pos):
+            pos = _skip_interpolation(text, pos + 2)
+        else:
+            pos += 1
+    return length
+
+
+def _blank_string(literal: str) -> str:
+    """A string literal with everything but its quotes (and line breaks) turned into spaces"""
+    quote = literal[0]
+    if quote in '\'"' and len(literal) > 2 and quote == literal[-1] != literal[1] and '\n' not in literal:
+        # One-line string (not raw, not triple-quoted): the common case
+        return quote + ' ' * (len(literal) - 2) + quote
+    prefix = 1 if literal[0] == 'r' else 0
+    quote = literal[prefix:prefix + 3] if literal[prefix:prefix + 3] in ("'''", '"""') else literal[prefix]
+    head = prefix + len(quote)
+    if len(literal) >= head + len(quote) and literal.endswith(quote):
+        if '\n' not in literal:
+            return ' ' * prefix + quote + ' ' * (len(literal) - head - len(quote)) + quote
+        return ' ' * prefix + quote + _BLANK.sub(' ', literal[head:-len(quote)]) + quote
+    return ' ' * prefix + quote + _BLANK.sub(' ', literal[head:])
+
+
+def tokenize(text: str) -> List[Token]:
+    """Every non-whitespace token of text, in order"""
+    tokens = []
+    append = tokens.append
+    depth = 0
+    pos = 0
+    length = len(text)
+    while pos < length:
+        for match in _TOKEN_PATTERN.finditer(text, pos):
+            kind = match.lastgroup
+            if kind == "ws":
+                continue
+            start = match.start()
+            if kind == "identifier" or kind == "punct" or kind == "number" or kind == "string" or kind == "comment":
+                append(Token(kind, start, match.end(), depth))
+            elif kind == "open":
+                append(Token(OPEN, start, start + 1, depth))
+                depth += 1
+            elif kind == "close":
+                depth = max(depth - 1, 0)
+                append(Token(CLOSE, start, start + 1, depth))
+            else:
+                # Hand-scanned token: resume the fast loop after it
+                if kind == "block_comment":
+                    pos = _skip_block_comment(text, start)
+                    append(Token(COMMENT, start, pos, depth))
+                else:
+                    pos = _skip_string(text, start)
+                    append(Token(STRING, start, pos, depth))
+                break
+        else:
+            break
+    return tokens
+
+
+def word_start(code: str, pos: int, after_dot: bool = True) -> bool:
+    """True if pos starts an identifier (not preceded by an identifier character, nor by a dot unless after_dot)
+
+    Scan patterns start with a literal rather than \\b, which would disable the
+    regex engine's literal-prefix scan; this check runs on the few matches instead.
+    """
+    if pos == 0:
+        return True
+    char = code[pos - 1]
+    return not (char.isalnum() or char == '_' or char == '$' or (char == '.' and not after_dot))
+
+
+def _raw_prefix(text: str, start: int) -> bool:
+    """Whether the quote at start is preceded by a raw-string r (and not an identifier ending in r)"""
+    if start == 0 or text[start - 1] != 'r':
+        return False
+    return start == 1 or not (text[start - 2].isalnum() or text[start - 2] in '_$')
+
+
+def _special_literal(text: str, start: int) -> Optional[Literal]:
+    """The literal opened at start (a slash or quote), or None for a slash opening no comment"""
+    match = _LITERAL_PATTERN.match(text, start)
+    if match is None:
+        return None
+    kind = match.lastgroup
+    if kind == "comment" or (kind == "string" and not _raw_prefix(text, start)):
+        return Literal(kind, start, match.end())
+    if kind == "block_comment":
+        return Literal(COMMENT, start, _skip_block_comment(text, start))
+    if _raw_prefix(text, start):
+        start -= 1
+    return Literal(STRING, start, _skip_string(text, start))
+
+
+def _literal_spans(text: str, pos: int = 0) -> Iterator[tuple]:
+    """(start, end, literal) of every comment and string literal from pos (an offset in code) on; literal is None for a plain string
+
+    Plain single-quoted strings (one line, no escapes, interpolation or raw
+    prefix) come straight from a fast single-quote scan and are never built
+    into Literals here; anything else (comments, double quotes, interpolated,
+    raw or triple-quoted strings) is matched at its first character, located
+    with str.find.
+    """
+    find = text.find
+    length = len(text)
+    slash = find('/', pos)
+    double = find('"', pos)
+    if slash < 0:
+        slash = length
+    if double < 0:
+        double = length
+    while pos < length:
+        start = slash if slash < double else double
+        # Every quote before start either is a plain string or stops the scan
+        for match in _SINGLE_QUOTE_PATTERN.finditer(text, pos, start):
+            if match.lastindex is None or _raw_prefix(text, match.start()):
+                start = match.start()
+                break
+            yield match.start(), match.end(), None
+        if start >= length:
+            break
+        literal = _special_literal(text, start)
+        if literal is None:
+            end = start + 1
+        else:
+            end = literal.end
+            yield literal.start, end, literal
+        pos = end
+        if slash < end:
+            slash = find('/', end)
+            if slash < 0:
+                slash = length
+        if double < end:
+            double = find('"', end)
+            if double < 0:
+                double = length
+
+
+def scan_literals(text: str) -> List[Literal]:
+    """Comments and string literals of text, in order"""
+    return [literal or Literal(STRING, start, end) for start, end, literal in _literal_spans(text)]
+
+
+def _blank_literal(text: str, literal: Literal) -> str:
+    """Code-view text of one literal: spaces for its content, keeping a string's quotes and line breaks"""
+    segment = text[literal.start:literal.end]
+    if literal.kind == STRING:
+        return _blank_string(segment)
+    if '\n' in segment:
+        return _BLANK.sub(' ', segment)
+    return ' ' * len(segment)
+
+
+def blank_literals(text: str) -> tuple:
+    """(code view, literals other than plain single-quoted strings) of text, in one pass
+
+    Between two comment or double-quote openers, a stretch whose quotes all
+    pair up into plain strings (one line, no escape, ${...}, raw prefix or
+    triple quote) is blanked with one split on the quote; any other stretch
+    is scanned literal by literal until one reaches the opener. The code view
+    keeps every string's quotes, so a plain string (the only kind left out of
+    the list) is recovered from its line when needed.
+    """
+    pieces = []
+    piece = pieces.append
+    marked = []
+    find = text.find
+    length = len(text)
+    slash = find('/')
+    double = find('"')
+    if slash < 0:
+        slash = length
+    if double < 0:
+        double = length
+    pos = 0
+    while pos < length:
+        while slash < pos or (slash < length and text[slash + 1:slash + 2] not in ('/', '*')):
+            slash = find('/', slash + 1)
+            if slash < 0:
+                slash = length
+        if double < pos:
+            double = find('"', pos)
+            if double < 0:
+                double = length
+        stop = slash if slash < double else double
+        stretch = text[pos:stop]
+        parts = stretch.split("'")
+        # Escapes and interpolations sit between a pair of quotes, so only
+        # the string contents (a few percent of the text) are searched
+        contents = ''.join(parts[1::2])
+        if (len(parts) % 2 and '\n' not in contents and '\\' not in contents and '${' not in contents
+                and not ('' in parts and "'''" in stretch)
+                and not any(part[-1:] == 'r' for part in parts[:-1:2])
+                and text[stop - 1:stop] != 'r'):
+            parts[1::2] = [' ' * len(part) for part in parts[1::2]]
+            piece("'".join(parts))
+            if stop == length:
+                break
+            # A comment or double-quoted string: stop is in code
+            literal = _special_literal(text, stop)
+            marked.append(literal)
+            piece(_blank_literal(text, literal))
+            pos = literal.end
+            continue
+        last = pos
+        for start, end, literal in _literal_spans(text, pos):
+            if literal is None:
+                piece(text[last:start + 1])
+                piece(' ' * (end - start - 2))
+                last = end - 1
+            else:
+                marked.append(literal)
+                piece(text[last:start])
+                piece(_blank_literal(text, literal))
+                last = end
+            if end > stop:
+                break
+        else:
+            piece(text[last:])
+            break
+        piece(text[last:end])
+        pos = end
+    return ''.join(pieces), marked
+
+
+class DartTokens:
+    """Lexed view of one Dart file, built once and shared by every analyzer
+
+    code is the source with comments and string contents blanked out
+    (offsets and line breaks preserved), so the analyzers' patterns can run
+    on it without firing on commented-out code or text inside literals.
+    Only comments and strings are located up front; the full token stream
+    (identifiers, punctuation, bracket depth) is built on first use.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        # Comments and every string but the plain single-quoted ones
+        self.code, self._marked = blank_literals(text)
+        self._marked_starts = [literal.start for literal in self._marked]
+        self._literals = None
+        self._tokens = None
+
+    @property
+    def tokens(self) -> List[Token]:
+        if self._tokens is None:
+            self._tokens = tokenize(self.text)
+        return self._tokens
+
+    @property
+    def literals(self) -> List[Literal]:
+        """Every comment and string literal, in order (built on first use)"""
+        if self._literals is None:
+            self._literals = scan_literals(self.text)
+        return self._literals
+
+    def token_text(self, token) -> str:
+        return self.text[token.start:token.end]
+
+    @property
+    def comments(self) -> List[Literal]:
+        return [literal for literal in self._marked if literal.kind == COMMENT]
+
+    def identifiers(self) -> Iterator[str]:
+        """Identifier texts in code (never inside comments or literals)"""
+        text = self.text
+        return (text[token.start:token.end] for token in self.tokens if token.kind == IDENTIFIER)
+
+    def literal_at(self, offset: int) -> Optional[Literal]:
+        """The comment or string containing offset, if any
+
+        Past the last listed literal, every quote up to offset on its line
+        belongs to a plain string, so their parity tells whether offset sits
+        in one.
+        """
+        index = bisect_right(self._marked_starts, offset) - 1
+        line_start = self.code.rfind('\n', 0, offset) + 1
+        if index >= 0:
+            literal = self._marked[index]
+            if offset < literal.end:
+                return literal
+            line_start = max(line_start, literal.end)
+        code = self.code
+        if offset >= len(code):
+            return None
+        if code.count("'", line_start, offset) % 2:
+            start = code.rfind("'", line_start, offset)
+        elif code[offset] == "'":
+            start = offset
+        else:
+            return None
+        return Literal(STRING, start, code.index("'", start + 1) + 1)
+
+    def in_comment(self, offset: int) -> bool:
+        index = bisect_right(self._marked_starts, offset) - 1
+        return index >= 0 and offset < self._marked[index].end and self._marked[index].kind == COMMENT
+
+    def in_code(self, offset: int) -> bool:
+        """True unless offset falls inside a comment or a string literal"""
+        return self.literal_at(offset) is None
+
+    def comment_text(self, start: int, end: int) -> str:
+        """Concatenated text of the comments lying within [start, end)"""
+        index = bisect_right(self._marked_starts, start - 1)
+        parts = []
+        for literal in self._marked[index:]:
+            if literal.start >= end:
+                break
+            if literal.kind == COMMENT and literal.end <= end:
+                parts.append(self.text[literal.start:literal.end])
+        return '\n'.join(parts)
+
+    def closing(self, offset: int) -> Optional[int]:
+        """Offset of the bracket closing the one opened at offset (None if unbalanced)
+
+        Only brackets of the same kind are counted, and only up to the
+        close: each candidate closer costs one find and one count over the
+        blanked code, so no other bracket in the file is paired.
+        """
+        code = self.code
+        closer = _CLOSERS.get(code[offset]) if offset < len(code) else None
+        if closer is None:
+            return None
+        opener = code[offset]
+        depth = 1
+        pos = offset + 1
+        while True:
+            close = code.find(closer, pos)
+            if close < 0:
+                return None
+            depth += code.count(opener, pos, close) - 1
+            if not depth:
+                return close
+            pos = close + 1
@@ -7,14 +7,72 @@ Extracts detailed features, capabilities, interactions, and backend requirements
 import os
 import re
 import json
+import argparse
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Callable, Dict, List, Set, Tuple
+
+import audit_trace
+import spec_outline
+from analysis_cache import AnalysisCache
+from source_corpus import SourceCorpus, SourceFile
+from spec_outline import OutlineNode, SpecOutline, SpecSection
+
+# Bump whenever _analyze_screen_file/_analyze_widget_file/_analyze_model_file
+# (or anything they depend on, like _infer_module) changes its output.
+ANALYZER_VERSION = "2"
+
+SCREEN_CLASS_PATTERN = re.compile(r'class\s+(\w+Screen)')
+CLASS_PATTERN = re.compile(r'class\s+(\w+)')
+WIDGET_METHOD_PATTERN = re.compile(r'Widget\s+(_build\w+)\([^)]*\)')
+ACTION_METHOD_PATTERN = re.compile(r'void\s+(_handle\w+)\([^)]*\)')
+PRIVATE_METHOD_PATTERN = re.compile(r'void\s+(_\w+)\([^)]*\)')
+API_CALL_PATTERN = re.compile(r'await\s+\w+\.(fetch|get|post|put|delete|patch)')
+BACKEND_NOTE_PATTERN = re.compile(r'#.*backend|//.*backend|/\*.*backend', re.IGNORECASE)
+IMPORT_PATTERN = re.compile(r'^import\s+[\'"].+?[\'"];', re.MULTILINE)
+FIELD_PATTERN = re.compile(r'final\s+(\w+)\s+(\w+);')
+STATELESS_WIDGET_PATTERN = re.compile(r'StatelessWidget')
+STATEFUL_WIDGET_PATTERN = re.compile(r'StatefulWidget')
+COMPONENT_NAME_PATTERN = re.compile(r'\b([A-Z][a-zA-Z0-9]+)\b')
+
+# Screen directory -> spec module number
+SCREEN_MODULES = {
+    "inbox": "3.1",
+    "ai_hub": "3.11",
+    "jobs": "3.3",
+    "calendar": "3.4",
+    "money": "3.5",
+    "quotes": "3.5",
+    "contacts": "3.6",
+    "reviews": "3.7",
+    "notifications": "3.8",
+    "settings": "3.12",
+    "home": "3.10",
+    "onboarding": "3.14",
+    "reports": "3.16",
+    "support": "unknown",
+    "legal": "unknown",
+}
+
+
+def infer_module(screen_file: Path) -> str:
+    """Module number of a screen, from the directory it lives in ("unknown" if unmapped)"""
+    return SCREEN_MODULES.get(Path(screen_file).parent.name, "unknown")
+
+
+def screen_module(module_num: str) -> str:
+    """The module of a screen ("3.N", as infer_module gives it) for the spec module keyed N"""
+    return f"3.{module_num}"
+
 
 class EnhancedAuditExtractor:
-    def __init__(self, root_dir: str):
+    def __init__(self, root_dir: str, corpus: SourceCorpus = None, use_cache: bool = True):
         self.root_dir = Path(root_dir)
         self.specs_dir = self.root_dir / "docs" / "specs"
         self.code_dir = self.root_dir / "lib"
+        self.corpus = corpus or SourceCorpus.shared(self.code_dir)
+        self.cache = AnalysisCache(self.root_dir, "enhanced_audit_extractor", ANALYZER_VERSION) if use_cache else None
+        # rel_path -> (content_hash, result) for files analyzed by this instance
+        self._analyzed: Dict[str, Tuple[str, Dict]] = {}
         self.results = {
             "modules": {},
             "screens": [],
@@ -29,163 +87,113 @@ class EnhancedAuditExtractor:
         if not product_def.exists():
             return {}
         
+        # Parse the spec once; every extractor below is a query over this outline
+        return self.modules_from_outline(SpecOutline.from_file(product_def))
+    
+    def modules_from_outline(self, outline: SpecOutline) -> Dict:
+        """Module details for every module section of a parsed Product Definition"""
         modules = {}
-        
-        with open(product_def, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Find all module sections (### 3.X)
-        module_pattern = r'^### 3\.(\d+)\s+(.+?)$'
-        matches = list(re.finditer(module_pattern, content, re.MULTILINE))
-        
-        for i, match in enumerate(matches):
-            module_num = match.group(1)
-            module_name = match.group(2).strip()
-            
-            # Get section content (until next module or end)
-            start_pos = match.end()
-            if i + 1 < len(matches):
-                end_pos = matches[i + 1].start()
-            else:
-                end_pos = len(content)
-            
-            section_content = content[start_pos:end_pos]
-            
+        for module_num, section in outline.modules().items():
             modules[module_num] = {
                 "number": module_num,
-                "name": module_name,
-                "purpose": self._extract_purpose(section_content),
-                "core_capabilities": self._extract_core_capabilities(section_content),
-                "features": self._extract_features(section_content),
-                "interactions": self._extract_interactions(section_content),
-                "ui_components": self._extract_ui_components(section_content),
-                "enhancements": self._extract_enhancements(section_content),
-                "future_features": self._extract_future_features(section_content),
-                "automations": self._extract_automations(section_content),
+                "name": section.name,
+                "purpose": self._extract_purpose(section),
+                "core_capabilities": self._extract_core_capabilities(section),
+                "features": self._extract_features(section),
+                "interactions": self._extract_interactions(section),
+                "ui_components": self._extract_ui_components(section),
+                "enhancements": self._extract_enhancements(section),
+                "future_features": self._extract_future_features(section),
+                "automations": self._extract_automations(section),
             }
         
         return modules
     
-    def _extract_purpose(self, content: str) -> str:
+    def _named_items(self, bullets: List[OutlineNode]) -> List[Dict]:
+        """Turn '- **Name:** description' bullets (with nested bullets inlined) into dicts"""
+        items = []
+        for bullet in bullets:
+            named = bullet.bold_name()
+            if named:
+                items.append({
+                    "name": named[0],
+                    "description": named[1]
+                })
+        return items
+    
+    def _extract_purpose(self, section: SpecSection) -> str:
         """Extract purpose statement"""
-        purpose_match = re.search(r'\*\*Purpose:\*\*(.+?)(?=\n\n|\*\*|$)', content, re.DOTALL)
-        if purpose_match:
-            return purpose_match.group(1).strip()
-        return ""
+        return section.label_text(r'^Purpose$')
     
-    def _extract_core_capabilities(self, content: str) -> List[str]:
+    def _extract_core_capabilities(self, section: SpecSection) -> List[Dict]:
         """Extract core capabilities list"""
-        capabilities = []
-        # Look for "Core Capabilities:" section
-        capabilities_match = re.search(r'\*\*Core Capabilities:\*\*(.*?)(?=\*\*|🆕|🔮|\*\*Interactions|\*\*UI|\*\*Automations|$)', content, re.DOTALL)
-        if capabilities_match:
-            cap_section = capabilities_match.group(1)
-            # Extract bullet points - handle nested bullets
-            # Pattern: - **Name:** Description (may span multiple lines until next - ** or empty line)
-            pattern = r'^- \*\*(.+?)\*\*:\s*((?:[^\n]|\n(?!- \*\*|\n\n))+?)(?=\n- \*\*|\n\n|\Z)'
-            bullets = re.findall(pattern, cap_section, re.MULTILINE | re.DOTALL)
-            for bullet in bullets:
-                cap_name = bullet[0].strip()
-                cap_desc = bullet[1].strip() if len(bullet) > 1 else ""
-                # Clean up description (remove extra whitespace, handle nested bullets)
-                cap_desc = re.sub(r'\n\s+-', ' -', cap_desc)  # Convert nested bullets to inline
-                cap_desc = ' '.join(cap_desc.split())  # Normalize whitespace
-                capabilities.append({
-                    "name": cap_name,
-                    "description": cap_desc
-                })
+        capabilities = self._named_items(section.label_bullets(r'^Core Capabilities$'))
         
         # If no capabilities found, try using features list as fallback
         if not capabilities:
-            features = self._extract_features(content)
-            for feature in features[:15]:  # Limit to first 15
-                # Extract capability name from feature string
-                match = re.match(r'\*\*(.+?)\*\*:', feature)
-                if match:
-                    capabilities.append({
-                        "name": match.group(1).strip(),
-                        "description": feature.replace(match.group(0), '').strip()
-                    })
+            capabilities = self._named_items(self._feature_bullets(section)[:15])  # Limit to first 15
         
         return capabilities
     
-    def _extract_features(self, content: str) -> List[str]:
+    def _feature_bullets(self, section: SpecSection) -> List[OutlineNode]:
+        """Top-level bullets that read like features"""
+        # Filter out very short items
+        return [b for b in section.top_level_bullets() if len(b.text) > 10][:20]  # Limit to first 20 to avoid noise
+    
+    def _extract_features(self, section: SpecSection) -> List[str]:
         """Extract feature list"""
-        features = []
-        # Look for numbered or bulleted feature lists
-        feature_pattern = r'^[-*]\s+(.+?)(?=\n[-*] |\n\n|\Z)'
-        matches = re.finditer(feature_pattern, content, re.MULTILINE)
-        for match in matches:
-            feature = match.group(1).strip()
-            if feature and len(feature) > 10:  # Filter out very short items
-                features.append(feature)
-        return features[:20]  # Limit to first 20 to avoid noise
+        return [b.text for b in self._feature_bullets(section)]
     
-    def _extract_interactions(self, content: str) -> List[str]:
+    def _extract_interactions(self, section: SpecSection) -> List[str]:
         """Extract interaction patterns"""
-        interactions = []
-        # Look for "Interactions:" section
-        interactions_match = re.search(r'\*\*Interactions?:\*\*(.*?)(?=\*\*|$)', content, re.DOTALL)
-        if interactions_match:
-            inter_section = interactions_match.group(1)
-            bullets = re.findall(r'^-\s+(.+?)(?=\n- |\n\n|\Z)', inter_section, re.MULTILINE)
-            for bullet in bullets:
-                interactions.append(bullet.strip())
-        return interactions
+        return [b.text for b in section.label_bullets(r'^Interactions?$')]
     
-    def _extract_ui_components(self, content: str) -> List[str]:
+    def _extract_ui_components(self, section: SpecSection) -> List[str]:
         """Extract UI component references"""
         components = []
-        # Look for "UI Components:" or "UI Enhancements:" section
-        ui_match = re.search(r'\*\*UI\s+(?:Components|Enhancements?):\*\*(.*?)(?=\*\*|$)', content, re.DOTALL)
-        if ui_match:
-            ui_section = ui_match.group(1)
+        # Look for "UI Components:" or "UI Enhancements:" blocks
+        for label in section.labels(r'^UI\s+(?:Components|Enhancements?)$'):
             # Extract component names (usually capitalized CamelCase)
-            component_names = re.findall(r'\b([A-Z][a-zA-Z0-9]+)\b', ui_section)
-            components.extend(component_names)
-        return list(set(components))  # Remove duplicates
+            components.extend(COMPONENT_NAME_PATTERN.findall(label.body_text()))
+        return list(dict.fromkeys(components))  # Remove duplicates, keep spec order
     
-    def _extract_enhancements(self, content: str) -> List[str]:
+    def _extract_enhancements(self, section: SpecSection) -> List[Dict]:
         """Extract v2.5.1 enhancements"""
-        enhancements = []
-        # Look for enhancement sections
-        enh_match = re.search(r'🆕\s+v2\.5\.1\s+Enhancements?:(.*?)(?=🔮|🆕|\*\*|$)', content, re.DOTALL)
-        if enh_match:
-            enh_section = enh_match.group(1)
-            bullets = re.findall(r'^-\s+\*\*(.+?)\*\*:?\s*(.+?)(?=\n- |\n\n|\Z)', enh_section, re.MULTILINE)
-            for bullet in bullets:
-                enhancements.append({
-                    "name": bullet[0].strip(),
-                    "description": bullet[1].strip() if len(bullet) > 1 else ""
-                })
-        return enhancements
+        return self._named_items(section.label_bullets(r'🆕\s+v2\.5\.1\s+Enhancements?'))
     
-    def _extract_future_features(self, content: str) -> List[str]:
+    def _extract_future_features(self, section: SpecSection) -> List[Dict]:
         """Extract future features"""
-        future = []
-        # Look for future features section
-        future_match = re.search(r'🔮\s+Future\s+Features?:(.*?)(?=🔮|🆕|\*\*|$)', content, re.DOTALL)
-        if future_match:
-            future_section = future_match.group(1)
-            bullets = re.findall(r'^-\s+\*\*(.+?)\*\*:?\s*(.+?)(?=\n- |\n\n|\Z)', future_section, re.MULTILINE)
-            for bullet in bullets:
-                future.append({
-                    "name": bullet[0].strip(),
-                    "description": bullet[1].strip() if len(bullet) > 1 else ""
-                })
-        return future
+        return self._named_items(section.label_bullets(r'🔮\s+Future\s+Features?'))
     
-    def _extract_automations(self, content: str) -> List[str]:
+    def _extract_automations(self, section: SpecSection) -> List[str]:
         """Extract automation patterns"""
-        automations = []
-        # Look for "Automations:" section
-        auto_match = re.search(r'\*\*Automations?:\*\*(.*?)(?=\*\*|$)', content, re.DOTALL)
-        if auto_match:
-            auto_section = auto_match.group(1)
-            bullets = re.findall(r'^-\s+(.+?)(?=\n- |\n\n|\Z)', auto_section, re.MULTILINE)
-            for bullet in bullets:
-                automations.append(bullet.strip())
-        return automations
+        return [b.text for b in section.label_bullets(r'^Automations?$')]
+    
+    def _analyze_cached(self, source: SourceFile, analyze: Callable[[SourceFile], Dict]) -> Dict:
+        """Run a per-file analyzer, reusing the cached result if the file is unchanged"""
+        if source.error is not None:
+            return analyze(source)
+        
+        seen = self._analyzed.get(source.rel_path)
+        if seen is not None and seen[0] == source.content_hash:
+            return seen[1]
+        
+        result = self.cache.get(source.rel_path, source.content_hash) if self.cache is not None else None
+        if result is None:
+            result = analyze(source)
+            if self.cache is not None:
+                self.cache.put(source.rel_path, source.content_hash, result)
+        self._analyzed[source.rel_path] = (source.content_hash, result)
+        return result
+    
+    def seed(self, results: Dict, stale: Set[str] = frozenset()):
+        """Adopt a previous run's results, treating every file outside stale (lib-relative paths) as unchanged"""
+        self.results = dict(results)
+        for key in ("screens", "widgets", "models"):
+            for result in results.get(key, []):
+                source = self.corpus.get(result.get('path'))
+                if source is not None and source.rel_path not in stale and source.error is None:
+                    self._analyzed[source.rel_path] = (source.content_hash, result)
     
     def extract_screens_from_code(self):
         """Extract all screens with detailed information"""
@@ -194,56 +202,65 @@ class EnhancedAuditExtractor:
             return []
         
         screens = []
-        for screen_file in screens_dir.rglob("*.dart"):
-            if screen_file.name.endswith("_screen.dart") or screen_file.name == "main_navigation.dart":
-                screen_info = self._analyze_screen_file(screen_file)
-                screens.append(screen_info)
+        for source in self.corpus.screens():
+            screen_info = self._analyze_cached(source, self._analyze_screen_file)
+            screens.append(screen_info)
         
         return screens
     
-    def _analyze_screen_file(self, screen_file: Path) -> Dict:
+    def analyze_screen(self, source: SourceFile) -> Dict:
+        """Detailed information for one screen file, as extract_screens_from_code records it (uncached)"""
+        return self._analyze_screen_file(source)
+    
+    def _analyze_screen_file(self, source: SourceFile) -> Dict:
         """Analyze a screen file for detailed information"""
-        rel_path = screen_file.relative_to(self.code_dir)
+        screen_file = source.path
+        rel_path = source.rel_path
         
         try:
-            with open(screen_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = source.text
+            tokens = source.tokens
+            # Code checks ignore comments and string literals
+            code = tokens.code
             
             # Extract class name
-            class_match = re.search(r'class\s+(\w+Screen)', content)
+            class_match = SCREEN_CLASS_PATTERN.search(code)
             class_name = class_match.group(1) if class_match else screen_file.stem
             
             # Extract features (widget builders and handlers)
-            widget_methods = re.findall(r'Widget\s+(_build\w+)\([^)]*\)', content)
-            action_methods = re.findall(r'void\s+(_handle\w+)\([^)]*\)', content)
-            private_methods = re.findall(r'void\s+(_\w+)\([^)]*\)', content)
+            widget_methods = WIDGET_METHOD_PATTERN.findall(code)
+            action_methods = ACTION_METHOD_PATTERN.findall(code)
+            private_methods = PRIVATE_METHOD_PATTERN.findall(code)
+            
+            # State, navigation and mock markers come from the shared per-file scan
+            markers = source.markers
             
             # Check for state management
-            has_stateful = "StatefulWidget" in content or "extends State" in content
-            has_setstate = "setState" in content
+            has_stateful = markers.has("stateful_widget", "extends_state")
+            has_setstate = markers.has("set_state")
             
             # Check for state handling
-            has_loading = "isLoading" in content or "SkeletonLoader" in content or "_buildLoadingState" in content
-            has_empty = "EmptyStateCard" in content or "_buildEmptyState" in content or "isEmpty" in content
-            has_error = "error" in content.lower() or "ErrorStateCard" in content or "_buildErrorState" in content
+            has_loading = markers.has("is_loading", "skeleton_loader", "build_loading_state")
+            has_empty = markers.has("empty_state_card", "build_empty_state", "is_empty")
+            has_error = markers.has("error", "error_state_card", "build_error_state")
             
             # Check for navigation
-            has_navigation = "Navigator" in content or "Navigator.push" in content
+            has_navigation = markers.has("navigator")
             
             # Check for API calls
-            api_calls = len(re.findall(r'await\s+\w+\.(fetch|get|post|put|delete|patch)', content))
+            api_calls = len(API_CALL_PATTERN.findall(code))
             
             # Check for mock data
-            has_mock = "Mock" in content or "mock" in content.lower() or "TODO.*backend" in content
+            has_mock = markers.has("mock_class", "mock", "todo_backend")
             
             # Check for backend integration comments
-            backend_notes = re.findall(r'#.*backend|//.*backend|/\*.*backend', content, re.IGNORECASE)
+            backend_notes = [m for m in BACKEND_NOTE_PATTERN.finditer(content) if tokens.in_comment(m.start())]
             
-            # Extract imports
-            imports = re.findall(r'^import\s+[\'"].+?[\'"];', content, re.MULTILINE)
+            # Extract imports (the URI is a string literal, so match on the source)
+            imports = [m for m in IMPORT_PATTERN.finditer(content) if tokens.in_code(m.start())]
             
             return {
-                "path": str(rel_path),
+                "path": rel_path,
                 "name": screen_file.stem,
                 "class_name": class_name,
                 "module": self._infer_module(screen_file),
@@ -267,32 +284,14 @@ class EnhancedAuditExtractor:
             }
         except Exception as e:
             return {
-                "path": str(rel_path),
+                "path": rel_path,
                 "name": screen_file.stem,
                 "error": str(e)
             }
     
     def _infer_module(self, screen_file: Path) -> str:
         """Infer module from file path"""
-        parent = screen_file.parent.name
-        module_map = {
-            "inbox": "3.1",
-            "ai_hub": "3.11",
-            "jobs": "3.3",
-            "calendar": "3.4",
-            "money": "3.5",
-            "quotes": "3.5",
-            "contacts": "3.6",
-            "reviews": "3.7",
-            "notifications": "3.8",
-            "settings": "3.12",
-            "home": "3.10",
-            "onboarding": "3.14",
-            "reports": "3.16",
-            "support": "unknown",
-            "legal": "unknown",
-        }
-        return module_map.get(parent, "unknown")
+        return infer_module(screen_file)
     
     def extract_widgets_from_code(self):
         """Extract widgets with usage information"""
@@ -301,30 +300,29 @@ class EnhancedAuditExtractor:
             return []
         
         widgets = []
-        for widget_file in widgets_dir.rglob("*.dart"):
-            widget_info = self._analyze_widget_file(widget_file)
+        for source in self.corpus.under("widgets"):
+            widget_info = self._analyze_cached(source, self._analyze_widget_file)
             widgets.append(widget_info)
         
         return widgets
     
-    def _analyze_widget_file(self, widget_file: Path) -> Dict:
+    def _analyze_widget_file(self, source: SourceFile) -> Dict:
         """Analyze a widget file"""
-        rel_path = widget_file.relative_to(self.code_dir)
+        widget_file = source.path
+        rel_path = source.rel_path
         
         try:
-            with open(widget_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract class name
-            class_match = re.search(r'class\s+(\w+)', content)
+            # Declarations and base classes are matched on the raw text, so
+            # a widget file is only lexed if one might sit in a literal
+            class_match = next(source.code_matches(CLASS_PATTERN), None)
             class_name = class_match.group(1) if class_match else widget_file.stem
             
             # Check if it's a StatelessWidget or StatefulWidget
-            is_stateless = "StatelessWidget" in content
-            is_stateful = "StatefulWidget" in content
+            is_stateless = next(source.code_matches(STATELESS_WIDGET_PATTERN), None) is not None
+            is_stateful = next(source.code_matches(STATEFUL_WIDGET_PATTERN), None) is not None
             
             return {
-                "path": str(rel_path),
+                "path": rel_path,
                 "name": widget_file.stem,
                 "class_name": class_name,
                 "category": self._infer_widget_category(widget_file),
@@ -332,7 +330,7 @@ class EnhancedAuditExtractor:
             }
         except Exception as e:
             return {
-                "path": str(rel_path),
+                "path": rel_path,
                 "name": widget_file.stem,
                 "error": str(e)
             }
@@ -351,44 +349,43 @@ class EnhancedAuditExtractor:
             return []
         
         models = []
-        for model_file in models_dir.rglob("*.dart"):
-            model_info = self._analyze_model_file(model_file)
+        for source in self.corpus.under("models"):
+            model_info = self._analyze_cached(source, self._analyze_model_file)
             models.append(model_info)
         
         return models
     
-    def _analyze_model_file(self, model_file: Path) -> Dict:
+    def _analyze_model_file(self, source: SourceFile) -> Dict:
         """Analyze a model file"""
-        rel_path = model_file.relative_to(self.code_dir)
+        model_file = source.path
+        rel_path = source.rel_path
         
         try:
-            with open(model_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract class name
-            class_match = re.search(r'class\s+(\w+)', content)
+            # Extract class name (matched on the raw text, like widgets)
+            class_match = next(source.code_matches(CLASS_PATTERN), None)
             class_name = class_match.group(1) if class_match else model_file.stem
             
             # Extract fields (basic extraction)
-            fields = re.findall(r'final\s+(\w+)\s+(\w+);', content)
+            fields = [match.groups() for match in source.code_matches(FIELD_PATTERN)]
             
             return {
-                "path": str(rel_path),
+                "path": rel_path,
                 "name": model_file.stem,
                 "class_name": class_name,
                 "fields": [{"type": f[0], "name": f[1]} for f in fields],
             }
         except Exception as e:
             return {
-                "path": str(rel_path),
+                "path": rel_path,
                 "name": model_file.stem,
                 "error": str(e)
             }
     
-    def run_extraction(self):
-        """Run all extraction methods"""
-        print("Extracting detailed modules from specs...")
-        self.results["modules"] = self.extract_detailed_modules_from_specs()
+    def run_extraction(self, specs: bool = True):
+        """Run all extraction methods (specs=False keeps the modules from the previous run)"""
+        if specs or not self.results["modules"]:
+            print("Extracting detailed modules from specs...")
+            self.results["modules"] = self.extract_detailed_modules_from_specs()
         
         print("Extracting detailed screens from code...")
         self.results["screens"] = self.extract_screens_from_code()
@@ -407,6 +404,10 @@ class EnhancedAuditExtractor:
             "models_count": len(self.results["models"]),
         }
         
+        if self.cache is not None:
+            self.cache.flush()
+            print(f"Analysis cache: {self.cache.hits} reused, {self.cache.misses} re-analyzed")
+        
         return self.results
     
     def save_results(self, output_file: str):
@@ -417,7 +418,28 @@ class EnhancedAuditExtractor:
         print(f"\nResults saved to {output_path}")
 
 if __name__ == "__main__":
-    extractor = EnhancedAuditExtractor(".")
+    parser = argparse.ArgumentParser(description="Extract detailed audit data from specs and code")
+    parser.add_argument("--no-cache", action="store_true", help="Re-analyze every file, ignoring .audit_cache/")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument_patterns(spec_outline)
+        audit_trace.instrument(
+            EnhancedAuditExtractor,
+            "run_extraction", "extract_detailed_modules_from_specs", "extract_screens_from_code",
+            "extract_widgets_from_code", "extract_models_from_code", "save_results",
+            "_extract_purpose", "_extract_core_capabilities", "_extract_features", "_extract_interactions",
+            "_extract_ui_components", "_extract_enhancements", "_extract_future_features", "_extract_automations",
+        )
+        audit_trace.instrument(
+            EnhancedAuditExtractor, "_analyze_screen_file", "_analyze_widget_file", "_analyze_model_file",
+            cat="file", label=lambda self, source: source.rel_path,
+        )
+    
+    extractor = EnhancedAuditExtractor(".", use_cache=not args.no_cache)
     results = extractor.run_extraction()
     extractor.save_results("docs/enhanced_audit_extraction.json")
     print(f"\nEnhanced extraction complete!")
@@ -425,4 +447,4 @@ if __name__ == "__main__":
     print(f"Screens: {results['extraction_metadata']['screens_count']}")
     print(f"Widgets: {results['extraction_metadata']['widgets_count']}")
     print(f"Models: {results['extraction_metadata']['models_count']}")
-
+    audit_trace.finish()
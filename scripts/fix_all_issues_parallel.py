@@ -3,10 +3,14 @@
 Parallel Fix Script - Fixes all issues simultaneously
 """
 
+import argparse
 import re
+import sys
 from pathlib import Path
 from typing import Dict, List
 
+import audit_trace
+
 def fix_dead_buttons():
     """Fix all dead buttons"""
     fixes = [
@@ -70,6 +74,15 @@ def generate_state_handling_fixes():
     return []
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the dead-button and error-handling fix lists")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.trace:
+        module = sys.modules[__name__]
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument(module, "fix_dead_buttons", "generate_error_handling_fixes")
+
     print("Generating fix lists...")
     dead_buttons = fix_dead_buttons()
     error_handling = generate_error_handling_fixes()
@@ -77,4 +90,4 @@ if __name__ == "__main__":
     print(f"Dead buttons to fix: {len(dead_buttons)}")
     print(f"Screens needing error handling: {len(error_handling)}")
     print("\nFix lists generated!")
-
+    audit_trace.finish()
@@ -3,9 +3,13 @@
 Fix and test capability extraction patterns
 """
 
+import argparse
 import re
+import sys
 from pathlib import Path
 
+import audit_trace
+
 # Test the capability extraction pattern
 test_content = """**Core Capabilities:**
 - **Unified Message View:** Single interface displaying all SMS, WhatsApp, Facebook Messenger, Instagram Direct, and **Email (IMAP/SMTP)** messages in chronological order
@@ -17,26 +21,45 @@ test_content = """**Core Capabilities:**
   - Notes include timestamps and author information"""
 
 # Current pattern (not working)
-pattern1 = r'^- \*\*(.+?)\*\*:?\s*(.+?)(?=\n- |\n\n|\Z)'
-matches1 = re.findall(pattern1, test_content, re.MULTILINE | re.DOTALL)
-print(f"Pattern 1 matches: {len(matches1)}")
-for m in matches1:
-    print(f"  - {m[0]}: {m[1][:50]}...")
-
+PATTERN_1 = re.compile(r'^- \*\*(.+?)\*\*:?\s*(.+?)(?=\n- |\n\n|\Z)', re.MULTILINE | re.DOTALL)
 # Better pattern
-pattern2 = r'^- \*\*(.+?)\*\*:\s*(.+?)(?=\n- \*\*|\n\n|\Z)'
-matches2 = re.findall(pattern2, test_content, re.MULTILINE | re.DOTALL)
-print(f"\nPattern 2 matches: {len(matches2)}")
-for m in matches2:
-    print(f"  - {m[0]}: {m[1][:50]}...")
-
+PATTERN_2 = re.compile(r'^- \*\*(.+?)\*\*:\s*(.+?)(?=\n- \*\*|\n\n|\Z)', re.MULTILINE | re.DOTALL)
 # Even better - handle nested bullets
-pattern3 = r'^- \*\*(.+?)\*\*:\s*((?:[^\n]|\n(?!- \*\*))+?)(?=\n- \*\*|\n\n|\Z)'
-matches3 = re.findall(pattern3, test_content, re.MULTILINE | re.DOTALL)
-print(f"\nPattern 3 matches: {len(matches3)}")
-for m in matches3:
-    desc = m[1].strip()
-    if len(desc) > 100:
-        desc = desc[:97] + "..."
-    print(f"  - {m[0]}: {desc}")
+PATTERN_3 = re.compile(r'^- \*\*(.+?)\*\*:\s*((?:[^\n]|\n(?!- \*\*))+?)(?=\n- \*\*|\n\n|\Z)',
+                       re.MULTILINE | re.DOTALL)
+
+
+def try_patterns():
+    """Print what each candidate pattern extracts from test_content"""
+    matches1 = PATTERN_1.findall(test_content)
+    print(f"Pattern 1 matches: {len(matches1)}")
+    for m in matches1:
+        print(f"  - {m[0]}: {m[1][:50]}...")
+
+    matches2 = PATTERN_2.findall(test_content)
+    print(f"\nPattern 2 matches: {len(matches2)}")
+    for m in matches2:
+        print(f"  - {m[0]}: {m[1][:50]}...")
+
+    matches3 = PATTERN_3.findall(test_content)
+    print(f"\nPattern 3 matches: {len(matches3)}")
+    for m in matches3:
+        desc = m[1].strip()
+        if len(desc) > 100:
+            desc = desc[:97] + "..."
+        print(f"  - {m[0]}: {desc}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Try the capability extraction patterns on a sample spec section")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.trace:
+        module = sys.modules[__name__]
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(module)
+        audit_trace.instrument(module, "try_patterns")
 
+    try_patterns()
+    audit_trace.finish()
@@ -4,15 +4,75 @@ Functional Test Checker
 Checks for dead buttons, broken flows, and missing functionality
 """
 
+import argparse
+import heapq
+import multiprocessing
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+import audit_trace
+from dart_lexer import DartTokens
+from handler_extractor import DEAD_HANDLER_ISSUES, REAL, extract_handlers
+from navigation_graph import class_index, route_targets
+from screen_markers import MarkerHits
+from source_corpus import LineIndex, SourceCorpus, SourceFile
+
+# void _handleSomething() {}
+EMPTY_METHOD_PATTERN = re.compile(r'void\s+_handle\w+\([^)]*\)\s*\{\s*\}')
+HANDLER_NAME_PATTERN = re.compile(r'_handle\w+')
+TODO_COMMENT_PATTERN = re.compile(r'//\s*TODO[^\n]*')
+
+# Shards per process worker: enough to even out uneven files, few enough to keep pickling cheap
+SHARDS_PER_WORKER = 4
+
+
+def shard_by_size(work: List[Tuple[str, str]], count: int) -> List[List[Tuple[str, str]]]:
+    """Split (rel_path, text) items into count shards of near-equal byte length, heaviest shard first
+
+    Largest files are placed first, each on the currently lightest shard, so
+    a 3k-line screen starts early and never trails behind a full shard.
+    """
+    heap = [(0, index, []) for index in range(min(count, len(work)))]
+    for item in sorted(work, key=lambda item: len(item[1]), reverse=True):
+        size, index, items = heapq.heappop(heap)
+        items.append(item)
+        heapq.heappush(heap, (size + len(item[1]), index, items))
+    return [items for _, _, items in sorted(heap, key=lambda shard: (-shard[0], shard[1]))]
+
+
+_worker_checker = None
+
+
+def _init_worker(root_dir: str, classes: Dict[str, str]):
+    """Process pool initializer: one checker per worker, sharing the parent's class index"""
+    global _worker_checker
+    _worker_checker = FunctionalTestChecker(root_dir, corpus=SourceCorpus.from_files(Path(root_dir) / "lib", {}))
+    _worker_checker.classes = classes
+
+
+def _check_shard(shard: List[Tuple[str, str]]) -> List[Tuple[str, Dict[str, List]]]:
+    """Pool entry point: [(rel_path, text)] -> [(rel_path, issues)]"""
+    code_dir = _worker_checker.code_dir
+    return [
+        (rel_path, _worker_checker.screen_issues(SourceFile(code_dir / rel_path, rel_path, text=text)))
+        for rel_path, text in shard
+    ]
+
 
 class FunctionalTestChecker:
-    def __init__(self, root_dir: str):
+    def __init__(self, root_dir: str, corpus: SourceCorpus = None):
         self.root_dir = Path(root_dir)
         self.code_dir = self.root_dir / "lib"
-        self.issues = {
+        self.corpus = corpus or SourceCorpus.shared(self.code_dir)
+        # Class name -> declaring file, built on the first navigation check
+        self.classes = None
+        self.issues = self._empty_issues()
+    
+    @staticmethod
+    def _empty_issues() -> Dict[str, List]:
+        return {
             "dead_buttons": [],
             "broken_navigation": [],
             "empty_handlers": [],
@@ -21,140 +81,193 @@ class FunctionalTestChecker:
             "todo_comments": [],
         }
     
-    def check_all_screens(self):
-        """Check all screens for functional issues"""
-        screens_dir = self.code_dir / "screens"
+    def check_all_screens(self, executor: str = "serial", workers: int = 8):
+        """Check all screens for functional issues
+        
+        executor "process" shards the screens by byte length over a process
+        pool and merges the per-screen findings back in screen order, so the
+        issues are identical to a serial run. Anything else checks them in
+        this thread (the checks are CPU-bound regex passes; threads would only
+        contend for the GIL).
+        """
+        screens = self.corpus.screens(include_navigation=False)
+        if executor != "process":
+            for source in screens:
+                self._check_screen(source)
+            return
         
-        for screen_file in screens_dir.rglob("*.dart"):
-            if screen_file.name.endswith("_screen.dart"):
-                self._check_screen(screen_file)
+        if self.classes is None:
+            self.classes = class_index(self.corpus)
+        per_screen = {}
+        work = []
+        for source in screens:
+            if source.error is not None:
+                # Reported from here, exactly as the serial path would
+                per_screen[source.rel_path] = self.screen_issues(source)
+            else:
+                work.append((source.rel_path, source.text))
+        
+        shards = shard_by_size(work, workers * SHARDS_PER_WORKER)
+        # Spawned, not forked: the pipeline starts this pool from a scheduler
+        # thread, and a fork would copy whatever locks other threads hold
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(str(self.root_dir), self.classes)) as pool:
+            for results in pool.map(_check_shard, shards):
+                per_screen.update(results)
+        self.issues = self.merge_issues([self.issues] + [per_screen[source.rel_path] for source in screens])
+    
+    def screen_issues(self, source: SourceFile) -> Dict[str, List]:
+        """Issues found in a single screen, shaped like self.issues (used for incremental re-checks)"""
+        issues, self.issues = self.issues, self._empty_issues()
+        try:
+            self._check_screen(source)
+            return self.issues
+        finally:
+            self.issues = issues
+    
+    @classmethod
+    def merge_issues(cls, per_screen: List[Dict[str, List]]) -> Dict[str, List]:
+        """Concatenate per-screen issues in screen order, as check_all_screens would have"""
+        merged = cls._empty_issues()
+        for issues in per_screen:
+            for category, items in issues.items():
+                merged[category].extend(items)
+        return merged
     
-    def _check_screen(self, screen_file: Path):
+    @classmethod
+    def split_issues(cls, issues: Dict[str, List], screens: List[SourceFile]) -> Dict[str, Dict[str, List]]:
+        """Inverse of merge_issues: per-screen issues keyed by rel_path (entries of unknown screens are dropped)"""
+        owners = {}
+        for source in screens:
+            owners[source.stem] = source.rel_path
+            owners[source.name] = source.rel_path  # read errors are reported under the file name
+        per_screen = {source.rel_path: cls._empty_issues() for source in screens}
+        for category, items in issues.items():
+            for item in items:
+                rel_path = owners.get(item.get('screen'))
+                if rel_path is not None:
+                    per_screen[rel_path].setdefault(category, []).append(item)
+        return per_screen
+    
+    def _check_screen(self, source: SourceFile):
         """Check a single screen for issues"""
         try:
-            with open(screen_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = source.text
+            # Code checks run on the lexed view so commented-out code and
+            # string literals never count; comment checks use the lexer's spans
+            tokens = source.tokens
+            code = tokens.code
+            markers = source.markers
             
-            screen_name = screen_file.stem
+            screen_name = source.stem
+            lines = source.lines
             
             # Check for dead buttons
-            self._check_dead_buttons(content, screen_name)
+            self._check_dead_buttons(content, tokens, screen_name, lines)
             
             # Check for broken navigation
-            self._check_broken_navigation(content, screen_name)
+            self._check_broken_navigation(tokens, screen_name, lines)
             
             # Check for empty handlers
-            self._check_empty_handlers(content, screen_name)
+            self._check_empty_handlers(code, screen_name, lines)
             
             # Check for missing error handling
-            self._check_error_handling(content, screen_name)
+            self._check_error_handling(markers, screen_name)
             
             # Check for missing state handling
-            self._check_state_handling(content, screen_name)
+            self._check_state_handling(markers, screen_name)
             
             # Check for TODO comments (potential issues)
-            self._check_todos(content, screen_name)
+            self._check_todos(content, tokens, screen_name, lines)
             
         except Exception as e:
             self.issues["dead_buttons"].append({
-                "screen": screen_file.name,
+                "screen": source.name,
                 "error": f"Could not read file: {str(e)}"
             })
     
-    def _check_dead_buttons(self, content: str, screen_name: str):
-        """Check for buttons with empty handlers"""
-        # Pattern: onPressed: () {}
-        empty_handler = r'on(?:Pressed|Tap):\s*\(\)\s*\{\s*\}'
-        matches = re.finditer(empty_handler, content)
+    def _span(self, lines: LineIndex, match) -> Dict:
+        """Exact start/end line and column of a match"""
+        return lines.span(match.start(), match.end())
+    
+    def _check_dead_buttons(self, content: str, tokens: DartTokens, screen_name: str, lines: LineIndex):
+        """Check for button handlers that do nothing (empty, TODO-only or a "coming soon" snackbar)
         
-        for match in matches:
-            # Get context (line number)
-            line_num = content[:match.start()].count('\n') + 1
+        Handlers are found and classified by extract_handlers, as in the
+        module auditor, so both reports count the same dead buttons.
+        """
+        for handler in extract_handlers(tokens):
+            if handler.kind == REAL:
+                continue
+            line_num, column = lines.line_col(handler.start)
             self.issues["dead_buttons"].append({
                 "screen": screen_name,
                 "line": line_num,
-                "issue": "Empty button handler",
-                "code": match.group(0)
+                "column": column,
+                "issue": DEAD_HANDLER_ISSUES[handler.kind],
+                "handler": handler.name,
+                "code": content[handler.start:handler.end][:100],
+                "span": lines.span(handler.start, handler.end)
             })
+    
+    def _check_broken_navigation(self, tokens: DartTokens, screen_name: str, lines: LineIndex):
+        """Check for pushed routes whose target class is declared nowhere in lib/"""
+        if self.classes is None:
+            self.classes = class_index(self.corpus)
         
-        # Check for TODO in handlers
-        todo_handler = r'on(?:Pressed|Tap):\s*\(\)\s*\{[^}]*//\s*TODO'
-        matches = re.finditer(todo_handler, content)
-        for match in matches:
-            line_num = content[:match.start()].count('\n') + 1
-            self.issues["dead_buttons"].append({
+        for route in route_targets(tokens):
+            if route.target is None or route.target in self.classes:
+                continue
+            line_num, column = lines.line_col(route.start)
+            self.issues["broken_navigation"].append({
                 "screen": screen_name,
                 "line": line_num,
-                "issue": "TODO in button handler",
-                "code": match.group(0)[:100]
+                "column": column,
+                "issue": f"Navigates to {route.target} (not found)",
+                "target": route.target,
+                "span": lines.span(route.start, route.end)
             })
     
-    def _check_broken_navigation(self, content: str, screen_name: str):
-        """Check for broken navigation paths"""
-        # Find Navigator.push calls
-        nav_pattern = r'Navigator\.push\([^)]+MaterialPageRoute\([^)]+builder:\s*\([^)]+\)\s*=>\s*(\w+)\([^)]*\)'
-        matches = re.finditer(nav_pattern, content)
-        
-        for match in matches:
-            target_screen = match.group(1)
-            # Check if target screen file exists
-            target_file = self.code_dir / "screens" / f"{target_screen.lower()}_screen.dart"
-            if not target_file.exists():
-                # Try to find it
-                found = False
-                for screen_file in (self.code_dir / "screens").rglob("*.dart"):
-                    if screen_file.stem == target_screen.lower() or target_screen.lower() in screen_file.stem:
-                        found = True
-                        break
-                
-                if not found:
-                    line_num = content[:match.start()].count('\n') + 1
-                    self.issues["broken_navigation"].append({
-                        "screen": screen_name,
-                        "line": line_num,
-                        "issue": f"Navigates to {target_screen} (not found)",
-                        "target": target_screen
-                    })
-    
-    def _check_empty_handlers(self, content: str, screen_name: str):
+    def _check_empty_handlers(self, code: str, screen_name: str, lines: LineIndex):
         """Check for empty handler methods"""
-        # Pattern: void _handleSomething() {}
-        empty_method = r'void\s+_handle\w+\([^)]*\)\s*\{\s*\}'
-        matches = re.finditer(empty_method, content)
+        matches = EMPTY_METHOD_PATTERN.finditer(code)
         
         for match in matches:
-            method_name = re.search(r'_handle\w+', match.group(0))
+            method_name = HANDLER_NAME_PATTERN.search(match.group(0))
             if method_name:
-                line_num = content[:match.start()].count('\n') + 1
+                line_num, column = lines.line_col(match.start())
                 self.issues["empty_handlers"].append({
                     "screen": screen_name,
                     "line": line_num,
+                    "column": column,
                     "method": method_name.group(0),
-                    "issue": "Empty handler method"
+                    "issue": "Empty handler method",
+                    "span": self._span(lines, match)
                 })
     
-    def _check_error_handling(self, content: str, screen_name: str):
+    def _check_error_handling(self, markers: MarkerHits, screen_name: str):
         """Check for missing error handling"""
         # Check if screen has try-catch blocks
-        has_try_catch = 'try {' in content and 'catch' in content
+        has_try_catch = markers.has("try_block") and markers.has("catch")
         
         # Check if screen has error state
-        has_error_state = 'ErrorStateCard' in content or '_buildErrorState' in content or 'error' in content.lower()
+        has_error_state = markers.has("error_state_card", "build_error_state", "error")
         
         if not has_try_catch and not has_error_state:
             # Check if it needs error handling (has async operations)
-            has_async = 'Future<void>' in content or 'async' in content
+            has_async = markers.has("future_void", "async")
             if has_async:
                 self.issues["missing_error_handling"].append({
                     "screen": screen_name,
                     "issue": "Has async operations but no error handling"
                 })
     
-    def _check_state_handling(self, content: str, screen_name: str):
+    def _check_state_handling(self, markers: MarkerHits, screen_name: str):
         """Check for missing state handling"""
-        has_loading = 'isLoading' in content or 'SkeletonLoader' in content or '_buildLoadingState' in content
-        has_empty = 'EmptyStateCard' in content or '_buildEmptyState' in content
-        has_error = 'ErrorStateCard' in content or '_buildErrorState' in content
+        has_loading = markers.has("is_loading", "skeleton_loader", "build_loading_state")
+        has_empty = markers.has("empty_state_card", "build_empty_state")
+        has_error = markers.has("error_state_card", "build_error_state")
         
         missing = []
         if not has_loading:
@@ -170,20 +283,21 @@ class FunctionalTestChecker:
                 "missing_states": missing
             })
     
-    def _check_todos(self, content: str, screen_name: str):
+    def _check_todos(self, content: str, tokens: DartTokens, screen_name: str, lines: LineIndex):
         """Check for TODO comments"""
-        todos = re.findall(r'//\s*TODO[^\n]*', content)
-        if todos:
+        matches = [m for m in TODO_COMMENT_PATTERN.finditer(content) if tokens.in_comment(m.start())]
+        if matches:
             self.issues["todo_comments"].append({
                 "screen": screen_name,
-                "count": len(todos),
-                "todos": todos[:5]  # First 5
+                "count": len(matches),
+                "todos": [m.group(0) for m in matches[:5]],  # First 5
+                "spans": [self._span(lines, m) for m in matches[:5]]
             })
     
-    def run_checks(self):
+    def run_checks(self, executor: str = "serial", workers: int = 8):
         """Run all functional checks"""
         print("Checking all screens for functional issues...")
-        self.check_all_screens()
+        self.check_all_screens(executor=executor, workers=workers)
         
         # Summary
         total_issues = sum(len(v) for v in self.issues.values() if isinstance(v, list))
@@ -206,7 +320,28 @@ class FunctionalTestChecker:
         print(f"\nResults saved to {output_file}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check screens for dead buttons, broken flows and missing states")
+    parser.add_argument("--executor", choices=["serial", "process"], default="serial",
+                        help="process shards the screens over a process pool (output is identical)")
+    parser.add_argument("--workers", type=int, default=8, help="Number of pool workers")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument(FunctionalTestChecker, "run_checks", "check_all_screens", "save_results")
+        audit_trace.instrument(FunctionalTestChecker, "_check_screen", cat="file",
+                               label=lambda self, source: source.rel_path)
+        audit_trace.instrument(
+            FunctionalTestChecker,
+            "_check_dead_buttons", "_check_broken_navigation", "_check_empty_handlers",
+            "_check_error_handling", "_check_state_handling", "_check_todos",
+            cat="check",
+        )
+    
     checker = FunctionalTestChecker(".")
-    issues = checker.run_checks()
+    issues = checker.run_checks(executor=args.executor, workers=args.workers)
     checker.save_results("docs/functional_test_issues.json")
+    audit_trace.finish()
 
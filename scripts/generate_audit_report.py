@@ -4,10 +4,13 @@ Generate Human-Readable Audit Report from Matrices
 Creates detailed markdown report for manual review
 """
 
+import argparse
 import json
 from pathlib import Path
 from typing import Dict
 
+import audit_trace
+
 class AuditReportGenerator:
     def __init__(self, root_dir: str):
         self.root_dir = Path(root_dir)
@@ -117,9 +120,10 @@ class AuditReportGenerator:
         
         return ''.join(lines)
     
-    def generate_full_report(self) -> str:
-        """Generate complete audit report"""
-        matrices, extraction = self.load_data()
+    def generate_full_report(self, matrices: Dict = None, extraction: Dict = None) -> str:
+        """Generate complete audit report (from the given results, or the JSON files)"""
+        if matrices is None or extraction is None:
+            matrices, extraction = self.load_data()
         
         lines = []
         
@@ -196,7 +200,18 @@ class AuditReportGenerator:
         print(f"\nReport saved to {output_path}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the markdown audit report from the comparison matrices")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument(AuditReportGenerator, "generate_full_report", "load_data", "save_report")
+        audit_trace.instrument(AuditReportGenerator, "generate_module_report", cat="module",
+                               label=lambda self, module_num, *args: f"Module {module_num}")
+    
     generator = AuditReportGenerator(".")
     report = generator.generate_full_report()
     generator.save_report(report, "docs/COMPREHENSIVE_AUDIT_REPORT.md")
     print("\nAudit report generated!")
+    audit_trace.finish()
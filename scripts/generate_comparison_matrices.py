@@ -4,10 +4,17 @@ Generate Detailed Comparison Matrices
 Compares specs vs code and code vs specs for comprehensive audit
 """
 
+import argparse
 import json
 import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+import audit_trace
+from enhanced_audit_extractor import screen_module
+
+# Capability name from a feature string (format: **Name:** Description)
+FEATURE_NAME_PATTERN = re.compile(r'\*\*(.+?)\*\*:\s*(.+)')
 
 class ComparisonMatrixGenerator:
     def __init__(self, root_dir: str):
@@ -22,18 +29,28 @@ class ComparisonMatrixGenerator:
     
     def find_screens_for_module(self, module_num: str, screens: List) -> List:
         """Find all screens belonging to a module"""
-        return [s for s in screens if s.get('module') == module_num]
+        module_id = screen_module(module_num)
+        return [s for s in screens if s.get('module') == module_id]
     
-    def find_widgets_for_module(self, module_num: str, widgets: List, module_name: str) -> List:
-        """Find widgets that might belong to a module (by name matching)"""
+    @staticmethod
+    def widget_keys(widgets: List) -> List[Tuple[str, str]]:
+        """Lower-cased (name, path) of each widget, as find_widgets_for_module matches them"""
+        return [(widget.get('name', '').lower(), widget.get('path', '').lower()) for widget in widgets]
+    
+    def find_widgets_for_module(self, module_num: str, widgets: List, module_name: str,
+                                widget_keys: List[Tuple[str, str]] = None) -> List:
+        """Find widgets that might belong to a module (by name matching)
+        
+        widget_keys, if given, holds each widget's lower-cased (name, path),
+        computed once for every module rather than once per module.
+        """
         # Simple heuristic: match widget names/categories with module keywords
         module_keywords = module_name.lower().split()
         relevant_widgets = []
+        if widget_keys is None:
+            widget_keys = self.widget_keys(widgets)
         
-        for widget in widgets:
-            widget_name = widget.get('name', '').lower()
-            widget_path = widget.get('path', '').lower()
-            
+        for widget, (widget_name, widget_path) in zip(widgets, widget_keys):
             # Check if widget name or path contains module keywords
             for keyword in module_keywords:
                 if keyword in widget_name or keyword in widget_path:
@@ -150,13 +167,13 @@ class ComparisonMatrixGenerator:
         """Generate comparison matrix for a single module"""
         
         # Use features as capabilities if core_capabilities is empty
-        capabilities = module_data.get('core_capabilities', [])
+        # (a copy: the extraction data may be shared with other in-memory stages)
+        capabilities = list(module_data.get('core_capabilities', []))
         if not capabilities:
             # Fallback: extract from features list
             features = module_data.get('features', [])
             for feature in features[:20]:  # Limit to first 20
-                # Extract capability name from feature string (format: **Name:** Description)
-                match = re.match(r'\*\*(.+?)\*\*:\s*(.+)', feature)
+                match = FEATURE_NAME_PATTERN.match(feature)
                 if match:
                     capabilities.append({
                         "name": match.group(1).strip(),
@@ -180,7 +197,7 @@ class ComparisonMatrixGenerator:
         }
         
         # Calculate statistics
-        capabilities_count = len(module_data.get('core_capabilities', []))
+        capabilities_count = len(capabilities)
         implemented_count = sum(1 for c in specs_to_code['capabilities'] 
                               if c['status'] in ['IMPLEMENTED', 'WIRED', 'MOCK'])
         missing_count = sum(1 for c in specs_to_code['capabilities'] 
@@ -212,21 +229,23 @@ class ComparisonMatrixGenerator:
             }
         }
     
-    def generate_all_matrices(self):
-        """Generate comparison matrices for all modules"""
-        data = self.load_extraction_data()
+    def generate_all_matrices(self, data: Dict = None):
+        """Generate comparison matrices for all modules (from data, or the extraction JSON)"""
+        if data is None:
+            data = self.load_extraction_data()
         
         modules = data.get('modules', {})
         screens = data.get('screens', [])
         widgets = data.get('widgets', [])
         
         matrices = {}
+        widget_keys = self.widget_keys(widgets)
         
         for module_num in sorted(modules.keys(), key=int):
             module_data = modules[module_num]
             module_screens = self.find_screens_for_module(module_num, screens)
             module_widgets = self.find_widgets_for_module(
-                module_num, widgets, module_data.get('name', '')
+                module_num, widgets, module_data.get('name', ''), widget_keys
             )
             
             print(f"Generating matrix for Module {module_num}: {module_data.get('name')}...")
@@ -248,8 +267,24 @@ class ComparisonMatrixGenerator:
         print(f"\nMatrices saved to {output_path}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate spec vs code comparison matrices")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument(
+            ComparisonMatrixGenerator,
+            "generate_all_matrices", "load_extraction_data", "find_screens_for_module",
+            "find_widgets_for_module", "compare_capabilities_to_code", "compare_screens_to_specs",
+            "save_matrices",
+        )
+        audit_trace.instrument(ComparisonMatrixGenerator, "generate_module_matrix", cat="module",
+                               label=lambda self, module_num, *args: f"Module {module_num}")
+    
     generator = ComparisonMatrixGenerator(".")
     matrices = generator.generate_all_matrices()
     generator.save_matrices(matrices, "docs/comparison_matrices.json")
     print("\nComparison matrices generated!")
-
+    audit_trace.finish()
@@ -3,16 +3,26 @@
 Generate comprehensive audit report combining all audit data
 """
 
+import argparse
 import json
+import sys
 from pathlib import Path
+from typing import Dict
 
-def generate_comprehensive_report():
+import audit_trace
+
+def generate_comprehensive_report(parallel_audit: Dict = None, functional_issues: Dict = None,
+                                  extraction: Dict = None):
     root_dir = Path(".")
     
-    # Load all audit data
-    parallel_audit = json.load(open(root_dir / "docs" / "parallel_audit_results.json"))
-    functional_issues = json.load(open(root_dir / "docs" / "functional_test_issues.json"))
-    extraction = json.load(open(root_dir / "docs" / "enhanced_audit_extraction.json"))
+    # Load whatever audit data was not handed over in memory
+    with audit_trace.span("load audit JSON"):
+        if parallel_audit is None:
+            parallel_audit = json.load(open(root_dir / "docs" / "parallel_audit_results.json"))
+        if functional_issues is None:
+            functional_issues = json.load(open(root_dir / "docs" / "functional_test_issues.json"))
+        if extraction is None:
+            extraction = json.load(open(root_dir / "docs" / "enhanced_audit_extraction.json"))
     
     report = []
     report.append("# Comprehensive Frontend Audit Report - 100% Complete")
@@ -183,12 +193,20 @@ def generate_comprehensive_report():
     return "\n".join(report)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Combine all audit results into the final report")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument(sys.modules[__name__], "generate_comprehensive_report")
+    
     report = generate_comprehensive_report()
     
     output_file = Path("docs") / "COMPREHENSIVE_AUDIT_FINAL.md"
-    with open(output_file, 'w', encoding='utf-8') as f:
+    with audit_trace.span("write report"), open(output_file, 'w', encoding='utf-8') as f:
         f.write(report)
     
     print(f"Comprehensive audit report generated: {output_file}")
     print(f"Report length: {len(report)} characters")
-
+    audit_trace.finish()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Handler Extractor
+Locates onPressed/onTap/onChanged/onLongPress callbacks and classifies their bodies
+"""
+
+import re
+from collections import namedtuple
+from typing import List, Optional, Tuple
+
+from dart_lexer import DartTokens, word_start
+
+EMPTY = "empty"
+TODO_ONLY = "todo"
+PLACEHOLDER = "placeholder"
+REAL = "real"
+# Issue reported for each kind of dead handler
+DEAD_HANDLER_ISSUES = {
+    EMPTY: "Empty button handler",
+    TODO_ONLY: "TODO-only button handler",
+    PLACEHOLDER: "Placeholder button handler (coming soon)",
+}
+
+# name is the callback parameter; [start, end) spans "name: <callback>" and
+# [body_start, body_end) the block or arrow body (equal to start/end for a
+# tear-off such as onTap: _openDetails); kind is one of the constants above
+Handler = namedtuple("Handler", "name start end body_start body_end kind")
+
+# Led by a literal (word starts are checked per match) to keep the prefix scan;
+# also takes the head of a parameterless closure, `() {` or `() async =>`
+HANDLER_PATTERN = re.compile(r'(on(?:Pressed|Tap|Changed|LongPress))\s*:\s*(\(\)\s*(?:async\*?|sync\*)?\s*(\{|=>))?')
+CLOSURE_MODIFIER_PATTERN = re.compile(r'\s*(?:async\*?|sync\*)?\s*(\{|=>)')
+# Brackets are skipped whole; an argument ends at the first , ; or closing bracket outside them
+EXPRESSION_STOP_PATTERN = re.compile(r'[(\[{,;)\]}]')
+# "name: " at the start of a named argument (the :(?!:) keeps ?: and :: out)
+NAMED_ARGUMENT_PATTERN = re.compile(r'\s*(\w+)\s*:(?!:)\s*')
+PLACEHOLDER_PHRASES = ("coming soon",)
+
+
+def expression_end(tokens: DartTokens, pos: int) -> int:
+    """End of the argument expression starting at pos"""
+    code = tokens.code
+    while True:
+        match = EXPRESSION_STOP_PATTERN.search(code, pos)
+        if match is None:
+            return len(code)
+        if match.group(0) in '([{':
+            close = tokens.closing(match.start())
+            if close is None:
+                return len(code)
+            pos = close + 1
+            continue
+        return match.start()
+
+
+def call_arguments(tokens: DartTokens, open_paren: int, close: int) -> List[Tuple[Optional[str], int, int]]:
+    """(name, start, end) of each argument value of the call whose parentheses are at open_paren/close
+
+    name is None for positional arguments; a trailing comma yields nothing.
+    """
+    code = tokens.code
+    arguments = []
+    pos = open_paren + 1
+    while pos < close:
+        match = NAMED_ARGUMENT_PATTERN.match(code, pos, close)
+        value_start = match.end() if match else pos
+        end = expression_end(tokens, value_start)
+        if match is not None or code[value_start:end].strip():
+            arguments.append((match.group(1) if match else None, value_start, end))
+        if end >= close or code[end] != ',':
+            break
+        pos = end + 1
+    return arguments
+
+
+def _callback_body(tokens: DartTokens, match) -> Tuple[int, int, int, bool]:
+    """(body_start, body_end, end, is_closure) of the callback named by a HANDLER_PATTERN match"""
+    if match.group(3) == '{':
+        close = tokens.closing(match.end(3) - 1)
+        if close is not None:
+            return match.end(3), close, close + 1, True
+    elif match.group(3) == '=>':
+        end = expression_end(tokens, match.end(3))
+        return match.end(3), end, end, True
+    code = tokens.code
+    pos = match.start(2) if match.group(2) is not None else match.end()
+    if code.startswith('(', pos):
+        params_end = tokens.closing(pos)
+        if params_end is not None:
+            match = CLOSURE_MODIFIER_PATTERN.match(code, params_end + 1)
+            if match is not None:
+                if match.group(1) == '{':
+                    close = tokens.closing(match.start(1))
+                    if close is not None:
+                        return match.end(1), close, close + 1, True
+                else:
+                    body_start = match.end(1)
+                    end = expression_end(tokens, body_start)
+                    return body_start, end, end, True
+    end = expression_end(tokens, pos)
+    return pos, end, end, False
+
+
+def classify_body(tokens: DartTokens, start: int, end: int) -> str:
+    """EMPTY, TODO_ONLY, PLACEHOLDER or REAL for the closure body spanning [start, end)"""
+    body = tokens.code[start:end].strip().rstrip(';').strip()
+    if body in ('', 'null', '{}'):
+        return TODO_ONLY if 'TODO' in tokens.comment_text(start, end) else EMPTY
+    if 'SnackBar' in body:
+        text = tokens.text[start:end].lower()
+        if any(phrase in text for phrase in PLACEHOLDER_PHRASES):
+            return PLACEHOLDER
+    return REAL
+
+
+def extract_handlers(tokens: DartTokens) -> List[Handler]:
+    """Every handler callback in the file, in source order (nested ones included)
+
+    One search over the code view finds the callback names; bodies are
+    delimited with the lexer's bracket pairs, so braces in strings,
+    comments or nested closures never cut a body short.
+    """
+    handlers = []
+    code = tokens.code
+    for match in HANDLER_PATTERN.finditer(code):
+        if not word_start(code, match.start()):
+            continue
+        body_start, body_end, end, is_closure = _callback_body(tokens, match)
+        if is_closure:
+            kind = classify_body(tokens, body_start, body_end)
+        elif code[body_start:body_end].strip() == 'null':
+            continue  # explicitly disabled, not a dead handler
+        else:
+            kind = REAL  # tear-off or forwarded callback
+        handlers.append(Handler(match.group(1), match.start(), end, body_start, body_end, kind))
+    return handlers
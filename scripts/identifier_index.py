@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Identifier Index
+Inverted index of identifier -> {file: count} over a SourceCorpus
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from source_corpus import SourceCorpus
+
+IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+DIRECTIVE_PATTERN = re.compile(r'^(?:import|export|part)\s+([\'"])(.+?)\1', re.MULTILINE)
+
+
+class IdentifierIndex:
+    """Tokenizes every file once and answers identifier usage queries from postings"""
+
+    def __init__(self, corpus: SourceCorpus):
+        self.corpus = corpus
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.errors: List[str] = []
+        self._build()
+
+    def _build(self):
+        for source in self.corpus:
+            try:
+                # Mentions inside comments and string literals are not usages,
+                # except the URIs of import/export/part directives
+                counts = Counter(IDENTIFIER_PATTERN.findall(source.code))
+                tokens = source.tokens
+                for directive in DIRECTIVE_PATTERN.finditer(source.text):
+                    if tokens.in_code(directive.start()):
+                        counts.update(IDENTIFIER_PATTERN.findall(directive.group(2)))
+            except Exception:
+                self.errors.append(source.rel_path)
+                continue
+            for identifier, count in counts.items():
+                self.postings.setdefault(identifier, {})[source.rel_path] = count
+
+    def files_containing(self, identifier: str) -> Dict[str, int]:
+        """Files (relative to lib/) that mention identifier, with occurrence counts"""
+        return self.postings.get(identifier, {})
+
+    def usage_count(self, identifier: str, exclude: Optional[Iterable[str]] = None) -> int:
+        """Number of files mentioning identifier, not counting excluded paths"""
+        files = self.files_containing(identifier)
+        excluded = set(exclude or [])
+        return sum(1 for path in files if path not in excluded)
+
+    def occurrences(self, identifier: str) -> int:
+        """Total number of occurrences of identifier across the corpus"""
+        return sum(self.files_containing(identifier).values())
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Navigation Graph
+Resolves every route push to the file declaring its target and reports unreachable screens, broken targets and cycles
+"""
+
+import argparse
+import json
+import re
+import time
+from collections import deque, namedtuple
+from typing import Dict, Iterable, List, Optional, Set
+
+import audit_trace
+from dart_lexer import DartTokens, word_start
+from source_corpus import SourceCorpus
+
+ROOT_FILE = "screens/main_navigation.dart"
+JSON_FILE = "docs/navigation_graph.json"
+DOT_FILE = "docs/navigation_graph.dot"
+
+# Patterns start with a literal rather than \b, which would disable the
+# regex engine's literal-prefix scan (5-50x slower on a large tree); word
+# starts are checked on the few matches instead
+CLASS_DECLARATION_PATTERN = re.compile(r'class\s+(\w+)')
+# Navigator.push(  /  Navigator.of(context).pushReplacement(
+NAVIGATOR_CALL_PATTERN = re.compile(r'Navigator\s*\.\s*(?:of\s*\(\s*\w+\s*\)\s*\.\s*)?(push\w*)\s*\(')
+ROUTE_CLASSES = ("MaterialPageRoute", "CupertinoPageRoute", "PageRouteBuilder")
+# Every route class contains "PageRoute": the scan is led by it and the
+# class name around it is checked per match (see _route_start)
+ROUTE_CONSTRUCTOR_PATTERN = re.compile(r'PageRoute(\w*)\s*(?:<[^<>()]*>)?\s*\(')
+# builder: (context) =>   /   pageBuilder: (context, animation, secondary) {
+BUILDER_PATTERN = re.compile(r'\b(?:builder|pageBuilder)\s*:\s*(?:\([^()]*\)|\w+)\s*(=>|\{)')
+TARGET_PATTERN = re.compile(r'\s*(?:const\s+|new\s+)?([A-Z]\w*)\s*(?:<[^<>()]*>)?\s*(?:\.\s*\w+\s*)?\(')
+RETURN_TARGET_PATTERN = re.compile(r'\breturn\s+(?:const\s+|new\s+)?([A-Z]\w*)\s*(?:<[^<>()]*>)?\s*(?:\.\s*\w+\s*)?\(')
+# Any constructor call (formatted Dart never spaces the name from its parenthesis):
+# a file instantiating another file's class embeds it
+INSTANTIATION_PATTERN = re.compile(r'([A-Z]\w*)(?:<[^<>()]*>)?\(')
+
+ROUTE = "route"  # pushed through the Navigator (or a bare route constructor)
+EMBED = "embed"  # instantiated in place (tab bodies, drawers, cards that push)
+
+# method is the Navigator method (or "route" outside a Navigator call);
+# target is None when the builder's widget cannot be read statically
+RouteTarget = namedtuple("RouteTarget", "method target start end")
+Edge = namedtuple("Edge", "source target kind method line")
+
+
+def _route_start(code: str, route) -> Optional[int]:
+    """Start of the route class name around a ROUTE_CONSTRUCTOR_PATTERN match (None if it names no route class)"""
+    name_end = route.end(1)
+    for name in ROUTE_CLASSES:
+        start = name_end - len(name)
+        if start >= 0 and code.startswith(name, start) and word_start(code, start):
+            return start
+    return None
+
+
+def _first_call(code: str, name: str) -> Optional[int]:
+    """Offset of the first constructor call of class name (None if name only occurs inside other identifiers)"""
+    pos = code.find(name)
+    while pos >= 0:
+        if word_start(code, pos):
+            match = INSTANTIATION_PATTERN.match(code, pos)
+            if match is not None and match.group(1) == name:
+                return pos
+        pos = code.find(name, pos + 1)
+    return None
+
+
+def _builder_target(code: str, tokens: DartTokens, start: int, end: int) -> Optional[str]:
+    """Widget class returned by the builder of the route constructor spanning code[start:end]"""
+    builder = BUILDER_PATTERN.search(code, start, end)
+    if builder is None:
+        return None
+    if builder.group(1) == "=>":
+        target = TARGET_PATTERN.match(code, builder.end(), end)
+        return target.group(1) if target else None
+    body_end = tokens.closing(builder.end() - 1) or end
+    target = RETURN_TARGET_PATTERN.search(code, builder.end(), body_end)
+    return target.group(1) if target else None
+
+
+def route_targets(tokens: DartTokens) -> List[RouteTarget]:
+    """Every route pushed in one file, with its Navigator method and target class, in source order
+
+    A route constructor inside a Navigator call spans the whole call (the
+    innermost enclosing call is found with one sweep over both sorted match
+    lists). A call without one (e.g. `push(context, _fadeRoute(Page()))`)
+    targets the first widget constructed in its arguments.
+    """
+    code = tokens.code
+    calls = []
+    for match in NAVIGATOR_CALL_PATTERN.finditer(code):
+        if not word_start(code, match.start()):
+            continue
+        close = tokens.closing(match.end() - 1)
+        if close is not None:
+            calls.append((match.start(), close + 1, match.group(1), match.end()))
+
+    targets = []
+    routed_calls = set()
+    open_calls = []
+    next_call = 0
+    for route in ROUTE_CONSTRUCTOR_PATTERN.finditer(code):
+        start = _route_start(code, route)
+        if start is None:
+            continue
+        close = tokens.closing(route.end() - 1)
+        if close is None:
+            continue
+        while next_call < len(calls) and calls[next_call][0] <= start:
+            open_calls.append(calls[next_call])
+            next_call += 1
+        while open_calls and open_calls[-1][1] <= start:
+            open_calls.pop()
+        target = _builder_target(code, tokens, route.end(), close)
+        if open_calls:
+            call_start, call_end, method, _ = open_calls[-1]
+            routed_calls.add(call_start)
+            targets.append(RouteTarget(method, target, call_start, call_end))
+        elif target is not None:
+            # A route built outside any Navigator call from a parameter
+            # (`=> page`) is a route factory; its call sites are resolved instead
+            targets.append(RouteTarget(ROUTE, target, start, close + 1))
+
+    for call_start, call_end, method, args_start in calls:
+        if call_start in routed_calls:
+            continue
+        target = None
+        for match in INSTANTIATION_PATTERN.finditer(code, args_start, call_end):
+            if match.group(1) not in ROUTE_CLASSES and word_start(code, match.start()):
+                target = match.group(1)
+                break
+        targets.append(RouteTarget(method, target, call_start, call_end))
+    targets.sort(key=lambda route: route.start)
+    return targets
+
+
+def class_index(corpus: SourceCorpus) -> Dict[str, str]:
+    """Class name -> lib-relative path of the file declaring it (first declaration in walk order wins)"""
+    classes = {}
+    for source in corpus:
+        if source.error is not None:
+            continue
+        # Declarations are matched on the raw text, checking the few that
+        # might sit in a comment or string without lexing most files
+        text = source.text
+        for match in source.code_matches(CLASS_DECLARATION_PATTERN):
+            if word_start(text, match.start()):
+                classes.setdefault(match.group(1), source.rel_path)
+    return classes
+
+
+class NavigationGraph:
+    """File-level navigation graph of lib/, with routes resolved through a class index built once
+
+    Nodes are files; a route edge points at the file declaring the pushed
+    widget and an embed edge at the file of any other class a file
+    instantiates, so tabs and navigation-bearing widgets (drawers, nav bars)
+    connect the screens they host. Each edge costs one dict lookup.
+    """
+
+    def __init__(self, corpus: SourceCorpus, classes: Optional[Dict[str, str]] = None):
+        self.corpus = corpus
+        self.classes = classes if classes is not None else class_index(corpus)
+        self.edges: Dict[str, List[Edge]] = {}
+        self.broken: List[Dict] = []
+        self.unresolved: List[Dict] = []
+        self.errors: List[str] = []
+        self._build()
+
+    def _build(self):
+        for source in self.corpus:
+            if source.error is not None:
+                self.errors.append(source.rel_path)
+                continue
+            rel_path = source.rel_path
+            edges = []
+            routed = set()
+            tokens = source.tokens
+            for route in route_targets(tokens):
+                line = source.lines.line_of(route.start)
+                entry = {"file": rel_path, "line": line, "method": route.method}
+                if route.target is None:
+                    self.unresolved.append(entry)
+                    continue
+                target_file = self.classes.get(route.target)
+                if target_file is None:
+                    self.broken.append({**entry, "target": route.target})
+                    continue
+                edges.append(Edge(rel_path, target_file, ROUTE, route.method, line))
+                routed.add(target_file)
+
+            # findall (no match objects) narrows the calls down to known
+            # classes; only those are then located in the file
+            code = tokens.code
+            embeds = []
+            for name in set(INSTANTIATION_PATTERN.findall(code)):
+                target_file = self.classes.get(name)
+                if target_file is None or target_file == rel_path or target_file in routed:
+                    continue
+                offset = _first_call(code, name)
+                if offset is not None:
+                    embeds.append((offset, target_file))
+            embedded = set()
+            for offset, target_file in sorted(embeds):
+                if target_file not in embedded:
+                    embedded.add(target_file)
+                    edges.append(Edge(rel_path, target_file, EMBED, None, source.lines.line_of(offset)))
+            self.edges[rel_path] = edges
+
+    def reachable(self, roots: Iterable[str]) -> Set[str]:
+        """Files reachable from roots (breadth-first, over route and embed edges)"""
+        seen = {root for root in roots if root in self.edges}
+        queue = deque(seen)
+        while queue:
+            for edge in self.edges.get(queue.popleft(), ()):
+                if edge.target not in seen:
+                    seen.add(edge.target)
+                    queue.append(edge.target)
+        return seen
+
+    def _leads_to(self, targets: Set[str]) -> Set[str]:
+        """Files with a path to any of targets (breadth-first over the reversed edges)"""
+        incoming: Dict[str, List[str]] = {}
+        for edges in self.edges.values():
+            for edge in edges:
+                incoming.setdefault(edge.target, []).append(edge.source)
+        seen = set(targets)
+        queue = deque(seen)
+        while queue:
+            for source in incoming.get(queue.popleft(), ()):
+                if source not in seen:
+                    seen.add(source)
+                    queue.append(source)
+        return seen
+
+    def cycles(self, nodes: Set[str]) -> List[List[str]]:
+        """Strongly connected components among nodes that contain a cycle (iterative Tarjan)"""
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components = []
+        for start in sorted(nodes):
+            if start in index:
+                continue
+            work = [(start, iter(self.edges.get(start, ())))]
+            index[start] = low[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, edges = work[-1]
+                for edge in edges:
+                    target = edge.target
+                    if target not in nodes:
+                        continue
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self.edges.get(target, ()))))
+                        break
+                    if target in on_stack:
+                        low[node] = min(low[node], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        looped = len(component) > 1 or any(e.target == node for e in self.edges.get(node, ()))
+                        if looped:
+                            components.append(sorted(component))
+        return sorted(components)
+
+    def analyze(self, roots: Optional[List[str]] = None) -> Dict:
+        """Reachability from roots (main_navigation.dart by default), broken targets and cycles, as JSON"""
+        roots = roots or [ROOT_FILE]
+        screens = [source.rel_path for source in self.corpus.screens(include_navigation=False)]
+        reached = self.reachable(roots)
+        # Exported: screens, roots, and every file that leads to a screen
+        # (navigation-bearing widgets); leaf widgets, models and services are left out
+        nodes = self._leads_to(set(screens)) | set(screens) | {root for root in roots if root in self.edges}
+        screen_set = set(screens)
+        labels: Dict[str, str] = {}
+        for name, rel_path in self.classes.items():
+            if rel_path in nodes and (rel_path not in labels or labels[rel_path].startswith('_')):
+                labels[rel_path] = name
+
+        node_list = []
+        for rel_path in sorted(nodes):
+            if rel_path in screen_set or rel_path.endswith("/main_navigation.dart"):
+                kind = "screen"
+            elif rel_path.startswith("widgets/"):
+                kind = "widget"
+            else:
+                kind = "other"
+            node_list.append({
+                "path": rel_path,
+                "class_name": labels.get(rel_path),
+                "kind": kind,
+                "reachable": rel_path in reached,
+            })
+        edge_list = [
+            {"from": edge.source, "to": edge.target, "kind": edge.kind, "method": edge.method, "line": edge.line}
+            for rel_path in sorted(nodes)
+            for edge in self.edges.get(rel_path, ())
+            if edge.target in nodes
+        ]
+        unreachable = [rel_path for rel_path in screens if rel_path not in reached]
+        cycles = self.cycles(nodes)
+        return {
+            "roots": [root for root in roots if root in self.edges],
+            "missing_roots": [root for root in roots if root not in self.edges],
+            "nodes": node_list,
+            "edges": edge_list,
+            "unreachable_screens": unreachable,
+            "broken_targets": self.broken,
+            "unresolved_routes": self.unresolved,
+            "cycles": cycles,
+            "classes": self.classes,
+            "errors": self.errors,
+            "stats": {
+                "files": len(self.edges),
+                "screens": len(screens),
+                "reachable_screens": len(screens) - len(unreachable),
+                "unreachable_screens": len(unreachable),
+                "route_edges": sum(1 for edge in edge_list if edge["kind"] == ROUTE),
+                "embed_edges": sum(1 for edge in edge_list if edge["kind"] == EMBED),
+                "broken_targets": len(self.broken),
+                "unresolved_routes": len(self.unresolved),
+                "cycles": len(cycles),
+            },
+        }
+
+
+def _quote(text: str) -> str:
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def to_dot(graph: Dict) -> str:
+    """Graphviz rendering of an analyze() result: unreachable screens shaded, embed edges dashed"""
+    lines = ["digraph navigation {", "  rankdir=LR;", "  node [shape=box, fontsize=10];"]
+    roots = set(graph["roots"])
+    for node in graph["nodes"]:
+        attributes = [f"label={_quote(node['class_name'] or node['path'])}", f"tooltip={_quote(node['path'])}"]
+        if node["path"] in roots:
+            attributes.append("penwidth=2")
+        if node["kind"] != "screen":
+            attributes.append("shape=ellipse")
+        if not node["reachable"] and node["kind"] == "screen":
+            attributes.append('style=filled, fillcolor="#f4cccc"')
+        lines.append(f"  {_quote(node['path'])} [{', '.join(attributes)}];")
+    for edge in graph["edges"]:
+        attributes = "style=dashed" if edge["kind"] == EMBED else f"label={_quote(edge['method'])}"
+        lines.append(f"  {_quote(edge['from'])} -> {_quote(edge['to'])} [{attributes}];")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _write(path: str, text: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the screen navigation graph and report reachability")
+    parser.add_argument("--root", action="append", dest="roots",
+                        help=f"lib-relative entry file(s) for the reachability search (default: {ROOT_FILE})")
+    parser.add_argument("--json", default=JSON_FILE, help=f"Graph JSON output (default: {JSON_FILE})")
+    parser.add_argument("--dot", default=DOT_FILE, help=f"Graphviz DOT output (default: {DOT_FILE})")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument(NavigationGraph, "_build", "analyze")
+
+    start = time.perf_counter()
+    graph = NavigationGraph(SourceCorpus.shared("lib")).analyze(args.roots)
+    _write(args.json, json.dumps(graph, indent=2))
+    _write(args.dot, to_dot(graph))
+    stats = graph["stats"]
+    for root in graph["missing_roots"]:
+        print(f"⚠️  Root {root} not found: every screen is reported unreachable")
+    print(f"Navigation graph: {stats['reachable_screens']}/{stats['screens']} screens reachable, "
+          f"{stats['route_edges']} route and {stats['embed_edges']} embed edges, "
+          f"{stats['broken_targets']} broken target(s), {stats['cycles']} cycle(s) "
+          f"({time.perf_counter() - start:.2f}s)")
+    print(f"Written to {args.json} and {args.dot}")
+    audit_trace.finish()
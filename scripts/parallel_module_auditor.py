@@ -4,18 +4,73 @@ Parallel Module Auditor
 Audits all modules simultaneously for comprehensive review
 """
 
+import argparse
 import json
+import math
+import multiprocessing
 import re
 import os
+import sys
 from pathlib import Path
 from typing import Dict, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import audit_trace
+from dart_lexer import DartTokens
+from enhanced_audit_extractor import screen_module
+from functional_test_checker import SHARDS_PER_WORKER, shard_by_size
+from handler_extractor import DEAD_HANDLER_ISSUES, REAL, extract_handlers
+from navigation_graph import class_index, route_targets
+from source_corpus import SourceCorpus
+
+FEATURE_NAME_PATTERN = re.compile(r'\*\*(.+?)\*\*:\s*(.+)')
+
+def scan_screen(content: str, tokens: DartTokens = None) -> Dict:
+    """Run the content-level checks for one screen file (lexing it unless tokens are given)"""
+    if tokens is None:
+        tokens = DartTokens(content)
+    
+    # Classes pushed through the Navigator (or route constructors), read from the code view
+    push_targets = [route.target for route in route_targets(tokens) if route.target is not None]
+    
+    # Handlers whose body does nothing (empty, TODO-only or a "coming soon" snackbar)
+    dead_buttons = []
+    for handler in extract_handlers(tokens):
+        if handler.kind != REAL:
+            dead_buttons.append({
+                "issue": DEAD_HANDLER_ISSUES[handler.kind],
+                "handler": handler.name,
+                "code": content[handler.start:handler.end][:100]
+            })
+    
+    return {
+        "push_targets": push_targets,
+        "dead_buttons": dead_buttons,
+    }
+
+def _scan_work_unit(item):
+    """Pool entry point: (path, content, source or None) -> (path, scan)"""
+    path, content, source = item
+    try:
+        # Threads lex through the corpus, each file in the worker holding it
+        return path, scan_screen(content, source.tokens if source is not None else None)
+    except Exception as e:
+        return path, {"error": str(e)}
+
+def _scan_shard(shard):
+    """Pool entry point: [(path, content, source or None)] -> [(path, scan)]"""
+    return [_scan_work_unit(item) for item in shard]
 
 class ParallelModuleAuditor:
-    def __init__(self, root_dir: str):
+    def __init__(self, root_dir: str, corpus: SourceCorpus = None):
         self.root_dir = Path(root_dir)
         self.code_dir = self.root_dir / "lib"
         self.specs_dir = self.root_dir / "docs" / "specs"
+        self.corpus = corpus or SourceCorpus.shared(self.code_dir)
+        self._test_files_count = None
+        self._scans = {}
+        # Class name -> declaring file, built on the first navigation audit
+        self.classes = None
         self.results = {}
     
     def load_extraction_data(self) -> Dict:
@@ -30,7 +85,8 @@ class ParallelModuleAuditor:
         """Comprehensive audit of a single module"""
         print(f"  Auditing Module {module_num}: {module_data.get('name', 'Unknown')}...")
         
-        module_screens = [s for s in screens if s.get('module') == module_num]
+        module_id = screen_module(module_num)
+        module_screens = [s for s in screens if s.get('module') == module_id]
         
         audit = {
             "module_number": module_num,
@@ -55,7 +111,7 @@ class ParallelModuleAuditor:
         # Get capabilities from features if core_capabilities is empty
         features = module_data.get('features', [])
         for feature in features[:25]:  # Limit to first 25
-            match = re.match(r'\*\*(.+?)\*\*:\s*(.+)', feature)
+            match = FEATURE_NAME_PATTERN.match(feature)
             if match:
                 cap_name = match.group(1).strip()
                 cap_desc = match.group(2).strip()
@@ -103,11 +159,10 @@ class ParallelModuleAuditor:
         screen_audits = []
         
         for screen in screens:
-            screen_path = self.code_dir / screen.get('path')
             impl = screen.get('implementation', {})
             
             # Check if screen file exists and is readable
-            file_exists = screen_path.exists()
+            file_exists = screen.get('path') in self.corpus
             
             # Check implementation completeness
             has_state = impl.get('has_stateful', False)
@@ -150,42 +205,61 @@ class ParallelModuleAuditor:
             "list": screen_audits
         }
     
+    def use_scans(self, scans: Dict[str, Dict]):
+        """Adopt precomputed scan_screen results, keyed by lib-relative path, instead of scanning those files"""
+        self._scans.update(scans)
+    
+    def summarize_module(self, module_data: Dict, screens: List) -> Dict:
+        """The capability, state handling and button audits of audit_module, for one module's screens"""
+        return {
+            "capabilities": self._audit_capabilities(module_data, screens),
+            "state_handling": self._audit_state_handling(screens),
+            "buttons_links": self._audit_buttons_links(screens),
+        }
+    
+    def _scan(self, screen: Dict) -> Dict:
+        """Per-file scan results for a screen (None if the file does not exist)"""
+        path = screen.get('path')
+        if path not in self._scans:
+            source = self.corpus.get(path)
+            if source is None:
+                self._scans[path] = None
+            else:
+                try:
+                    self._scans[path] = scan_screen(source.text, source.tokens)
+                except Exception as e:
+                    self._scans[path] = {"error": str(e)}
+        return self._scans[path]
+    
     def _audit_navigation(self, screens: List) -> Dict:
         """Audit navigation paths"""
         navigation_issues = []
+        if self.classes is None:
+            self.classes = class_index(self.corpus)
         
         for screen in screens:
-            screen_path = self.code_dir / screen.get('path')
-            if not screen_path.exists():
+            scan = self._scan(screen)
+            if scan is None:
                 continue
             
-            try:
-                with open(screen_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Check for Navigator usage
-                navigator_calls = re.findall(r'Navigator\.(push|pop|pushReplacement)', content)
-                
-                # Check for broken navigation
-                broken_nav = []
-                
-                # Find all Navigator.push calls
-                push_calls = re.finditer(r'Navigator\.push\([^)]+MaterialPageRoute\([^)]+builder:\s*\([^)]+\)\s*=>\s*(\w+)\s*\(', content)
-                for match in push_calls:
-                    screen_class = match.group(1)
-                    # Check if screen class exists
-                    if not any(s.get('class_name') == screen_class for s in screens):
-                        broken_nav.append(f"Navigates to {screen_class} (not found)")
-                
-                if broken_nav:
-                    navigation_issues.append({
-                        "screen": screen.get('name'),
-                        "issues": broken_nav
-                    })
-            except Exception as e:
+            if "error" in scan:
+                navigation_issues.append({
+                    "screen": screen.get('name'),
+                    "error": scan["error"]
+                })
+                continue
+            
+            # Check for broken navigation
+            broken_nav = []
+            for screen_class in scan["push_targets"]:
+                # Check if the class is declared anywhere in lib/
+                if screen_class not in self.classes:
+                    broken_nav.append(f"Navigates to {screen_class} (not found)")
+            
+            if broken_nav:
                 navigation_issues.append({
                     "screen": screen.get('name'),
-                    "error": str(e)
+                    "issues": broken_nav
                 })
         
         return {
@@ -199,42 +273,17 @@ class ParallelModuleAuditor:
         dead_buttons = []
         
         for screen in screens:
-            screen_path = self.code_dir / screen.get('path')
-            if not screen_path.exists():
+            scan = self._scan(screen)
+            if scan is None or "error" in scan:
                 continue
             
-            try:
-                with open(screen_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Find buttons with onPressed/onTap
-                button_pattern = r'(onPressed|onTap):\s*\(\)\s*\{[^}]*\}'
-                buttons = re.finditer(button_pattern, content)
-                
-                for button in buttons:
-                    button_code = button.group(0)
-                    # Check if it's empty or just has TODO
-                    if '// TODO' in button_code or button_code.count('{') == button_code.count('}'):
-                        dead_buttons.append({
-                            "screen": screen.get('name'),
-                            "issue": "Empty button handler",
-                            "code": button_code[:100]
-                        })
-                
-                # Find IconButton with empty onPressed
-                icon_button_pattern = r'IconButton\([^)]*onPressed:\s*\(\)\s*\{[^}]*\}[^)]*\)'
-                icon_buttons = re.finditer(icon_button_pattern, content)
-                for btn in icon_buttons:
-                    btn_code = btn.group(0)
-                    if btn_code.count('{') <= 1:  # Empty or minimal
-                        dead_buttons.append({
-                            "screen": screen.get('name'),
-                            "issue": "Empty IconButton handler",
-                            "code": btn_code[:100]
-                        })
-                
-            except Exception as e:
-                pass
+            for button in scan["dead_buttons"]:
+                dead_buttons.append({
+                    "screen": screen.get('name'),
+                    "issue": button["issue"],
+                    "handler": button["handler"],
+                    "code": button["code"]
+                })
         
         return {
             "total_checked": len(screens),
@@ -246,44 +295,29 @@ class ParallelModuleAuditor:
         """Audit user flows"""
         flows = []
         
-        # Common flows to check
-        common_flows = [
-            "Create → View → Edit → Delete",
-            "List → Detail → Action",
-            "Search → Filter → Select",
-            "Compose → Send → View",
-        ]
-        
         # For each screen, check if it supports common flows
         for screen in screens:
-            screen_path = self.code_dir / screen.get('path')
-            if not screen_path.exists():
+            scan = self._scan(screen)
+            if scan is None or "error" in scan:
                 continue
             
-            try:
-                with open(screen_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                features = screen.get('features', {})
-                widget_methods = features.get('widget_methods', [])
-                action_methods = features.get('action_methods', [])
-                
-                # Check for CRUD operations
-                has_create = any('create' in m.lower() for m in action_methods)
-                has_read = any('load' in m.lower() or 'fetch' in m.lower() for m in action_methods)
-                has_update = any('update' in m.lower() or 'edit' in m.lower() for m in action_methods)
-                has_delete = any('delete' in m.lower() for m in action_methods)
-                
-                flows.append({
-                    "screen": screen.get('name'),
-                    "has_create": has_create,
-                    "has_read": has_read,
-                    "has_update": has_update,
-                    "has_delete": has_delete,
-                    "flow_complete": has_create and has_read and (has_update or has_delete)
-                })
-            except:
-                pass
+            features = screen.get('features', {})
+            action_methods = features.get('action_methods', [])
+            
+            # Check for CRUD operations
+            has_create = any('create' in m.lower() for m in action_methods)
+            has_read = any('load' in m.lower() or 'fetch' in m.lower() for m in action_methods)
+            has_update = any('update' in m.lower() or 'edit' in m.lower() for m in action_methods)
+            has_delete = any('delete' in m.lower() for m in action_methods)
+            
+            flows.append({
+                "screen": screen.get('name'),
+                "has_create": has_create,
+                "has_read": has_read,
+                "has_update": has_update,
+                "has_delete": has_delete,
+                "flow_complete": has_create and has_read and (has_update or has_delete)
+            })
         
         return {
             "total_screens": len(screens),
@@ -356,48 +390,100 @@ class ParallelModuleAuditor:
     
     def _check_testing(self, screens: List) -> Dict:
         """Check testing status"""
-        test_dir = self.root_dir / "test"
-        test_files = list(test_dir.rglob("*.dart")) if test_dir.exists() else []
+        if self._test_files_count is None:
+            test_dir = self.root_dir / "test"
+            self._test_files_count = len(list(test_dir.rglob("*.dart"))) if test_dir.exists() else 0
+        test_files_count = self._test_files_count
         
         # Simple check - count test files
         return {
-            "test_files_count": len(test_files),
+            "test_files_count": test_files_count,
             "screens_count": len(screens),
-            "coverage_estimate": f"{min(100, len(test_files) * 10)}%"
+            "coverage_estimate": f"{min(100, test_files_count * 10)}%"
         }
     
-    def audit_all_modules_parallel(self):
-        """Audit all modules in parallel"""
-        data = self.load_extraction_data()
+    def scan_screens(self, screens: List, executor: str = "thread", workers: int = 8,
+                     chunksize: int = None):
+        """Scan every screen file once, spreading per-file work units over a pool"""
+        paths = []
+        for screen in screens:
+            path = screen.get('path')
+            if path not in self._scans and path not in paths:
+                paths.append(path)
+        
+        work = []
+        for path in paths:
+            source = self.corpus.get(path)
+            if source is None:
+                self._scans[path] = None
+                continue
+            try:
+                # Threads share the corpus' lexed views; process workers lex their own copy
+                work.append((path, source.text, source if executor != "process" else None))
+            except Exception as e:
+                self._scans[path] = {"error": str(e)}
+        
+        # Shards of near-equal size, heaviest first, so the largest screens
+        # are spread over the workers rather than queued in one chunk
+        count = math.ceil(len(work) / chunksize) if chunksize else workers * SHARDS_PER_WORKER
+        shards = shard_by_size(work, count)
+        
+        if executor == "process":
+            # Spawned, not forked, like the functional checker's pool: never copy another thread's locks
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers)
+        with pool:
+            for results in pool.map(_scan_shard, shards):
+                for path, scan in results:
+                    self._scans[path] = scan
+    
+    def audit_all_modules_parallel(self, executor: str = "thread", workers: int = 8,
+                                   chunksize: int = None, data: Dict = None):
+        """Audit all modules, scanning screen files in parallel (from data, or the extraction JSON)"""
+        if data is None:
+            data = self.load_extraction_data()
         
         modules = data.get('modules', {})
         screens = data.get('screens', [])
         widgets = data.get('widgets', [])
         
-        print(f"\nAuditing all {len(modules)} modules in parallel...\n")
+        print(f"\nAuditing all {len(modules)} modules in parallel ({executor} pool, {workers} workers)...\n")
         
-        # Use ThreadPoolExecutor for parallel processing
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = {
-                executor.submit(
-                    self.audit_module,
-                    module_num,
-                    module_data,
-                    screens,
-                    widgets
-                ): module_num
-                for module_num, module_data in modules.items()
-            }
-            
-            for future in as_completed(futures):
-                module_num = futures[future]
-                try:
-                    audit_result = future.result()
-                    self.results[module_num] = audit_result
-                    print(f"  ✅ Module {module_num} complete")
-                except Exception as e:
-                    print(f"  ❌ Module {module_num} error: {e}")
-                    self.results[module_num] = {"error": str(e)}
+        # Only screens some module audits are scanned
+        module_ids = {screen_module(module_num) for module_num in modules}
+        self.scan_screens([screen for screen in screens if screen.get('module') in module_ids],
+                          executor=executor, workers=workers, chunksize=chunksize)
+        
+        for module_num, module_data in modules.items():
+            try:
+                self.results[module_num] = self.audit_module(module_num, module_data, screens, widgets)
+                print(f"  ✅ Module {module_num} complete")
+            except Exception as e:
+                print(f"  ❌ Module {module_num} error: {e}")
+                self.results[module_num] = {"error": str(e)}
+        
+        return self.results
+    
+    def reaudit_modules(self, module_nums: List[str], data: Dict, changed_paths: List[str] = ()):
+        """Re-audit only module_nums after edits to changed_paths, reusing every other scan and module result"""
+        for path in changed_paths:
+            self._scans.pop(path, None)
+        
+        modules = data.get('modules', {})
+        screens = data.get('screens', [])
+        widgets = data.get('widgets', [])
+        # Keep module order identical to a full run
+        previous, self.results = self.results, {}
+        for module_num, module_data in modules.items():
+            if module_num not in module_nums and module_num in previous:
+                self.results[module_num] = previous[module_num]
+                continue
+            try:
+                self.results[module_num] = self.audit_module(module_num, module_data, screens, widgets)
+            except Exception as e:
+                print(f"  ❌ Module {module_num} error: {e}")
+                self.results[module_num] = {"error": str(e)}
         
         return self.results
     
@@ -409,8 +495,38 @@ class ParallelModuleAuditor:
         print(f"\nResults saved to {output_path}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit all modules in parallel")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="Pool used for the per-file scans (process sidesteps the GIL)")
+    parser.add_argument("--workers", type=int, default=8, help="Number of pool workers")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help=f"Files per work unit (default: {SHARDS_PER_WORKER} size-balanced shards per worker)")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument(
+            ParallelModuleAuditor,
+            "audit_all_modules_parallel", "load_extraction_data", "scan_screens", "save_results",
+            "_audit_capabilities", "_audit_screens", "_audit_navigation", "_audit_buttons_links",
+            "_audit_flows", "_audit_state_handling", "_audit_backend_integration", "_check_testing",
+        )
+        audit_trace.instrument(ParallelModuleAuditor, "audit_module", cat="module",
+                               label=lambda self, module_num, *args: f"Module {module_num}")
+        if args.executor == "thread":
+            # Process-pool workers keep their own (uncollected) tracer, so only trace files in-process
+            audit_trace.instrument(sys.modules[__name__], "_scan_work_unit", cat="file",
+                                   label=lambda item: item[0])
+    
     auditor = ParallelModuleAuditor(".")
-    results = auditor.audit_all_modules_parallel()
+    results = auditor.audit_all_modules_parallel(
+        executor=args.executor,
+        workers=args.workers,
+        chunksize=args.chunksize
+    )
     auditor.save_results("docs/parallel_audit_results.json")
     print("\nParallel audit complete!")
+    audit_trace.finish()
 
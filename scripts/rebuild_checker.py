@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Rebuild Checker
+Resolves each setState call to its State class and ranks screens by how much build tree one call rebuilds
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Dict, List
+
+import audit_trace
+from dart_lexer import DartTokens, word_start
+from enhanced_audit_extractor import infer_module
+from handler_extractor import call_arguments
+from render_checker import build_methods, helper_depths
+from source_corpus import LineIndex, SourceCorpus, SourceFile
+
+# A State class whose build tree spans at least this many lines is worth splitting
+SPLIT_LINES = 500
+# Screens listed in the ranking
+RANKED_SCREENS = 20
+
+STATE_CLASS_PATTERN = re.compile(r'class\s+(\w+)\s+extends\s+State\s*<\s*(\w+)\s*>[^{;]*\{')
+SET_STATE_PATTERN = re.compile(r'setState\s*\(')
+# name =  /  name +=  /  name++  /  ++name  (== and => excluded)
+ASSIGNED_PATTERN = re.compile(r'(?:\+\+|--)?(\w+)(?:\s*\[[^\]]*\])?\s*(?:[-+*/~%|&]|\?\?)?=(?![=>])|(\w+)\s*(?:\+\+|--)')
+
+
+def _line_span(lines: LineIndex, start: int, end: int) -> int:
+    """Lines covered by [start, end)"""
+    return lines.line_of(max(start, end - 1)) - lines.line_of(start) + 1
+
+
+def state_classes(tokens: DartTokens) -> List[Dict]:
+    """name, widget and [body_start, body_end) of every State subclass in one file"""
+    code = tokens.code
+    classes = []
+    for match in STATE_CLASS_PATTERN.finditer(code):
+        if not word_start(code, match.start(), after_dot=False):
+            continue
+        close = tokens.closing(match.end() - 1)
+        if close is not None:
+            classes.append({"name": match.group(1), "widget": match.group(2),
+                            "body_start": match.end(), "body_end": close})
+    return classes
+
+
+def set_state_calls(tokens: DartTokens, offsets: List[int]) -> List[tuple]:
+    """(start, open paren, close paren) of each setState call, from the marker offsets of "setState" """
+    code = tokens.code
+    calls = []
+    for offset in offsets:
+        if not word_start(code, offset, after_dot=False):
+            continue
+        match = SET_STATE_PATTERN.match(code, offset)
+        if match is None:
+            continue
+        close = tokens.closing(match.end() - 1)
+        if close is not None:
+            calls.append((offset, match.end() - 1, close))
+    return calls
+
+
+def assigned_names(code: str, start: int, end: int) -> List[str]:
+    """Names assigned or incremented in code[start:end] (the fields a setState callback changes)"""
+    names = set()
+    for match in ASSIGNED_PATTERN.finditer(code, start, end):
+        name = match.group(1) or match.group(2)
+        if not name[0].isdigit():
+            names.add(name)
+    return sorted(names)
+
+
+class RebuildChecker:
+    """Measures the build tree every setState call rebuilds, per State class and per screen"""
+
+    def __init__(self, root_dir: str, corpus: SourceCorpus = None):
+        self.root_dir = Path(root_dir)
+        self.code_dir = self.root_dir / "lib"
+        self.corpus = corpus or SourceCorpus.shared(self.code_dir)
+        self.screens: List[Dict] = []
+
+    def check_screen(self, source: SourceFile) -> Dict:
+        """State classes of one screen with their build cost and setState calls"""
+        result = {"screen": source.stem, "path": source.rel_path, "module": infer_module(source.path)}
+        try:
+            tokens = source.tokens
+            markers = source.markers
+        except Exception as e:
+            result["error"] = f"Could not read file: {str(e)}"
+            return result
+        result["state_classes"] = []
+        result["rebuild_lines"] = 0
+        result["set_state_calls"] = 0
+        if not markers.has("extends_state"):
+            return result
+        code = tokens.code
+        lines = source.lines
+        methods = build_methods(tokens)
+        calls = set_state_calls(tokens, markers.occurrences("set_state"))
+        for state in state_classes(tokens):
+            body_start, body_end = state["body_start"], state["body_end"]
+            own = [method for method in methods if body_start <= method.start < body_end]
+            depths = helper_depths(tokens, own)
+            reached = [method for method in own if depths[method.name] is not None]
+            build_lines = sum(_line_span(lines, method.start, method.end) for method in reached
+                              if method.name == "build")
+            helper_lines = sum(_line_span(lines, method.start, method.end) for method in reached
+                               if method.name != "build")
+            state_calls = []
+            for start, open_paren, close in calls:
+                if not body_start <= start < body_end:
+                    continue
+                # Innermost build method holding the call (a callback wired up in the tree)
+                holder = None
+                for method in reached:
+                    if method.body_start <= start < method.body_end:
+                        holder = method.name
+                arguments = call_arguments(tokens, open_paren, close)
+                changed = assigned_names(code, arguments[0][1], arguments[0][2]) if arguments else []
+                state_calls.append({
+                    "line": lines.line_of(start),
+                    "in_build_method": holder,
+                    "changes": changed,
+                })
+            result["state_classes"].append({
+                "state_class": state["name"],
+                "widget": state["widget"],
+                "line": lines.line_of(body_start),
+                "build_lines": build_lines,
+                "helper_lines": helper_lines,
+                "rebuild_lines": build_lines + helper_lines,
+                "helpers": sorted(method.name for method in reached if method.name != "build"),
+                "set_state_calls": state_calls,
+            })
+        rebuilding = [state for state in result["state_classes"] if state["set_state_calls"]]
+        result["rebuild_lines"] = max((state["rebuild_lines"] for state in rebuilding), default=0)
+        result["set_state_calls"] = sum(len(state["set_state_calls"]) for state in rebuilding)
+        return result
+
+    def check_all_screens(self):
+        """Check every screen (navigation shell included)"""
+        self.screens = [self.check_screen(source) for source in self.corpus.screens()]
+
+    def rank(self) -> List[Dict]:
+        """State classes with setState calls, largest rebuilt tree first"""
+        ranked = []
+        for screen in self.screens:
+            for state in screen.get("state_classes", []):
+                if not state["set_state_calls"]:
+                    continue
+                ranked.append({
+                    "screen": screen["screen"],
+                    "path": screen["path"],
+                    "module": screen["module"],
+                    "state_class": state["state_class"],
+                    "rebuild_lines": state["rebuild_lines"],
+                    "helpers": len(state["helpers"]),
+                    "set_state_calls": len(state["set_state_calls"]),
+                    # Calls changing one field each rebuild the whole tree all the same
+                    "single_field_calls": sum(1 for call in state["set_state_calls"] if len(call["changes"]) <= 1),
+                    "split_candidate": state["rebuild_lines"] >= SPLIT_LINES,
+                })
+        ranked.sort(key=lambda state: (-state["rebuild_lines"], -state["set_state_calls"], state["path"]))
+        return ranked
+
+    def run_checks(self) -> Dict:
+        """Run the rebuild checks and print the screens whose setState calls rebuild the most"""
+        print("Resolving setState calls to their State classes...")
+        self.check_all_screens()
+        ranked = self.rank()
+        summary = {
+            "screens": len(self.screens),
+            "state_classes": sum(len(screen.get("state_classes", [])) for screen in self.screens),
+            "set_state_calls": sum(screen.get("set_state_calls", 0) for screen in self.screens),
+            "split_candidates": sum(1 for state in ranked if state["split_candidate"]),
+            "ranking": ranked[:RANKED_SCREENS],
+        }
+        print(f"\n{summary['set_state_calls']} setState call(s) in {summary['state_classes']} State classes; "
+              f"{summary['split_candidates']} rebuild {SPLIT_LINES}+ lines:")
+        for state in summary["ranking"]:
+            if state["split_candidate"]:
+                print(f"  - {state['path']} {state['state_class']}: {state['rebuild_lines']} lines, "
+                      f"{state['helpers']} helpers, {state['set_state_calls']} setState call(s)")
+        return {"summary": summary, "screens": self.screens}
+
+    def save_results(self, results: Dict, output_file: str):
+        """Save results to JSON"""
+        with open(self.root_dir / output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank screens by the build tree their setState calls rebuild")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument(RebuildChecker, "run_checks", "check_all_screens", "save_results")
+        audit_trace.instrument(RebuildChecker, "check_screen", cat="file", label=lambda self, source: source.rel_path)
+
+    checker = RebuildChecker(".")
+    results = checker.run_checks()
+    checker.save_results(results, "docs/rebuild_cost.json")
+    audit_trace.finish()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Render Checker
+Finds rendering anti-patterns in screen build methods and ranks the worst offenders per module
+"""
+
+import argparse
+import json
+import re
+from collections import deque, namedtuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import audit_trace
+from dart_lexer import DartTokens, word_start
+from enhanced_audit_extractor import infer_module
+from handler_extractor import call_arguments, expression_end
+from source_corpus import LineIndex, SourceCorpus, SourceFile
+
+NON_LAZY_LIST = "non_lazy_list"
+COLUMN_IN_SCROLL_VIEW = "column_in_scroll_view"
+NESTED_SHRINK_WRAP = "nested_shrink_wrap"
+OPACITY_ANIMATION = "opacity_animation"
+MEDIA_QUERY_IN_HELPER = "media_query_in_helper"
+
+# Score of one finding; a MediaQuery lookup costs its weight per level of helper depth
+WEIGHTS = {
+    NON_LAZY_LIST: 5,
+    COLUMN_IN_SCROLL_VIEW: 4,
+    NESTED_SHRINK_WRAP: 4,
+    OPACITY_ANIMATION: 3,
+    MEDIA_QUERY_IN_HELPER: 1,
+}
+ISSUES = {
+    NON_LAZY_LIST: "ListView/GridView builds every child up front; use .builder",
+    COLUMN_IN_SCROLL_VIEW: "Column of generated children in a SingleChildScrollView; use ListView.builder",
+    NESTED_SHRINK_WRAP: "shrinkWrap: true on a scrollable nested in another one lays out every child",
+    OPACITY_ANIMATION: "Opacity around animated content repaints offscreen each frame; use FadeTransition",
+    MEDIA_QUERY_IN_HELPER: "MediaQuery.of(context) in a build helper; read it once in build or use sizeOf",
+}
+# A children list at least this long counts as large even without a generator
+LARGE_CHILDREN = 20
+# Worst methods listed per module
+WORST_PER_MODULE = 5
+
+# Literal-led patterns (see navigation_graph); word starts are checked per match
+# Matches the build in both build( and _buildHeader(; see _build_names
+BUILD_METHOD_PATTERN = re.compile(r'build(\w*)\s*\(')
+METHOD_BODY_PATTERN = re.compile(r'\s*(?:async\*?|sync\*)?\s*(\{|=>)')
+CALL_KEYWORDS = {"return", "await", "yield", "else", "new", "const", "throw", "case", "in", "is", "as"}
+EAGER_LIST_PATTERN = re.compile(r'(?:ListView|GridView(?:\s*\.\s*(?:count|extent))?)\s*\(')
+SCROLL_VIEW_PATTERN = re.compile(r'SingleChildScrollView\s*\(')
+SCROLLABLE_PATTERN = re.compile(
+    r'(ListView|GridView|SingleChildScrollView|CustomScrollView|PageView|NestedScrollView)(?:\s*\.\s*\w+)?\s*\('
+)
+SHRINK_WRAP_PATTERN = re.compile(r'shrinkWrap\s*:\s*true')
+OPACITY_PATTERN = re.compile(r'Opacity\s*\(')
+ANIMATED_PATTERN = re.compile(r'(?:Animated[A-Z]\w*|TweenAnimationBuilder|[A-Z]\w*Transition|Lottie\w*)\s*[.(]')
+ANIMATED_BUILDER_PATTERN = re.compile(r'(?:AnimatedBuilder|TweenAnimationBuilder|AnimatedWidget)\s*(?:<[^<>()]*>)?\s*\(')
+ANIMATION_VALUE_PATTERN = re.compile(r'[Aa]nimation|[Cc]ontroller|\.value\b')
+MEDIA_QUERY_PATTERN = re.compile(r'MediaQuery\s*\.\s*of\s*\(')
+# A generator at the start of a children element: spread (...items / ...?items,
+# not of a list literal), collection-for, List.generate( or .map(; limit and
+# count capture a literal bound (for (var i = 0; i < 5; / List.generate(5,)
+GENERATED_CHILDREN_PATTERN = re.compile(
+    r'\.\.\.\??\s*(?!\[)(?:List\s*\.\s*generate\s*\(\s*(?P<spread_count>\d+)\b)?'
+    r'|for\s*\((?:[^;()]*;\s*\w+\s*<=?\s*(?P<limit>\d+)\b)?'
+    r'|List\s*\.\s*generate\s*\(\s*(?P<count>\d+)?'
+    r'|\.map\s*[(<]'
+)
+CONDITION_PATTERN = re.compile(r'if\s*\(')
+
+# name is the method, [start, end) its declaration through the body and
+# [body_start, body_end) the block or arrow body
+BuildMethod = namedtuple("BuildMethod", "name start end body_start body_end")
+
+
+def _build_names(code: str, start: int = 0, end: Optional[int] = None):
+    """(name, start, end) of every build( or _build*( in code[start:end]; end is past the parenthesis"""
+    for match in BUILD_METHOD_PATTERN.finditer(code, start, len(code) if end is None else end):
+        name_start = match.start()
+        if name_start > 0 and code[name_start - 1] == '_':
+            name_start -= 1
+        elif match.group(1):
+            continue
+        if word_start(code, name_start, after_dot=False):
+            yield code[name_start:match.start(1)] + match.group(1), name_start, match.end()
+
+
+def _calls(code: str, tokens: DartTokens, pattern: re.Pattern) -> List[Tuple[int, int, int]]:
+    """(start, open paren, close paren) of every call matched by pattern (which ends at the parenthesis)"""
+    calls = []
+    for match in pattern.finditer(code):
+        if not word_start(code, match.start(), after_dot=False):
+            continue
+        close = tokens.closing(match.end() - 1)
+        if close is not None:
+            calls.append((match.start(), match.end() - 1, close))
+    return calls
+
+
+def build_methods(tokens: DartTokens) -> List[BuildMethod]:
+    """Declarations of build and _build* methods, in source order
+
+    A call like `return _buildHeader(` is told from a declaration by what
+    precedes the name: a return type ends in an identifier, > or ?, a call
+    follows punctuation or a keyword.
+    """
+    code = tokens.code
+    methods = []
+    for name, start, name_end in _build_names(code):
+        before = code[max(0, start - 200):start].rstrip()
+        if not before or not (before[-1].isalnum() or before[-1] in '_>?'):
+            continue
+        previous = re.search(r'(\w+)$', before)
+        if previous is not None and previous.group(1) in CALL_KEYWORDS:
+            continue
+        params_end = tokens.closing(name_end - 1)
+        if params_end is None:
+            continue
+        body = METHOD_BODY_PATTERN.match(code, params_end + 1)
+        if body is None:
+            continue
+        if body.group(1) == '{':
+            close = tokens.closing(body.start(1))
+            if close is None:
+                continue
+            methods.append(BuildMethod(name, start, close + 1, body.end(1), close))
+        else:
+            end = expression_end(tokens, body.end(1))
+            methods.append(BuildMethod(name, start, end, body.end(1), end))
+    return methods
+
+
+def _argument(tokens: DartTokens, open_paren: int, close: int, name: str) -> Optional[Tuple[int, int]]:
+    """[start, end) of the named argument name of the call whose parentheses are at open_paren/close"""
+    for argument, start, end in call_arguments(tokens, open_paren, close):
+        if argument == name:
+            return start, end
+    return None
+
+
+def _list_elements(tokens: DartTokens, start: int, end: int) -> Optional[List[Tuple[int, int]]]:
+    """[start, end) of each top-level element of the list literal in code[start:end] (None if it is not one)"""
+    code = tokens.code
+    bracket = code.find('[', start, end)
+    if bracket < 0 or code[start:bracket].strip() not in ('', '<Widget>', 'const', 'const <Widget>'):
+        return None
+    close = tokens.closing(bracket)
+    if close is None:
+        return None
+    elements = []
+    pos = bracket + 1
+    while pos < close:
+        item_end = expression_end(tokens, pos)
+        if code[pos:item_end].strip():
+            elements.append((pos, item_end))
+        if item_end >= close:
+            break
+        pos = item_end + 1
+    return elements
+
+
+def _unbounded(code: str, start: int, end: int) -> bool:
+    """True if code[start:end] starts with a generator (see GENERATED_CHILDREN_PATTERN) without a small literal bound"""
+    generator = GENERATED_CHILDREN_PATTERN.match(code, start, end)
+    if generator is None:
+        return False
+    bound = generator.group('limit') or generator.group('count') or generator.group('spread_count')
+    return bound is None or int(bound) >= LARGE_CHILDREN
+
+
+def _generated_children(tokens: DartTokens, open_paren: int, close: int) -> Optional[str]:
+    """Why the children of the call at open_paren are unbounded ("generated" or "N children"), if they are
+
+    Only the list's own elements count: a spread or collection-for element
+    (possibly behind an `if`), or a whole value built by map/generate.
+    Generators nested deeper belong to some child widget's own list.
+    """
+    children = _argument(tokens, open_paren, close, "children")
+    if children is None:
+        return None
+    code = tokens.code
+    elements = _list_elements(tokens, *children)
+    if elements is None:
+        value = code[children[0]:children[1]]
+        generator = re.search(r'\.map\s*[(<]|List\s*\.\s*generate', value)
+        if generator and _unbounded(code, children[0] + generator.start(), children[1]):
+            return "generated"
+        return None
+    for start, end in elements:
+        start = end - len(code[start:end].lstrip())
+        condition = CONDITION_PATTERN.match(code, start, end)
+        if condition is not None:
+            condition_end = tokens.closing(condition.end() - 1)
+            if condition_end is not None:
+                start = condition_end + 1
+                start = end - len(code[start:end].lstrip())
+        if _unbounded(code, start, end):
+            return "generated"
+    return f"{len(elements)} children" if len(elements) >= LARGE_CHILDREN else None
+
+
+def _inside(offset: int, ranges: List[Tuple[int, int, int]], exclude: int = -1) -> bool:
+    """True if offset lies within the parentheses of any call in ranges (other than the one starting at exclude)"""
+    return any(open_paren < offset < close and start != exclude for start, open_paren, close in ranges)
+
+
+def scan_render(tokens: DartTokens) -> List[Tuple[str, int, int, str]]:
+    """(pattern, start, end, detail) of every rendering anti-pattern in one file, in source order"""
+    code = tokens.code
+    findings = []
+    # The alternations below have no single literal prefix; skip them outright
+    # in files that cannot match
+    has_scrollable = 'View' in code
+
+    scrollables = _calls(code, tokens, SCROLLABLE_PATTERN) if has_scrollable else []
+    eager_lists = _calls(code, tokens, EAGER_LIST_PATTERN) if has_scrollable else []
+    for start, open_paren, close in eager_lists:
+        detail = _generated_children(tokens, open_paren, close)
+        if detail:
+            findings.append((NON_LAZY_LIST, start, close + 1, detail))
+
+    for start, open_paren, close in _calls(code, tokens, SCROLL_VIEW_PATTERN):
+        child = _argument(tokens, open_paren, close, "child")
+        if child is None:
+            continue
+        column = re.match(r'\s*(?:const\s+)?(Column|Wrap)\s*\(', code[child[0]:child[1]])
+        if column is None:
+            continue
+        column_open = child[0] + column.end() - 1
+        detail = _generated_children(tokens, column_open, tokens.closing(column_open) or child[1])
+        if detail:
+            findings.append((COLUMN_IN_SCROLL_VIEW, start, close + 1, f"{column.group(1)}, {detail}"))
+
+    for match in SHRINK_WRAP_PATTERN.finditer(code):
+        owners = [call for call in scrollables if call[1] < match.start() < call[2]]
+        if not owners:
+            continue
+        owner = max(owners, key=lambda call: call[1])  # innermost scrollable holding the flag
+        if _inside(owner[0], scrollables, exclude=owner[0]):
+            findings.append((NESTED_SHRINK_WRAP, match.start(), match.end(), "scrollable inside scrollable"))
+
+    animated_builders = _calls(code, tokens, ANIMATED_BUILDER_PATTERN) if 'Animat' in code else []
+    for start, open_paren, close in _calls(code, tokens, OPACITY_PATTERN):
+        opacity = _argument(tokens, open_paren, close, "opacity")
+        child = _argument(tokens, open_paren, close, "child")
+        if opacity and ANIMATION_VALUE_PATTERN.search(code, *opacity):
+            detail = "animated opacity value"
+        elif child and ANIMATED_PATTERN.search(code, *child):
+            detail = "animated child"
+        elif _inside(start, animated_builders):
+            detail = "rebuilt by an animation builder"
+        else:
+            continue
+        findings.append((OPACITY_ANIMATION, start, close + 1, detail))
+
+    for start, _, close in _calls(code, tokens, MEDIA_QUERY_PATTERN):
+        findings.append((MEDIA_QUERY_IN_HELPER, start, close + 1, ""))
+
+    findings.sort(key=lambda finding: finding[1])
+    return findings
+
+
+def helper_depths(tokens: DartTokens, methods: List[BuildMethod]) -> Dict[str, Optional[int]]:
+    """Calls from build to each build method (0 for build; None if never reached from a build)"""
+    code = tokens.code
+    calls = {}
+    names = {method.name for method in methods}
+    for method in methods:
+        called = {name for name, _, _ in _build_names(code, method.body_start, method.body_end)}
+        calls.setdefault(method.name, set()).update(called & names)
+    depths: Dict[str, Optional[int]] = {name: None for name in names}
+    queue = deque()
+    if "build" in depths:
+        depths["build"] = 0
+        queue.append("build")
+    while queue:
+        name = queue.popleft()
+        for callee in sorted(calls.get(name, ())):
+            if depths[callee] is None:
+                depths[callee] = depths[name] + 1
+                queue.append(callee)
+    return depths
+
+
+class RenderChecker:
+    """Scores every build method of every screen by the rendering anti-patterns it contains"""
+
+    def __init__(self, root_dir: str, corpus: SourceCorpus = None):
+        self.root_dir = Path(root_dir)
+        self.code_dir = self.root_dir / "lib"
+        self.corpus = corpus or SourceCorpus.shared(self.code_dir)
+        self.screens: List[Dict] = []
+
+    def check_screen(self, source: SourceFile) -> Dict:
+        """Findings of one screen, grouped by the build method containing them"""
+        try:
+            tokens = source.tokens
+        except Exception as e:
+            return {"screen": source.stem, "path": source.rel_path, "module": infer_module(source.path),
+                    "error": f"Could not read file: {str(e)}"}
+        lines = source.lines
+        methods = build_methods(tokens)
+        depths = helper_depths(tokens, methods)
+        scored = [{"method": method.name, "line": lines.line_of(method.start), "depth": depths[method.name],
+                   "score": 0, "findings": []} for method in methods]
+        outside = []
+        for pattern, start, end, detail in scan_render(tokens):
+            # Innermost build method containing the finding
+            owner = None
+            for index, method in enumerate(methods):
+                if method.body_start <= start < method.body_end:
+                    owner = index
+            if pattern == MEDIA_QUERY_IN_HELPER and (owner is None or methods[owner].name == "build"):
+                continue
+            line, column = lines.line_col(start)
+            finding = {
+                "pattern": pattern,
+                "issue": ISSUES[pattern],
+                "detail": detail,
+                "line": line,
+                "column": column,
+                "span": lines.span(start, end),
+            }
+            if owner is None:
+                outside.append(finding)
+                continue
+            weight = WEIGHTS[pattern]
+            if pattern == MEDIA_QUERY_IN_HELPER:
+                weight *= depths[methods[owner].name] or 1
+            scored[owner]["score"] += weight
+            scored[owner]["findings"].append(finding)
+        return {
+            "screen": source.stem,
+            "path": source.rel_path,
+            "module": infer_module(source.path),
+            "score": sum(method["score"] for method in scored),
+            "methods": [method for method in scored if method["findings"]],
+            "outside_build_methods": outside,
+        }
+
+    def check_all_screens(self):
+        """Check every screen (navigation shell included)"""
+        self.screens = [self.check_screen(source) for source in self.corpus.screens()]
+
+    def summarize(self) -> Dict:
+        """Per-module totals and worst build methods, plus counts per pattern"""
+        modules: Dict[str, Dict] = {}
+        by_pattern = {pattern: 0 for pattern in WEIGHTS}
+        for screen in self.screens:
+            module = modules.setdefault(screen["module"], {"score": 0, "screens": 0, "worst": []})
+            module["screens"] += 1
+            module["score"] += screen.get("score", 0)
+            for method in screen.get("methods", []):
+                for finding in method["findings"]:
+                    by_pattern[finding["pattern"]] += 1
+                module["worst"].append({
+                    "screen": screen["screen"],
+                    "path": screen["path"],
+                    "method": method["method"],
+                    "line": method["line"],
+                    "score": method["score"],
+                    "patterns": sorted({finding["pattern"] for finding in method["findings"]}),
+                })
+            for finding in screen.get("outside_build_methods", []):
+                by_pattern[finding["pattern"]] += 1
+        for module in modules.values():
+            module["worst"].sort(key=lambda method: (-method["score"], method["path"], method["line"]))
+            del module["worst"][WORST_PER_MODULE:]
+        return {
+            "screens": len(self.screens),
+            "findings": sum(by_pattern.values()),
+            "by_pattern": by_pattern,
+            "modules": dict(sorted(modules.items(), key=lambda item: (-item[1]["score"], item[0]))),
+        }
+
+    def run_checks(self) -> Dict:
+        """Run the render checks and print the worst method of each module"""
+        print("Checking screen build methods for rendering anti-patterns...")
+        self.check_all_screens()
+        summary = self.summarize()
+        print(f"\nFound {summary['findings']} rendering issue(s) in {summary['screens']} screens:")
+        for pattern, count in summary["by_pattern"].items():
+            print(f"  - {pattern}: {count}")
+        for number, module in summary["modules"].items():
+            if module["worst"]:
+                worst = module["worst"][0]
+                print(f"  Module {number}: score {module['score']}, worst {worst['path']} "
+                      f"{worst['method']}() ({worst['score']})")
+        return {"summary": summary, "screens": self.screens}
+
+    def save_results(self, results: Dict, output_file: str):
+        """Save results to JSON"""
+        with open(self.root_dir / output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score screen build methods by rendering anti-patterns")
+    audit_trace.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.trace:
+        audit_trace.start(args.trace, args.trace_top)
+        audit_trace.instrument_patterns(globals())
+        audit_trace.instrument(RenderChecker, "run_checks", "check_all_screens", "save_results")
+        audit_trace.instrument(RenderChecker, "check_screen", cat="file", label=lambda self, source: source.rel_path)
+
+    checker = RenderChecker(".")
+    results = checker.run_checks()
+    checker.save_results(results, "docs/render_performance_issues.json")
+    audit_trace.finish()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Screen Markers
+Shared table of implementation markers (state handling, navigation, mock data) and a scanner locating them per file
+"""
+
+from collections import namedtuple
+from typing import Dict, List, Tuple
+
+from dart_lexer import DartTokens
+
+CODE = "code"  # matched on the code view (comments and string contents blanked)
+TEXT = "text"  # matched on the raw source
+
+# name is what the analyzers ask for; literal is matched as a plain substring
+# (case-insensitively if ignore_case) on the view named by view
+Marker = namedtuple("Marker", "name literal ignore_case view")
+
+MARKERS = (
+    Marker("stateful_widget", "StatefulWidget", False, CODE),
+    Marker("extends_state", "extends State", False, CODE),
+    Marker("set_state", "setState", False, CODE),
+    Marker("is_loading", "isLoading", False, CODE),
+    Marker("skeleton_loader", "SkeletonLoader", False, CODE),
+    Marker("build_loading_state", "_buildLoadingState", False, CODE),
+    Marker("empty_state_card", "EmptyStateCard", False, CODE),
+    Marker("build_empty_state", "_buildEmptyState", False, CODE),
+    Marker("is_empty", "isEmpty", False, CODE),
+    Marker("empty", "empty", True, CODE),
+    Marker("error_state_card", "ErrorStateCard", False, CODE),
+    Marker("build_error_state", "_buildErrorState", False, CODE),
+    Marker("error", "error", True, CODE),
+    Marker("try_block", "try {", False, CODE),
+    Marker("catch", "catch", False, CODE),
+    Marker("future_void", "Future<void>", False, CODE),
+    Marker("async", "async", False, CODE),
+    Marker("navigator", "Navigator", False, CODE),
+    Marker("mock_class", "Mock", False, CODE),
+    Marker("mock", "mock", True, CODE),
+    Marker("todo_backend", "TODO.*backend", False, TEXT),
+    Marker("backend_verification", "Backend verification", False, TEXT),
+)
+
+
+class MarkerHits:
+    """Offsets of every marker occurrence in one file, keyed by marker name
+
+    Each marker is located on first request: has() stops at the first
+    occurrence, so a presence check never reads a whole view for a marker
+    near its top, and markers nobody asks about are never searched.
+    """
+
+    def __init__(self, views: Dict[str, str], markers=MARKERS):
+        self._views = views
+        self._markers = {marker.name: marker for marker in markers}
+        self._lowered: Dict[str, str] = {}
+        self._offsets: Dict[str, List[int]] = {}
+
+    def _haystack(self, marker: Marker) -> Tuple[str, str]:
+        """(view, literal) to search for marker, both lower-cased if it ignores case"""
+        haystack = self._views[marker.view]
+        if not marker.ignore_case:
+            return haystack, marker.literal
+        # Lower-cased at most once per view and file
+        if marker.view not in self._lowered:
+            self._lowered[marker.view] = haystack.lower()
+        return self._lowered[marker.view], marker.literal.lower()
+
+    def occurrences(self, name: str) -> List[int]:
+        """Offsets of the named marker (overlapping occurrences included)"""
+        if name not in self._offsets:
+            marker = self._markers.get(name)
+            self._offsets[name] = _find_all(*self._haystack(marker)) if marker is not None else []
+        return self._offsets[name]
+
+    @property
+    def offsets(self) -> Dict[str, List[int]]:
+        return {name: self.occurrences(name) for name in self._markers}
+
+    def count(self, name: str) -> int:
+        return len(self.occurrences(name))
+
+    def has(self, *names: str) -> bool:
+        """True if any of the named markers occurs"""
+        for name in names:
+            if name in self._offsets:
+                if self._offsets[name]:
+                    return True
+            elif name in self._markers:
+                haystack, needle = self._haystack(self._markers[name])
+                if needle in haystack:
+                    return True
+        return False
+
+    def counts(self) -> Dict[str, int]:
+        return {name: len(offsets) for name, offsets in self.offsets.items() if offsets}
+
+
+def _find_all(haystack: str, needle: str) -> List[int]:
+    offsets = []
+    index = haystack.find(needle)
+    while index >= 0:
+        offsets.append(index)
+        index = haystack.find(needle, index + 1)
+    return offsets
+
+
+def scan_markers(tokens: DartTokens, markers=MARKERS) -> MarkerHits:
+    """Marker occurrences of one file, located per marker on first request
+
+    A combined alternation regex was measured at 4-30x slower than
+    str.find (which runs each literal at C speed, while the regex engine
+    retries every alternative at every offset), so each marker is its own
+    search over its view.
+    """
+    return MarkerHits({CODE: tokens.code, TEXT: tokens.text}, markers)
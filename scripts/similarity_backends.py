@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Similarity Backends
+Pluggable name-similarity pre-rankers for alignment_analyzer
+"""
+
+import re
+import zlib
+from typing import List, Optional, Set
+
+try:
+    import numpy as np
+except ImportError:  # Only the n-gram backend needs NumPy
+    np = None
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+class SequenceMatcherBackend:
+    """Exact backend: no pre-ranking, every blocked candidate is scored with SequenceMatcher"""
+
+    name = "exact"
+
+    def fit(self, item_texts: List[List[str]]):
+        pass
+
+    def top_k(self, queries: List[str]) -> Optional[List[Set[int]]]:
+        return None
+
+
+class NgramTfidfBackend:
+    """Hashed character n-gram TF-IDF with batched cosine similarity (requires NumPy)
+
+    Each code item contributes several texts (description, joined class
+    names, each class name); an item's score for a query is the best
+    cosine over its texts. top_k returns the k best items per query as a
+    shortlist for exact SequenceMatcher re-ranking.
+    """
+
+    name = "ngram"
+
+    def __init__(self, k: int = 25, n: int = 3, n_features: int = 1024, block_size: int = 512):
+        if np is None:
+            raise RuntimeError("The ngram similarity backend requires NumPy (pip install numpy)")
+        self.k = k
+        self.n = n
+        self.n_features = n_features
+        self.block_size = block_size
+        self.item_offsets = None
+        self.idf = None
+        self.matrix = None
+
+    def _grams(self, text: str) -> List[int]:
+        padded = f" {_normalize(text)} "
+        return [
+            zlib.crc32(padded[i:i + self.n].encode('utf-8')) % self.n_features
+            for i in range(max(1, len(padded) - self.n + 1))
+        ]
+
+    def _counts(self, texts: List[str]):
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            grams = self._grams(text)
+            rows.extend([row] * len(grams))
+            cols.extend(grams)
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), 1.0)
+        return matrix
+
+    def _weigh(self, counts):
+        weighted = counts * self.idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return weighted / norms
+
+    def fit(self, item_texts: List[List[str]]):
+        texts, offsets = [], []
+        for item in item_texts:
+            offsets.append(len(texts))
+            texts.extend(item or [""])
+        self.item_offsets = np.asarray(offsets, dtype=np.int64)
+
+        counts = self._counts(texts)
+        doc_freq = (counts > 0).sum(axis=0)
+        self.idf = (np.log((1.0 + len(texts)) / (1.0 + doc_freq)) + 1.0).astype(np.float32)
+        self.matrix = self._weigh(counts)
+
+    def top_k(self, queries: List[str]) -> List[Set[int]]:
+        items = len(self.item_offsets)
+        k = min(self.k, items)
+        shortlists = []
+        if k == 0:
+            return [set() for _ in queries]
+
+        for start in range(0, len(queries), self.block_size):
+            block = self._weigh(self._counts(queries[start:start + self.block_size]))
+            # One batched product per block, then the best text per item
+            scores = np.maximum.reduceat(block @ self.matrix.T, self.item_offsets, axis=1)
+            best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            shortlists.extend(set(row.tolist()) for row in best)
+
+        return shortlists
+
+
+BACKENDS = {
+    SequenceMatcherBackend.name: SequenceMatcherBackend,
+    NgramTfidfBackend.name: NgramTfidfBackend,
+}
+
+
+def get_backend(name: str, **options):
+    """Instantiate a backend by name ("exact" or "ngram")"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown similarity backend: {name}")
+    if name == SequenceMatcherBackend.name:
+        return SequenceMatcherBackend()
+    return BACKENDS[name](**options)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Source Corpus
+Walks lib/ once and shares the decoded Dart sources with every audit script
+"""
+
+import hashlib
+import os
+import re
+import threading
+import weakref
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from dart_lexer import DartTokens
+from screen_markers import MarkerHits, scan_markers
+
+# A quote or slash may open a literal; a closing brace may end a ${...}
+# interpolation, leaving the rest of its line inside the string
+LITERAL_EDGE_PATTERN = re.compile(r'[/\'"}]')
+# Openers of the only literals that span lines
+MULTILINE_OPENERS = ('/*', "'''", '"""')
+
+
+def _held(view):
+    """A lexed view stored by SourceFile, or None if its weak reference died (or it was never built)"""
+    return view() if isinstance(view, weakref.ref) else view
+
+
+class LineIndex:
+    """Newline offset table for O(log n) offset -> (line, column) lookups"""
+
+    def __init__(self, text: str):
+        # An array, not a list of ints: lexing stages keep one of these per screen
+        self.starts = array('q', [0])
+        self.starts.extend(m.end() for m in re.finditer('\n', text))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def line_of(self, offset: int) -> int:
+        """1-based line containing offset"""
+        return bisect_right(self.starts, offset)
+
+    def line_col(self, offset: int) -> Tuple[int, int]:
+        """1-based (line, column) of offset"""
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+    def span(self, start: int, end: int) -> Dict:
+        """Exact location of text[start:end]; end_column is exclusive"""
+        start_line, start_column = self.line_col(start)
+        end_line, end_column = self.line_col(end)
+        return {
+            "start_line": start_line,
+            "start_column": start_column,
+            "end_line": end_line,
+            "end_column": end_column,
+        }
+
+
+class SourceFile:
+    """A single Dart file loaded once, with path metadata and a line-offset table"""
+
+    def __init__(self, path: Path, rel_path: str, text: Optional[str] = None,
+                 error: Optional[Exception] = None):
+        self.path = path
+        self.rel_path = rel_path
+        self.name = path.name
+        self.stem = path.stem
+        self.parent_name = path.parent.name
+        self._text = text
+        self._error = error
+        self._lines = None
+        # Lexed views, or weak references to them (see SourceCorpus.retain_lexed)
+        self._tokens = None
+        self._markers = None
+        # Keep the lexed views for the file's lifetime
+        self.retain_lexed = False
+        self._content_hash = None
+        # Offset of the first multi-line literal opener, once found, and how
+        # far the text is known to hold none
+        self._first_opener = None
+        self._openers_checked = 0
+        # Guards the lazy lexed views only: files lex independently of each other
+        self._lock = threading.Lock()
+
+    @property
+    def text(self) -> str:
+        """Decoded file content (re-raises the original read error, if any)"""
+        if self._error is not None:
+            raise self._error
+        return self._text
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self._error
+
+    @property
+    def lines(self) -> LineIndex:
+        """Line-offset table, built on first use"""
+        if self._lines is None:
+            self._lines = LineIndex(self.text)
+        return self._lines
+
+    def _keep(self, view):
+        """What to store for a lexed view: the view itself if retained, else a weak reference"""
+        return view if self.retain_lexed else weakref.ref(view)
+
+    @property
+    def tokens(self) -> DartTokens:
+        """Lexed view (comments, strings, identifiers, brackets), built on first use
+
+        Unless retain_lexed is set it lives only while an analyzer holds it,
+        so a one-pass script never keeps a code view of every file at once.
+        """
+        tokens = _held(self._tokens)
+        if tokens is None:
+            # Stages share files across threads; lex each file only once
+            with self._lock:
+                tokens = _held(self._tokens)
+                if tokens is None:
+                    tokens = DartTokens(self.text)
+                    self._tokens = self._keep(tokens)
+        return tokens
+
+    @property
+    def markers(self) -> MarkerHits:
+        """Occurrences of the shared implementation markers, kept like the lexed view"""
+        markers = _held(self._markers)
+        if markers is None:
+            tokens = self.tokens
+            with self._lock:
+                markers = _held(self._markers)
+                if markers is None:
+                    markers = scan_markers(tokens)
+                    self._markers = self._keep(markers)
+        return markers
+
+    @property
+    def code(self) -> str:
+        """Content with comments and string literals blanked out, offsets preserved"""
+        return self.tokens.code
+
+    def in_code(self, offset: int) -> bool:
+        """True unless offset falls inside a comment or string literal, lexing the file only when unsure
+
+        Unless a block comment or triple-quoted string opens before it, a
+        literal holding offset starts on its line, so an offset with no quote,
+        slash or closing brace before it on its line is code (as in most class
+        declarations).
+        """
+        if _held(self._tokens) is None:
+            text = self.text
+            line_start = text.rfind('\n', 0, offset) + 1
+            if (LITERAL_EDGE_PATTERN.search(text, line_start, offset) is None
+                    and not self._opener_before(line_start)):
+                return True
+        return self.tokens.in_code(offset)
+
+    def _opener_before(self, line_start: int) -> bool:
+        """True if a block comment or triple-quoted string opens before line_start
+
+        Each stretch of text is searched once per file; no opener straddles a
+        line start, so the stretches need not overlap.
+        """
+        if self._first_opener is None and line_start > self._openers_checked:
+            text = self.text
+            found = [pos for pos in (text.find(opener, self._openers_checked, line_start)
+                                     for opener in MULTILINE_OPENERS) if pos >= 0]
+            if found:
+                self._first_opener = min(found)
+            else:
+                self._openers_checked = line_start
+        return self._first_opener is not None and self._first_opener < line_start
+
+    def code_matches(self, pattern) -> Iterator:
+        """Matches of pattern in the raw text that start in code, as finditer would find them in the code view
+
+        For patterns made of words and spaces only, which cannot run from
+        code into a literal. A rejected match (`/// the class` + `class Foo`)
+        resumes right after its start so it never swallows the one following it.
+        """
+        text = self.text
+        match = pattern.search(text)
+        while match is not None:
+            if self.in_code(match.start()):
+                yield match
+                match = pattern.search(text, match.end())
+            else:
+                match = pattern.search(text, match.start() + 1)
+
+    @property
+    def line_starts(self) -> Sequence[int]:
+        """Offsets at which each line starts (index 0 is line 1)"""
+        return self.lines.starts
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-1 of the decoded content, used to key cached analysis results"""
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha1(self.text.encode('utf-8')).hexdigest()
+        return self._content_hash
+
+    @property
+    def line_count(self) -> int:
+        return len(self.lines)
+
+
+class SourceCorpus:
+    """Every .dart file under a code directory, read and decoded exactly once"""
+
+    _shared: Dict[str, "SourceCorpus"] = {}
+
+    def __init__(self, code_dir: Path):
+        self.code_dir = Path(code_dir)
+        self._files = None
+        self._retain_lexed = False
+        self._lock = threading.Lock()
+
+    @property
+    def retain_lexed(self) -> bool:
+        """Whether files keep their lexed views once built (off by default)
+
+        The pipeline turns it on so its stages lex each file once between
+        them; a standalone script lexes, analyzes and drops one file at a time.
+        """
+        return self._retain_lexed
+
+    @retain_lexed.setter
+    def retain_lexed(self, retain: bool):
+        self._retain_lexed = retain
+        for source in (self._files or {}).values():
+            source.retain_lexed = retain
+
+    @classmethod
+    def shared(cls, code_dir: Path) -> "SourceCorpus":
+        """Return the corpus for code_dir, creating it on first use in this process"""
+        key = str(Path(code_dir).resolve())
+        if key not in cls._shared:
+            cls._shared[key] = cls(code_dir)
+        return cls._shared[key]
+
+    @classmethod
+    def from_files(cls, code_dir: Path, files: Dict[str, SourceFile]) -> "SourceCorpus":
+        """A corpus over already-loaded files (e.g. blobs of a past commit), never walking code_dir"""
+        corpus = cls(code_dir)
+        corpus._files = dict(files)
+        return corpus
+
+    def _read(self, path: Path, rel_path: str) -> SourceFile:
+        try:
+            # Decoding the bytes in one go beats a text-mode read; the
+            # replaces give the same universal newlines
+            with open(path, 'rb') as f:
+                text = f.read().decode('utf-8')
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+            return SourceFile(path, rel_path, text=text)
+        except Exception as e:
+            return SourceFile(path, rel_path, error=e)
+
+    def _load(self, reuse: Optional[Dict[str, SourceFile]] = None) -> Dict[str, SourceFile]:
+        """Walk the tree and decode each file (or take it from reuse)"""
+        files = {}
+        reuse = reuse or {}
+        if self.code_dir.exists():
+            # Same order as rglob("*.dart"), with one relative path per directory rather than per file
+            for dirpath, _, filenames in os.walk(self.code_dir):
+                directory = Path(dirpath)
+                prefix = directory.relative_to(self.code_dir).as_posix() + '/'
+                if prefix == './':
+                    prefix = ''
+                for name in filenames:
+                    if not name.endswith('.dart'):
+                        continue
+                    rel_path = prefix + name
+                    files[rel_path] = reuse.get(rel_path) or self._read(directory / name, rel_path)
+                    files[rel_path].retain_lexed = self._retain_lexed
+        return files
+
+    def refresh(self, changed: Iterable[str] = ()):
+        """Re-walk code_dir after edits: changed and new files are re-read, deleted ones dropped
+
+        changed holds paths relative to code_dir; every other file keeps its
+        SourceFile (and its memoized line table and content hash).
+        """
+        with self._lock:
+            reuse = dict(self._files or {})
+            for rel_path in changed:
+                reuse.pop(str(rel_path), None)
+            self._files = self._load(reuse)
+
+    @property
+    def files(self) -> Dict[str, SourceFile]:
+        """All files keyed by path relative to code_dir, in walk order"""
+        if self._files is None:
+            with self._lock:
+                if self._files is None:
+                    self._files = self._load()
+        return self._files
+
+    def get(self, rel_path: str) -> Optional[SourceFile]:
+        """Look up a file by its path relative to code_dir"""
+        return self.files.get(str(rel_path))
+
+    def __contains__(self, rel_path: str) -> bool:
+        return str(rel_path) in self.files
+
+    def __iter__(self) -> Iterator[SourceFile]:
+        return iter(self.files.values())
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def under(self, subdir: str) -> List[SourceFile]:
+        """Files below lib/<subdir>/, in walk order"""
+        prefix = subdir.rstrip('/') + '/'
+        return [f for f in self.files.values() if f.rel_path.startswith(prefix)]
+
+    def screens(self, include_navigation: bool = True) -> List[SourceFile]:
+        """Screen files below lib/screens/ (optionally including main_navigation.dart)"""
+        return [
+            f for f in self.under("screens")
+            if f.name.endswith("_screen.dart") or (include_navigation and f.name == "main_navigation.dart")
+        ]
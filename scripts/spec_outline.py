@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Spec Outline Parser
+Tokenizes a markdown spec once into a heading / label / bullet tree with offsets
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+HEADING_LINE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+FENCE_LINE = re.compile(r'^\s*(```|~~~)')
+RULE_LINE = re.compile(r'^\s*(?:-{3,}|\*{3,}|_{3,})\s*$')
+BULLET_LINE = re.compile(r'^(\s*)[-*]\s+(.*)$')
+# "**Label:** text" or "**Label**: text"
+LABEL_LINE = re.compile(r'^\*\*(.+?)(?::\*\*|\*\*:)\s*(.*)$')
+BOLD_NAME = re.compile(r'^\*\*(.+?)(?::\*\*|\*\*:?)\s*(.*)$', re.DOTALL)
+MODULE_HEADING = re.compile(r'^3\.(\d+)\s+(.+)$')
+
+
+class OutlineNode:
+    """A heading, label block ("**Purpose:** ..."), bullet or paragraph in a spec"""
+
+    def __init__(self, kind: str, text: str, start: int, end: int,
+                 level: int = 0, parent: "OutlineNode" = None):
+        self.kind = kind
+        self.text = text
+        self.start = start
+        self.end = end
+        self.level = level
+        self.parent = parent
+        self.children: List["OutlineNode"] = []
+
+    def add(self, child: "OutlineNode") -> "OutlineNode":
+        child.parent = self
+        self.children.append(child)
+        return child
+
+    def walk(self) -> Iterator["OutlineNode"]:
+        """Pre-order traversal of the subtree, including this node"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def bullets(self) -> List["OutlineNode"]:
+        """Direct bullet children"""
+        return [c for c in self.children if c.kind == "bullet"]
+
+    def flat_text(self) -> str:
+        """Own text followed by nested bullets inlined as ' - item', whitespace-normalized"""
+        parts = [self.text]
+        for node in self.walk():
+            if node is not self and node.kind == "bullet":
+                parts.append(f"- {node.text}")
+        return ' '.join(' '.join(parts).split())
+
+    def body_text(self) -> str:
+        """Text of everything below this node (paragraphs and bullets), whitespace-normalized"""
+        return ' '.join(' '.join(n.text for n in self.walk() if n is not self).split())
+
+    def bold_name(self) -> Optional[Tuple[str, str]]:
+        """Split '**Name:** description' into (name, description including nested bullets)"""
+        match = BOLD_NAME.match(self.flat_text())
+        if not match:
+            return None
+        return match.group(1).strip(), match.group(2).strip()
+
+    def __repr__(self) -> str:
+        return f"OutlineNode({self.kind!r}, {self.text[:40]!r}, {self.start}-{self.end})"
+
+
+class SpecSection:
+    """A contiguous run of top-level outline nodes, e.g. one module of the Product Definition"""
+
+    def __init__(self, number: str, name: str, heading: OutlineNode):
+        self.number = number
+        self.name = name
+        self.heading = heading
+        self.nodes = [heading]
+        self.start = heading.start
+        self.end = heading.end
+
+    def append(self, node: OutlineNode):
+        self.nodes.append(node)
+        self.end = node.end
+
+    def walk(self) -> Iterator[OutlineNode]:
+        for node in self.nodes:
+            yield from node.walk()
+
+    def labels(self, pattern: str) -> List[OutlineNode]:
+        """Label blocks whose label matches pattern (searched, case-sensitive)"""
+        regex = re.compile(pattern)
+        return [n for n in self.walk() if n.kind == "label" and regex.search(n.text)]
+
+    def label_text(self, pattern: str) -> str:
+        """Paragraph text of the first matching label block ("**Purpose:** <text>")"""
+        for label in self.labels(pattern):
+            paragraphs = [c.text for c in label.children if c.kind == "paragraph"]
+            return ' '.join(paragraphs)
+        return ""
+
+    def label_bullets(self, pattern: str) -> List[OutlineNode]:
+        """Top-level bullets under every matching label block, in document order"""
+        bullets = []
+        for label in self.labels(pattern):
+            bullets.extend(label.bullets())
+        return bullets
+
+    def top_level_bullets(self) -> List[OutlineNode]:
+        """Every outermost bullet in the section, in document order"""
+        return [n for n in self.walk() if n.kind == "bullet" and n.parent.kind != "bullet"]
+
+
+class SpecOutline:
+    """Single-pass outline of a markdown document"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.root = OutlineNode("document", "", 0, len(text))
+        self._parse()
+
+    @classmethod
+    def from_file(cls, path: Path) -> "SpecOutline":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    def _parse(self):
+        headings = [self.root]        # open headings, root first
+        label = None                  # open label block
+        paragraph = None              # paragraph that continuation lines extend
+        bullets: List[OutlineNode] = []  # open bullets, outermost first
+        in_fence = False
+        after_blank = False
+        offset = 0
+
+        def container() -> OutlineNode:
+            return label if label is not None else headings[-1]
+
+        def close_heading(level: int, at: int):
+            while len(headings) > 1 and headings[-1].level >= level:
+                headings.pop().end = at
+
+        for line in self.text.splitlines(keepends=True):
+            start, offset = offset, offset + len(line)
+            stripped = line.rstrip('\r\n')
+
+            if FENCE_LINE.match(stripped):
+                in_fence = not in_fence
+                label, paragraph, bullets = None, None, []
+                continue
+            if in_fence:
+                continue
+
+            if not stripped.strip():
+                after_blank = True
+                paragraph = None
+                continue
+
+            heading = HEADING_LINE.match(stripped)
+            if heading:
+                level = len(heading.group(1))
+                close_heading(level, start)
+                node = headings[-1].add(OutlineNode("heading", heading.group(2).strip(), start, offset, level))
+                headings.append(node)
+                label, paragraph, bullets, after_blank = None, None, [], False
+                continue
+
+            if RULE_LINE.match(stripped):
+                label, paragraph, bullets, after_blank = None, None, [], False
+                continue
+
+            bullet = BULLET_LINE.match(stripped)
+            if bullet:
+                indent = len(bullet.group(1).expandtabs(4))
+                while bullets and bullets[-1].level >= indent:
+                    bullets.pop()
+                parent = bullets[-1] if bullets else container()
+                node = parent.add(OutlineNode("bullet", bullet.group(2).strip(), start, offset, indent))
+                bullets.append(node)
+                paragraph, after_blank = None, False
+                continue
+
+            labelled = LABEL_LINE.match(stripped)
+            if labelled:
+                label = headings[-1].add(OutlineNode("label", labelled.group(1).strip(), start, offset))
+                paragraph = None
+                if labelled.group(2):
+                    paragraph = label.add(OutlineNode("paragraph", labelled.group(2).strip(), start, offset))
+                bullets, after_blank = [], False
+                continue
+
+            # Plain text: lazy continuation of the open bullet/paragraph, else a new paragraph
+            if bullets and not after_blank:
+                bullets[-1].text = f"{bullets[-1].text} {stripped.strip()}"
+                bullets[-1].end = offset
+            elif paragraph is not None:
+                paragraph.text = f"{paragraph.text} {stripped.strip()}"
+                paragraph.end = offset
+            else:
+                if after_blank:
+                    label = None
+                paragraph = container().add(OutlineNode("paragraph", stripped.strip(), start, offset))
+                bullets = []
+            after_blank = False
+
+        close_heading(1, len(self.text))
+        self._close_ends(self.root)
+
+    def _close_ends(self, node: OutlineNode) -> int:
+        """Propagate each node's end offset to cover its children"""
+        for child in node.children:
+            node.end = max(node.end, self._close_ends(child))
+        return node.end
+
+    def headings(self, level: Optional[int] = None) -> List[OutlineNode]:
+        return [n for n in self.root.walk() if n.kind == "heading" and (level is None or n.level == level)]
+
+    def modules(self) -> Dict[str, SpecSection]:
+        """Product Definition modules ("### 3.N Name"), keyed by N
+
+        A module runs until the next module heading or the next heading above
+        level 3, so same-level subsection headings (e.g. in 3.6) stay inside it.
+        """
+        modules = {}
+        current = None
+        for node in self.root.walk():
+            if node.kind != "heading":
+                continue
+            match = MODULE_HEADING.match(node.text) if node.level == 3 else None
+            if match:
+                current = SpecSection(match.group(1), match.group(2).strip(), node)
+                modules[current.number] = current
+            elif current is not None:
+                if node.level < 3:
+                    current = None
+                elif node.parent.kind == "document" or node.parent.level < 3:
+                    # A same-level heading inside the module's range
+                    current.append(node)
+        return modules
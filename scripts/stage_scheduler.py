@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Stage Scheduler
+Runs a DAG of audit stages concurrently, skipping stages whose fingerprinted inputs are unchanged
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import audit_trace
+from analysis_cache import CACHE_DIR_NAME
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+STATE_FILE_NAME = "stages.json"
+RESULTS_DIR_NAME = "stages"
+
+
+class Stage:
+    """One node of the audit DAG
+
+    inputs are globs relative to the project root (spec files, lib/ trees,
+    inventories); code names the scripts/ modules that run the stage, each
+    fingerprinted together with every scripts/ module it imports; deps are
+    upstream stage names whose results are handed to run() in memory.
+    outputs maps artifact paths to writers.
+    """
+
+    def __init__(self, name: str, deps: List[str], run: Callable[[Dict], object],
+                 inputs: Optional[List[str]] = None, code: Optional[List[str]] = None,
+                 outputs: Optional[List[Tuple[str, Callable[[object], None]]]] = None):
+        self.name = name
+        self.deps = deps
+        self.run = run
+        self.inputs = inputs or []
+        self.code = code or []
+        self.outputs = outputs or []
+
+
+# import x / import x.y as z / from x import y; relative imports never occur in scripts/
+IMPORT_PATTERN = re.compile(r'^[ \t]*(?:import|from)[ \t]+(\w+)', re.MULTILINE)
+
+
+def local_imports(module: str, seen: Optional[Set[str]] = None) -> Set[str]:
+    """module (a scripts/ file name) and every scripts/ module it imports, directly or not"""
+    if seen is None:
+        seen = set()
+    if module in seen:
+        return seen
+    seen.add(module)
+    with open(SCRIPTS_DIR / module, 'r', encoding='utf-8') as f:
+        source = f.read()
+    for name in IMPORT_PATTERN.findall(source):
+        imported = f"{name}.py"
+        if (SCRIPTS_DIR / imported).is_file():
+            local_imports(imported, seen)
+    return seen
+
+
+class StageScheduler:
+    """Fingerprints every stage, then runs the stale ones as soon as their dependencies finish"""
+
+    def __init__(self, root_dir: Path, stages: List[Stage], jobs: int = 4, force: bool = False):
+        self.root_dir = Path(root_dir)
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = [stage.name for stage in stages]
+        self.jobs = jobs
+        self.force = force
+        self.state_dir = self.root_dir / CACHE_DIR_NAME
+        self.results_dir = self.state_dir / RESULTS_DIR_NAME
+        self.results: Dict[str, object] = {}
+        self.timings: Dict[str, float] = {}
+        self.status: Dict[str, str] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self._globs: Dict[str, List[Path]] = {}
+        self._lock = threading.Lock()
+        for name in self.order:
+            missing = [dep for dep in self.stages[name].deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {name} depends on unknown stage(s): {', '.join(missing)}")
+
+    def _input_files(self, stage: Stage) -> List[Path]:
+        files = set()
+        for pattern in stage.inputs:
+            if pattern not in self._globs:
+                self._globs[pattern] = [path for path in self.root_dir.glob(pattern) if path.is_file()]
+            files.update(self._globs[pattern])
+        return sorted(files)
+
+    def fingerprint(self, name: str) -> str:
+        """Hash of the stage's code, input file stats and upstream fingerprints"""
+        if name in self.fingerprints:
+            return self.fingerprints[name]
+        stage = self.stages[name]
+        digest = hashlib.sha1(name.encode('utf-8'))
+        modules = set()
+        for module in stage.code:
+            local_imports(module, modules)
+        for module in sorted(modules):
+            with open(SCRIPTS_DIR / module, 'rb') as f:
+                digest.update(f"code:{module}:".encode('utf-8'))
+                digest.update(hashlib.sha1(f.read()).digest())
+        for path in self._input_files(stage):
+            stat = path.stat()
+            rel_path = path.relative_to(self.root_dir).as_posix()
+            digest.update(f"input:{rel_path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+        for dep in stage.deps:
+            digest.update(f"dep:{dep}:{self.fingerprint(dep)}\n".encode('utf-8'))
+        self.fingerprints[name] = digest.hexdigest()
+        return self.fingerprints[name]
+
+    def _load_state(self) -> Dict[str, str]:
+        state_file = self.state_dir / STATE_FILE_NAME
+        if not state_file.exists():
+            return {}
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: Dict[str, str]):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        state_file = self.state_dir / STATE_FILE_NAME
+        tmp_file = state_file.with_suffix(".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, state_file)
+
+    def _result_path(self, name: str) -> Path:
+        return self.results_dir / f"{name}.json"
+
+    def result(self, name: str):
+        """A stage's result, loading a skipped stage's cached result on first use"""
+        with self._lock:
+            if name not in self.results:
+                with open(self._result_path(name), 'r', encoding='utf-8') as f:
+                    self.results[name] = json.load(f)
+            return self.results[name]
+
+    def _store_result(self, name: str, result):
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self._result_path(name).with_suffix(".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, separators=(',', ':'))
+        os.replace(tmp_file, self._result_path(name))
+
+    def _run_stage(self, name: str):
+        stage = self.stages[name]
+        start = time.perf_counter()
+        with audit_trace.span(name, cat="stage"):
+            result = stage.run({dep: self.result(dep) for dep in stage.deps})
+            with self._lock:
+                self.results[name] = result
+            for rel_path, write in stage.outputs:
+                with audit_trace.span(f"{name}: write {rel_path}", cat="stage"):
+                    write(result)
+            self._store_result(name, result)
+        self.timings[name] = time.perf_counter() - start
+
+    def _restore_outputs(self, name: str):
+        """Rewrite a skipped stage's missing artifacts from its cached result"""
+        for rel_path, write in self.stages[name].outputs:
+            if not (self.root_dir / rel_path).exists():
+                write(self.result(name))
+
+    def run(self) -> Dict[str, object]:
+        start = time.perf_counter()
+        previous = self._load_state()
+        state = dict(previous)
+
+        stale = set()
+        for name in self.order:
+            fingerprint = self.fingerprint(name)
+            if self.force or previous.get(name) != fingerprint or not self._result_path(name).exists():
+                stale.add(name)
+                state.pop(name, None)
+            else:
+                self.status[name] = "skipped"
+                self.timings[name] = 0.0
+
+        for name in self.order:
+            if name not in stale:
+                self._restore_outputs(name)
+
+        done = {name for name in self.order if name not in stale}
+        pending = [name for name in self.order if name in stale]
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                for name in [n for n in pending if all(dep in done for dep in self.stages[n].deps)]:
+                    pending.remove(name)
+                    running[pool.submit(self._run_stage, name)] = name
+                if not running:
+                    raise RuntimeError(f"Stages can never run (dependency cycle?): {', '.join(pending)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    future.result()
+                    done.add(name)
+                    self.status[name] = "ran"
+                    state[name] = self.fingerprints[name]
+                    self._save_state(state)
+
+        self.timings["total"] = time.perf_counter() - start
+        return self.results